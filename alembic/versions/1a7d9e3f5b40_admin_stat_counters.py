@@ -0,0 +1,39 @@
+"""Admin dashboard stat counters
+
+Revision ID: 1a7d9e3f5b40
+Revises: f19c3a5e6d28
+Create Date: 2026-10-18 13:31:44.207815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7d9e3f5b40'
+down_revision = 'f19c3a5e6d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stat_counters',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        "INSERT INTO stat_counters (name, value) "
+        "SELECT 'total_users', COUNT(*) FROM users "
+        "UNION ALL SELECT 'verified_users', COUNT(*) FROM users WHERE is_verified = true "
+        "UNION ALL SELECT 'admin_users', COUNT(*) FROM users WHERE is_admin = true "
+        "UNION ALL SELECT 'total_offers', COUNT(*) FROM offers "
+        "UNION ALL SELECT 'active_offers', COUNT(*) FROM offers WHERE is_active = true "
+        "UNION ALL SELECT 'total_likes', COUNT(*) FROM user_likes WHERE action = 'like' "
+        "UNION ALL SELECT 'total_dislikes', COUNT(*) FROM user_likes WHERE action = 'dislike'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stat_counters')
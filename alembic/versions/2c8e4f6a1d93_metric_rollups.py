@@ -0,0 +1,43 @@
+"""Hourly and daily metric rollups
+
+Revision ID: 2c8e4f6a1d93
+Revises: 1a7d9e3f5b40
+Create Date: 2026-10-18 14:16:52.730019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8e4f6a1d93'
+down_revision = '1a7d9e3f5b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('metric_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('granularity', 'metric', 'bucket_start', 'category', 'provider', name='uq_metric_rollups_bucket')
+    )
+    op.create_index(op.f('ix_metric_rollups_id'), 'metric_rollups', ['id'], unique=False)
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_index(op.f('ix_metric_rollups_id'), table_name='metric_rollups')
+    op.drop_table('metric_rollups')
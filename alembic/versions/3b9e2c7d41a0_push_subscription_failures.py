@@ -0,0 +1,33 @@
+"""Push subscription failure tracking and unique endpoints
+
+Revision ID: 3b9e2c7d41a0
+Revises: f83d586c65a1
+Create Date: 2026-10-18 09:12:04.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9e2c7d41a0'
+down_revision = 'f83d586c65a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('push_subscriptions', sa.Column('failure_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('push_subscriptions', sa.Column('last_failure_at', sa.DateTime(timezone=True), nullable=True))
+    # Keep only the newest row per endpoint before enforcing uniqueness
+    op.execute(
+        "DELETE FROM push_subscriptions WHERE id NOT IN "
+        "(SELECT MAX(id) FROM push_subscriptions GROUP BY endpoint)"
+    )
+    op.create_index(op.f('ix_push_subscriptions_endpoint'), 'push_subscriptions', ['endpoint'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_push_subscriptions_endpoint'), table_name='push_subscriptions')
+    op.drop_column('push_subscriptions', 'last_failure_at')
+    op.drop_column('push_subscriptions', 'failure_count')
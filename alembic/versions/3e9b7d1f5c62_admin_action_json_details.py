@@ -0,0 +1,29 @@
+"""Store admin action details as JSON
+
+Revision ID: 3e9b7d1f5c62
+Revises: 8c4a6e2b9f17
+Create Date: 2026-10-18 18:58:36.190482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e9b7d1f5c62'
+down_revision = '8c4a6e2b9f17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite keeps JSON as text, and the existing values are already JSON text
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('admin_actions', 'details',
+                        existing_type=sa.Text(), type_=sa.JSON(), postgresql_using='details::json')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('admin_actions', 'details',
+                        existing_type=sa.JSON(), type_=sa.Text(), postgresql_using='details::text')
@@ -0,0 +1,31 @@
+"""Offer trending score snapshots
+
+Revision ID: 4a7c2e9d8b15
+Revises: 9f2e7c4b1a86
+Create Date: 2026-10-18 16:31:05.274180
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7c2e9d8b15'
+down_revision = '9f2e7c4b1a86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offer_trending_scores',
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('like_score', sa.Float(), nullable=False),
+    sa.Column('dislike_score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('offer_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('offer_trending_scores')
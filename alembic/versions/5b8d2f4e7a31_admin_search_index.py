@@ -0,0 +1,125 @@
+"""Full-text search index for admin user and offer search
+
+Revision ID: 5b8d2f4e7a31
+Revises: 7e5d1b3c9a42
+Create Date: 2026-10-18 18:05:12.407291
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8d2f4e7a31'
+down_revision = '7e5d1b3c9a42'
+branch_labels = None
+depends_on = None
+
+
+# SQLite: external-content FTS5 tables over users and offers, kept in sync by triggers
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        email, username, full_name, phone,
+        content='users', content_rowid='id',
+        tokenize="unicode61 tokenchars '@.+_-'", prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, username, full_name, phone)
+        VALUES (new.id, new.email, new.username, new.full_name, new.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, username, full_name, phone)
+        VALUES ('delete', old.id, old.email, old.username, old.full_name, old.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF email, username, full_name, phone ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, username, full_name, phone)
+        VALUES ('delete', old.id, old.email, old.username, old.full_name, old.phone);
+        INSERT INTO users_fts(rowid, email, username, full_name, phone)
+        VALUES (new.id, new.email, new.username, new.full_name, new.phone);
+    END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+        title, description, provider_name,
+        content='offers', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_insert AFTER INSERT ON offers BEGIN
+        INSERT INTO offers_fts(rowid, title, description, provider_name)
+        VALUES (new.id, new.title, new.description, new.provider_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_delete AFTER DELETE ON offers BEGIN
+        INSERT INTO offers_fts(offers_fts, rowid, title, description, provider_name)
+        VALUES ('delete', old.id, old.title, old.description, old.provider_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_update AFTER UPDATE OF title, description, provider_name ON offers BEGIN
+        INSERT INTO offers_fts(offers_fts, rowid, title, description, provider_name)
+        VALUES ('delete', old.id, old.title, old.description, old.provider_name);
+        INSERT INTO offers_fts(rowid, title, description, provider_name)
+        VALUES (new.id, new.title, new.description, new.provider_name);
+    END""",
+]
+
+# PostgreSQL: trigger-maintained tsvector columns with GIN indexes, plus
+# trigram indexes so email and phone prefixes (and substrings) use an index
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """CREATE OR REPLACE FUNCTION users_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.full_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.username, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS users_search_vector_trigger ON users",
+    """CREATE TRIGGER users_search_vector_trigger BEFORE INSERT OR UPDATE OF email, username, full_name
+        ON users FOR EACH ROW EXECUTE FUNCTION users_search_vector_update()""",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_vector ON users USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING GIN (email gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_phone_trgm ON users USING GIN (phone gin_trgm_ops)",
+    "ALTER TABLE offers ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """CREATE OR REPLACE FUNCTION offers_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.provider_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS offers_search_vector_trigger ON offers",
+    """CREATE TRIGGER offers_search_vector_trigger BEFORE INSERT OR UPDATE OF title, description, provider_name
+        ON offers FOR EACH ROW EXECUTE FUNCTION offers_search_vector_update()""",
+    "CREATE INDEX IF NOT EXISTS ix_offers_search_vector ON offers USING GIN (search_vector)",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO offers_fts(offers_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+        op.execute("UPDATE users SET email = email WHERE search_vector IS NULL")
+        op.execute("UPDATE offers SET title = title WHERE search_vector IS NULL")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for table in ('users', 'offers'):
+            for event in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{event}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_users_phone_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+        for table in ('users', 'offers'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,24 @@
+"""Index for keyset pagination of the admin action log
+
+Revision ID: 6a2c8e4d0b73
+Revises: 3e9b7d1f5c62
+Create Date: 2026-10-18 19:21:53.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2c8e4d0b73'
+down_revision = '3e9b7d1f5c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_admin_actions_created_at_id', 'admin_actions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_admin_actions_created_at_id', table_name='admin_actions')
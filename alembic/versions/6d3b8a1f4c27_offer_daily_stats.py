@@ -0,0 +1,34 @@
+"""Per-offer daily conversion stats
+
+Revision ID: 6d3b8a1f4c27
+Revises: 2c8e4f6a1d93
+Create Date: 2026-10-18 15:02:11.418263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d3b8a1f4c27'
+down_revision = '2c8e4f6a1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offer_daily_stats',
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('impressions', sa.Integer(), nullable=False),
+    sa.Column('likes', sa.Integer(), nullable=False),
+    sa.Column('dislikes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('offer_id', 'day')
+    )
+    op.create_index('ix_offer_daily_stats_day', 'offer_daily_stats', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_offer_daily_stats_day', table_name='offer_daily_stats')
+    op.drop_table('offer_daily_stats')
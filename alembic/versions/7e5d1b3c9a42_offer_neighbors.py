@@ -0,0 +1,30 @@
+"""Offer neighbor lists for similar offers
+
+Revision ID: 7e5d1b3c9a42
+Revises: 4a7c2e9d8b15
+Create Date: 2026-10-18 17:20:44.861530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e5d1b3c9a42'
+down_revision = '4a7c2e9d8b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offer_neighbors',
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('neighbors', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('offer_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('offer_neighbors')
@@ -0,0 +1,49 @@
+"""Offer expiry reminder markers, scan cursors and indexes
+
+Revision ID: 8c1d4e6f2a93
+Revises: 3b9e2c7d41a0
+Create Date: 2026-10-18 10:02:47.551208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d4e6f2a93'
+down_revision = '3b9e2c7d41a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offer_reminders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('window', sa.String(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'offer_id', 'window', name='uq_offer_reminders_user_offer_window')
+    )
+    op.create_index(op.f('ix_offer_reminders_id'), 'offer_reminders', ['id'], unique=False)
+    op.create_table('reminder_cursors',
+    sa.Column('window', sa.String(), nullable=False),
+    sa.Column('expiry_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('window')
+    )
+    op.create_index(op.f('ix_offers_expiry_date'), 'offers', ['expiry_date'], unique=False)
+    op.create_index('ix_user_likes_offer_id_action', 'user_likes', ['offer_id', 'action'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_likes_offer_id_action', table_name='user_likes')
+    op.drop_index(op.f('ix_offers_expiry_date'), table_name='offers')
+    op.drop_table('reminder_cursors')
+    op.drop_index(op.f('ix_offer_reminders_id'), table_name='offer_reminders')
+    op.drop_table('offer_reminders')
@@ -0,0 +1,28 @@
+"""Import keys on offers for bulk partner feeds
+
+Revision ID: 8c4a6e2b9f17
+Revises: 5b8d2f4e7a31
+Create Date: 2026-10-18 18:32:07.519846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4a6e2b9f17'
+down_revision = '5b8d2f4e7a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('offers', sa.Column('external_id', sa.String(), nullable=True))
+    op.add_column('offers', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_offers_provider_external_id', 'offers', ['provider_name', 'external_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_offers_provider_external_id', table_name='offers')
+    op.drop_column('offers', 'content_hash')
+    op.drop_column('offers', 'external_id')
@@ -0,0 +1,100 @@
+"""Partition admin_actions by month on PostgreSQL
+
+Revision ID: 9d5f3a7c1e48
+Revises: 6a2c8e4d0b73
+Create Date: 2026-10-18 19:47:15.338027
+
+"""
+from datetime import datetime, timedelta, timezone
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d5f3a7c1e48'
+down_revision = '6a2c8e4d0b73'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, admin_user_id, action_type, resource_type, resource_id, details, created_at"
+
+
+def _months(first, last):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    while month <= last:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Other databases get rolling monthly tables from the audit-partitions job
+        return
+
+    op.execute("UPDATE admin_actions SET created_at = now() WHERE created_at IS NULL")
+    op.execute("ALTER TABLE admin_actions RENAME TO admin_actions_unpartitioned")
+    op.execute("ALTER TABLE admin_actions_unpartitioned RENAME CONSTRAINT admin_actions_pkey TO admin_actions_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_admin_actions_id")
+    op.execute("DROP INDEX IF EXISTS ix_admin_actions_created_at_id")
+    # Keep the id sequence when the old table is dropped
+    op.execute("ALTER SEQUENCE admin_actions_id_seq OWNED BY NONE")
+
+    # The primary key has to include the partition key
+    op.execute(
+        "CREATE TABLE admin_actions ("
+        "id INTEGER NOT NULL DEFAULT nextval('admin_actions_id_seq'), "
+        "admin_user_id INTEGER NOT NULL REFERENCES users (id), "
+        "action_type VARCHAR NOT NULL, "
+        "resource_type VARCHAR NOT NULL, "
+        "resource_id INTEGER NOT NULL, "
+        "details JSON, "
+        "created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    op.create_index('ix_admin_actions_id', 'admin_actions', ['id'], unique=False)
+    op.create_index('ix_admin_actions_created_at_id', 'admin_actions', ['created_at', 'id'], unique=False)
+    op.execute("CREATE TABLE admin_actions_default PARTITION OF admin_actions DEFAULT")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    first = bind.execute(sa.text("SELECT min(created_at) FROM admin_actions_unpartitioned")).scalar()
+    first = first.astimezone(timezone.utc).replace(tzinfo=None) if first else now
+    for month in _months(first, now + timedelta(days=62)):
+        upper = (month + timedelta(days=32)).replace(day=1)
+        op.execute(
+            f"CREATE TABLE admin_actions_{month:%Y%m} PARTITION OF admin_actions "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{upper:%Y-%m-%d} 00:00:00+00')"
+        )
+
+    op.execute(f"INSERT INTO admin_actions ({COLUMNS}) SELECT {COLUMNS} FROM admin_actions_unpartitioned")
+    op.execute("DROP TABLE admin_actions_unpartitioned")
+    op.execute("ALTER SEQUENCE admin_actions_id_seq OWNED BY admin_actions.id")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE admin_actions RENAME TO admin_actions_partitioned")
+    op.execute("DROP INDEX IF EXISTS ix_admin_actions_id")
+    op.execute("DROP INDEX IF EXISTS ix_admin_actions_created_at_id")
+    op.execute("ALTER SEQUENCE admin_actions_id_seq OWNED BY NONE")
+    op.execute(
+        "CREATE TABLE admin_actions ("
+        "id INTEGER NOT NULL DEFAULT nextval('admin_actions_id_seq') PRIMARY KEY, "
+        "admin_user_id INTEGER NOT NULL REFERENCES users (id), "
+        "action_type VARCHAR NOT NULL, "
+        "resource_type VARCHAR NOT NULL, "
+        "resource_id INTEGER NOT NULL, "
+        "details JSON, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now()"
+        ")"
+    )
+    op.create_index('ix_admin_actions_id', 'admin_actions', ['id'], unique=False)
+    op.create_index('ix_admin_actions_created_at_id', 'admin_actions', ['created_at', 'id'], unique=False)
+    # Detached or archived months are not brought back
+    op.execute(f"INSERT INTO admin_actions ({COLUMNS}) SELECT {COLUMNS} FROM admin_actions_partitioned")
+    op.execute("DROP TABLE admin_actions_partitioned CASCADE")
+    op.execute("ALTER SEQUENCE admin_actions_id_seq OWNED BY admin_actions.id")
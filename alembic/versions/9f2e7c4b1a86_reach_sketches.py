@@ -0,0 +1,34 @@
+"""HyperLogLog reach sketches
+
+Revision ID: 9f2e7c4b1a86
+Revises: 6d3b8a1f4c27
+Create Date: 2026-10-18 15:47:36.092114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f2e7c4b1a86'
+down_revision = '6d3b8a1f4c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reach_sketches',
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('day', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('registers', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('scope', 'kind', 'key', 'day')
+    )
+    op.create_index('ix_reach_sketches_scope_kind_day', 'reach_sketches', ['scope', 'kind', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reach_sketches_scope_kind_day', table_name='reach_sketches')
+    op.drop_table('reach_sketches')
@@ -0,0 +1,32 @@
+"""Offer change log for catalog delta sync
+
+Revision ID: a3f6c9e2d5b1
+Revises: 9d5f3a7c1e48
+Create Date: 2026-10-18 23:52:17.309814
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c9e2d5b1'
+down_revision = '9d5f3a7c1e48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offer_changes',
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('version'),
+    sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_offer_changes_changed_at'), 'offer_changes', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_offer_changes_changed_at'), table_name='offer_changes')
+    op.drop_table('offer_changes')
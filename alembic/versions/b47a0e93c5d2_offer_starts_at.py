@@ -0,0 +1,26 @@
+"""Scheduled go-live time for offers
+
+Revision ID: b47a0e93c5d2
+Revises: 8c1d4e6f2a93
+Create Date: 2026-10-18 10:41:19.304716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47a0e93c5d2'
+down_revision = '8c1d4e6f2a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('offers', sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('offers', sa.Column('pending_activation', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('offers', 'pending_activation')
+    op.drop_column('offers', 'starts_at')
@@ -0,0 +1,29 @@
+"""Per-user unread notification counter
+
+Revision ID: d5f81b2a7c64
+Revises: b47a0e93c5d2
+Create Date: 2026-10-18 11:27:53.880142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f81b2a7c64'
+down_revision = 'b47a0e93c5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE users SET unread_notification_count = ("
+        "SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.user_id = users.id AND notifications.is_read = false)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'unread_notification_count')
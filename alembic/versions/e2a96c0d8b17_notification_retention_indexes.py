@@ -0,0 +1,26 @@
+"""Indexes for notification retention and per-user listing
+
+Revision ID: e2a96c0d8b17
+Revises: d5f81b2a7c64
+Create Date: 2026-10-18 12:05:31.627490
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a96c0d8b17'
+down_revision = 'd5f81b2a7c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_notifications_sent_at'), 'notifications', ['sent_at'], unique=False)
+    op.create_index('ix_notifications_user_id_sent_at', 'notifications', ['user_id', 'sent_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_user_id_sent_at', table_name='notifications')
+    op.drop_index(op.f('ix_notifications_sent_at'), table_name='notifications')
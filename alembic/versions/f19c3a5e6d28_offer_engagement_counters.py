@@ -0,0 +1,33 @@
+"""Denormalized offer engagement counters
+
+Revision ID: f19c3a5e6d28
+Revises: e2a96c0d8b17
+Create Date: 2026-10-18 12:48:09.915306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19c3a5e6d28'
+down_revision = 'e2a96c0d8b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('offers', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('offers', sa.Column('dislike_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('offers', sa.Column('impression_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE offers SET "
+        "like_count = (SELECT COUNT(*) FROM user_likes WHERE user_likes.offer_id = offers.id AND user_likes.action = 'like'), "
+        "dislike_count = (SELECT COUNT(*) FROM user_likes WHERE user_likes.offer_id = offers.id AND user_likes.action = 'dislike')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('offers', 'impression_count')
+    op.drop_column('offers', 'dislike_count')
+    op.drop_column('offers', 'like_count')
@@ -1,70 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
-import json
 from datetime import datetime, timezone
 
 from app.database import get_db
-from app.models import User, Offer, UserLike, AdminAction
+from app.models import User, Offer, AdminAction
 from app.schemas import (
     AdminUserResponse, AdminUserUpdate, OfferResponse, OfferCreate, 
-    OfferUpdate, AdminActionResponse, AdminStats, MessageResponse
+    OfferUpdate, AdminActionResponse, AdminStats, MessageResponse, OfferImportResponse,
+    OfferBulkFilter, OfferBulkUpdate, UserBulkFilter, UserBulkUpdate, BulkActionResponse,
+    AdminActionHistoryEntry
 )
 from app.auth import get_current_user, get_current_admin_user
+from app.services.offer_lifecycle import offer_lifecycle, starts_in_future, UPDATE, DEACTIVATE, REMOVE
+from app.services.admin_stats import admin_stats
+from app.services.search import admin_search
+from app.services.offer_import import offer_importer, read_rows, detect_format, FORMATS
+from app.services.bulk_admin import bulk_admin
+from app.services.audit_log import audit_log
+from app.services.audit_archive import audit_archive
+from app.services.exports import data_exporter, DATASETS, MEDIA_TYPES, FORMATS as EXPORT_FORMATS
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-# Helper function to log admin actions
-def log_admin_action(
-    db: Session, 
-    admin_user: User, 
-    action_type: str, 
-    resource_type: str, 
-    resource_id: int, 
-    details: dict = None
-):
-    admin_action = AdminAction(
-        admin_user_id=admin_user.id,
-        action_type=action_type,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        details=json.dumps(details) if details else None
-    )
-    db.add(admin_action)
-    db.commit()
-
 # User Management
 @router.get("/users", response_model=List[AdminUserResponse])
 async def get_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     is_admin: Optional[bool] = None,
     is_verified: Optional[bool] = None,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users with filtering and pagination"""
+    """Get users, best search match first, with keyset pagination.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the
+    next page; ``skip`` still works but gets slower the deeper it goes.
+    """
     query = db.query(User)
     
-    if search:
-        search_filter = or_(
-            User.email.ilike(f"%{search}%"),
-            User.full_name.ilike(f"%{search}%"),
-            User.username.ilike(f"%{search}%"),
-            User.phone.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
     if is_admin is not None:
         query = query.filter(User.is_admin == is_admin)
     
     if is_verified is not None:
         query = query.filter(User.is_verified == is_verified)
     
-    users = query.offset(skip).limit(limit).all()
-    return users
+    rows = admin_search.search(db, query, User, search, decode_cursor(cursor, 2), limit, skip)
+    if len(rows) == limit:
+        last, rank = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rank, last.id)
+    return [user for user, _ in rows]
 
 @router.get("/users/{user_id}", response_model=AdminUserResponse)
 async def get_user(
@@ -100,8 +92,8 @@ async def update_user(
     db.refresh(user)
     
     # Log admin action
-    log_admin_action(
-        db, current_admin, "update", "user", user_id, 
+    audit_log.enqueue(
+        current_admin.id, "update", "user", user_id,
         {"updated_fields": list(update_data.keys())}
     )
     
@@ -121,9 +113,9 @@ async def delete_user(
     if user.is_admin:
         raise HTTPException(status_code=400, detail="Cannot delete admin users")
     
-    # Log admin action before deletion
-    log_admin_action(
-        db, current_admin, "delete", "user", user_id,
+    # Log admin action in the same transaction as the deletion
+    audit_log.record(
+        db, current_admin.id, "delete", "user", user_id,
         {"user_email": user.email, "user_full_name": user.full_name}
     )
     
@@ -132,35 +124,72 @@ async def delete_user(
     
     return {"message": "User deleted successfully"}
 
+def _require_filter(filters):
+    # An empty filter would match every row
+    if not filters.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+@router.post("/users/bulk-update", response_model=BulkActionResponse)
+async def bulk_update_users(
+    request: UserBulkUpdate,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Update every user matching the filter in one statement"""
+    _require_filter(request.filter)
+    changes = request.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    
+    return {"affected": bulk_admin.update_users(db, current_admin.id, request.filter, changes)}
+
+@router.post("/users/bulk-deactivate", response_model=BulkActionResponse)
+async def bulk_deactivate_users(
+    filters: UserBulkFilter,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Deactivate every non-admin user matching the filter"""
+    _require_filter(filters)
+    return {"affected": bulk_admin.deactivate_users(db, current_admin.id, filters)}
+
+@router.post("/users/bulk-delete", response_model=BulkActionResponse)
+async def bulk_delete_users(
+    filters: UserBulkFilter,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Delete every non-admin user matching the filter, with their swipes and notifications"""
+    _require_filter(filters)
+    return {"affected": bulk_admin.delete_users(db, current_admin.id, filters)}
+
 # Offer Management
 @router.get("/offers", response_model=List[OfferResponse])
 async def get_offers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     is_active: Optional[bool] = None,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all offers with filtering and pagination"""
+    """Get offers, best search match first, with keyset pagination (see ``get_users``)"""
     query = db.query(Offer)
     
-    if search:
-        search_filter = or_(
-            Offer.title.ilike(f"%{search}%"),
-            Offer.description.ilike(f"%{search}%"),
-            Offer.provider_name.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
     if category:
         query = query.filter(Offer.category == category)
     
     if is_active is not None:
         query = query.filter(Offer.is_active == is_active)
     
-    offers = query.offset(skip).limit(limit).all()
+    rows = admin_search.search(db, query, Offer, search, decode_cursor(cursor, 2), limit, skip)
+    if len(rows) == limit:
+        last, rank = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rank, last.id)
+    offers = [offer for offer, _ in rows]
     
     # Add time until expiry
     for offer in offers:
@@ -190,19 +219,41 @@ async def create_offer(
 ):
     """Create a new offer"""
     offer = Offer(**offer_create.dict())
+    if starts_in_future(offer.starts_at):
+        # Goes live at starts_at via the lifecycle scheduler
+        offer.is_active = False
+        offer.pending_activation = True
     db.add(offer)
     db.commit()
     db.refresh(offer)
+    offer_lifecycle.schedule(offer)
+    if offer.is_active:
+        offer_lifecycle.fire_hooks(UPDATE, [offer.id])
     
     # Log admin action
-    log_admin_action(
-        db, current_admin, "create", "offer", offer.id,
+    audit_log.enqueue(
+        current_admin.id, "create", "offer", offer.id,
         {"title": offer.title, "provider": offer.provider_name}
     )
     
     offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
     return offer
 
+# Plain def: the parse and upserts block, so FastAPI runs them in its threadpool
+@router.post("/offers/import", response_model=OfferImportResponse)
+def import_offers(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from the file name if omitted"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Create or update offers in bulk from a CSV or NDJSON partner feed"""
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'csv' or 'ndjson'")
+    
+    return offer_importer.import_rows(db, read_rows(file.file, fmt), current_admin.id, source=file.filename)
+
 @router.put("/offers/{offer_id}", response_model=OfferResponse)
 async def update_offer(
     offer_id: int,
@@ -219,14 +270,23 @@ async def update_offer(
     update_data = offer_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(offer, field, value)
+    if "is_active" in update_data:
+        # An explicit activation or deactivation replaces a scheduled go-live
+        offer.pending_activation = False
+    if "starts_at" in update_data and starts_in_future(offer.starts_at) and (offer.is_active or offer.pending_activation):
+        # Goes live again at the new starts_at via the lifecycle scheduler
+        offer.is_active = False
+        offer.pending_activation = True
     
     offer.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(offer)
+    offer_lifecycle.schedule(offer)
+    offer_lifecycle.fire_hooks(UPDATE if offer.is_active else DEACTIVATE, [offer.id])
     
     # Log admin action
-    log_admin_action(
-        db, current_admin, "update", "offer", offer_id,
+    audit_log.enqueue(
+        current_admin.id, "update", "offer", offer_id,
         {"updated_fields": list(update_data.keys())}
     )
     
@@ -244,29 +304,73 @@ async def delete_offer(
     if not offer:
         raise HTTPException(status_code=404, detail="Offer not found")
     
-    # Log admin action before deletion
-    log_admin_action(
-        db, current_admin, "delete", "offer", offer_id,
+    # Log admin action in the same transaction as the deletion
+    audit_log.record(
+        db, current_admin.id, "delete", "offer", offer_id,
         {"title": offer.title, "provider": offer.provider_name}
     )
     
     db.delete(offer)
     db.commit()
+    offer_lifecycle.unschedule(offer_id)
+    offer_lifecycle.fire_hooks(REMOVE, [offer_id])
     
     return {"message": "Offer deleted successfully"}
 
+@router.post("/offers/bulk-update", response_model=BulkActionResponse)
+async def bulk_update_offers(
+    request: OfferBulkUpdate,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Update every offer matching the filter in one statement"""
+    _require_filter(request.filter)
+    changes = request.changes.model_dump(exclude_unset=True)
+    if not changes and not request.extend_expiry_hours:
+        raise HTTPException(status_code=400, detail="No changes given")
+    if request.extend_expiry_hours and "expiry_date" in changes:
+        raise HTTPException(status_code=400, detail="Set expiry_date or extend_expiry_hours, not both")
+    
+    affected = bulk_admin.update_offers(
+        db, current_admin.id, request.filter, changes, extend_expiry_hours=request.extend_expiry_hours
+    )
+    return {"affected": affected}
+
+@router.post("/offers/bulk-deactivate", response_model=BulkActionResponse)
+async def bulk_deactivate_offers(
+    filters: OfferBulkFilter,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Deactivate every offer matching the filter"""
+    _require_filter(filters)
+    return {"affected": bulk_admin.deactivate_offers(db, current_admin.id, filters)}
+
+@router.post("/offers/bulk-delete", response_model=BulkActionResponse)
+async def bulk_delete_offers(
+    filters: OfferBulkFilter,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Delete every offer matching the filter, with its swipes and notifications"""
+    _require_filter(filters)
+    return {"affected": bulk_admin.delete_offers(db, current_admin.id, filters)}
+
 # Admin Actions Log
 @router.get("/actions", response_model=List[AdminActionResponse])
 async def get_admin_actions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     action_type: Optional[str] = None,
     resource_type: Optional[str] = None,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get admin actions log"""
-    query = db.query(AdminAction).join(User, AdminAction.admin_user_id == User.id)
+    """Get admin actions log, newest first, with keyset pagination (see ``get_users``)"""
+    # The admin is loaded from the join, so a page is one query whatever the limit
+    query = db.query(AdminAction).join(AdminAction.admin_user).options(contains_eager(AdminAction.admin_user))
     
     if action_type:
         query = query.filter(AdminAction.action_type == action_type)
@@ -274,9 +378,62 @@ async def get_admin_actions(
     if resource_type:
         query = query.filter(AdminAction.resource_type == resource_type)
     
-    actions = query.order_by(AdminAction.created_at.desc()).offset(skip).limit(limit).all()
+    after = decode_cursor(cursor, 2)
+    if after is not None:
+        created_at, action_id = _cursor_time(after[0]), after[1]
+        query = query.filter(or_(
+            AdminAction.created_at < created_at,
+            and_(AdminAction.created_at == created_at, AdminAction.id < action_id)
+        ))
+    elif skip:
+        query = query.offset(skip)
+    
+    actions = query.order_by(AdminAction.created_at.desc(), AdminAction.id.desc()).limit(limit).all()
+    if len(actions) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(actions[-1].created_at.isoformat(), actions[-1].id)
     return actions
 
+@router.get("/actions/history", response_model=List[AdminActionHistoryEntry])
+async def get_admin_action_history(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    admin_user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get admin actions in [start, end), newest first, including archived months"""
+    return audit_archive.history(
+        db, start, end, limit,
+        admin_user_id=admin_user_id, action_type=action_type, resource_type=resource_type
+    )
+
+# Data exports
+@router.get("/export/{dataset}")
+async def export_data(
+    dataset: str,
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = False,
+    after_id: Optional[int] = Query(None, description="Resume after this ID"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Stream every user, offer, swipe or notification as CSV or NDJSON, in ID order"""
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail="Unknown dataset. Use one of: " + ", ".join(DATASETS))
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'csv' or 'ndjson'")
+    
+    filename = f"{dataset}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        data_exporter.stream(dataset, format, gzip, after_id, since, until),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"}
+    )
+
 # Statistics
 @router.get("/stats", response_model=AdminStats)
 async def get_admin_stats(
@@ -284,26 +441,18 @@ async def get_admin_stats(
     db: Session = Depends(get_db)
 ):
     """Get admin dashboard statistics"""
-    total_users = db.query(func.count(User.id)).scalar()
-    total_offers = db.query(func.count(Offer.id)).scalar()
-    total_likes = db.query(func.count(UserLike.id)).filter(UserLike.action == "like").scalar()
-    total_dislikes = db.query(func.count(UserLike.id)).filter(UserLike.action == "dislike").scalar()
-    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
-    active_offers = db.query(func.count(Offer.id)).filter(
-        and_(Offer.is_active == True, Offer.expiry_date > now)
-    ).scalar()
-    verified_users = db.query(func.count(User.id)).filter(User.is_verified == True).scalar()
-    admin_users = db.query(func.count(User.id)).filter(User.is_admin == True).scalar()
-    
-    return AdminStats(
-        total_users=total_users,
-        total_offers=total_offers,
-        total_likes=total_likes,
-        total_dislikes=total_dislikes,
-        active_offers=active_offers,
-        verified_users=verified_users,
-        admin_users=admin_users
-    )
+    # Served from incrementally maintained counters, not COUNT queries
+    return AdminStats(**admin_stats.get_stats(db))
+
+def _cursor_time(value) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Naive UTC, like the stored timestamps are compared elsewhere
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 # Helper function for time calculation
 def calculate_time_until_expiry(expiry_date: datetime) -> str:
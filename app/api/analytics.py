@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import User, OfferCategory
+from app.schemas import TimeSeriesResponse, ConversionReportResponse, ReachResponse
+from app.auth import get_current_admin_user
+from app.services.rollups import rollup_pipeline, METRICS, HOUR, DAY
+from app.services.conversions import conversion_report, GROUP_BY, SORT_FIELDS
+from app.services.reach import reach_tracker, HyperLogLog, OFFER, CATEGORY, SEEN, LIKED
+
+router = APIRouter(prefix="/admin/analytics", tags=["admin-analytics"])
+
+
+@router.get("/timeseries", response_model=TimeSeriesResponse)
+async def get_timeseries(
+    metric: str = Query(..., description="swipes, likes, dislikes, signups or notifications"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Optional[str] = Query(None, description="hour or day; picked from the range when omitted"),
+    group_by: Optional[str] = Query(None, description="category or provider"),
+    category: Optional[str] = None,
+    provider: Optional[str] = None,
+    max_points: int = Query(200, ge=10, le=2000),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get a metric over time from the hourly/daily rollups"""
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric. Use one of: {', '.join(METRICS)}")
+    if granularity not in (None, HOUR, DAY):
+        raise HTTPException(status_code=400, detail="Invalid granularity. Use 'hour' or 'day'")
+    if group_by not in (None, "category", "provider"):
+        raise HTTPException(status_code=400, detail="Invalid group_by. Use 'category' or 'provider'")
+    
+    # Query parameters without an offset are taken as UTC
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    return rollup_pipeline.timeseries(
+        db, metric, start, end, granularity=granularity, group_by=group_by,
+        category=category, provider=provider, max_points=max_points
+    )
+
+
+@router.get("/conversions", response_model=ConversionReportResponse)
+async def get_conversions(
+    group_by: str = Query("offer", description="offer, provider or category"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sort: str = Query("like_rate", description="impressions, likes, dislikes or like_rate"),
+    order: str = Query("desc", description="asc or desc"),
+    category: Optional[OfferCategory] = None,
+    provider: Optional[str] = None,
+    min_impressions: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get impressions, likes, dislikes and like rate (likes per impression) from the daily offer stats"""
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by. Use one of: {', '.join(GROUP_BY)}")
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Use one of: {', '.join(SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Invalid order. Use 'asc' or 'desc'")
+    
+    # Query parameters without an offset are taken as UTC
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    rows = conversion_report.report(
+        db, group_by, start, end, sort=sort, descending=order == "desc", limit=limit,
+        category=category, provider=provider, min_impressions=min_impressions
+    )
+    return {"group_by": group_by, "start": start, "end": end, "rows": rows}
+
+
+@router.get("/reach", response_model=ReachResponse)
+async def get_reach(
+    scope: str = Query(OFFER, description="offer or category"),
+    kind: str = Query(SEEN, description="seen or liked"),
+    key: Optional[str] = Query(None, description="Offer ID or category; all keys when omitted"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Estimate distinct users who saw or liked each offer or category.
+
+    Estimates come from HyperLogLog sketches; ``relative_error`` is the
+    standard error (about 1.6%), so roughly 95% of estimates fall within
+    twice that of the exact count.
+    """
+    if scope not in (OFFER, CATEGORY):
+        raise HTTPException(status_code=400, detail="Invalid scope. Use 'offer' or 'category'")
+    if kind not in (SEEN, LIKED):
+        raise HTTPException(status_code=400, detail="Invalid kind. Use 'seen' or 'liked'")
+    
+    # Query parameters without an offset are taken as UTC
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=7)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    return {
+        "scope": scope,
+        "kind": kind,
+        "start": start,
+        "end": end,
+        "relative_error": round(HyperLogLog.relative_error(), 4),
+        "rows": reach_tracker.estimate(db, scope, kind, start, end, key=key)
+    }
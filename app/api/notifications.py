@@ -1,11 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, SessionLocal
 from app.models import User, Notification
-from app.schemas import NotificationResponse, MessageResponse
-from app.auth import get_current_verified_user
-from sqlalchemy import and_
+from app.schemas import (
+    NotificationResponse, MessageResponse, UnreadCountResponse,
+    NotificationBatchRequest, NotificationBatchResponse
+)
+from app.auth import authenticate_token, get_current_verified_user
+from app.services.notification_hub import notification_hub, notification_event, RESYNC
+from app.services.unread_counter import adjust_unread_count
+from sqlalchemy import and_, delete, func, update
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -39,6 +48,146 @@ async def get_unread_notifications(
     return notifications
 
 
+@router.get("/unread/count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    current_user: User = Depends(get_current_verified_user)
+):
+    """Get the number of unread notifications for the badge"""
+    return {"unread_count": current_user.unread_notification_count}
+
+
+@router.post("/batch", response_model=NotificationBatchResponse)
+async def batch_update_notifications(
+    batch: NotificationBatchRequest,
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db)
+):
+    """Mark as read or delete several notifications in one statement"""
+    action = batch.action.lower()
+    if action not in ["read", "delete"]:
+        raise HTTPException(status_code=400, detail="Invalid action. Use 'read' or 'delete'")
+    
+    ids = list(set(batch.ids))
+    affected = 0
+    if ids:
+        if action == "read":
+            result = db.execute(
+                update(Notification).where(
+                    and_(
+                        Notification.user_id == current_user.id,
+                        Notification.id.in_(ids),
+                        Notification.is_read == False
+                    )
+                ).values(is_read=True).execution_options(synchronize_session=False)
+            )
+            affected = result.rowcount
+            adjust_unread_count(db, current_user.id, -affected)
+        else:
+            deleted = db.execute(
+                delete(Notification).where(
+                    and_(
+                        Notification.user_id == current_user.id,
+                        Notification.id.in_(ids)
+                    )
+                ).returning(Notification.is_read).execution_options(synchronize_session=False)
+            ).scalars().all()
+            affected = len(deleted)
+            adjust_unread_count(db, current_user.id, -sum(1 for is_read in deleted if not is_read))
+    
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"affected": affected, "unread_count": current_user.unread_notification_count}
+
+
+def _format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+def _format_resync(last_id: int) -> str:
+    # Moves Last-Event-ID past the gap, so a reconnect does not replay it again
+    return f"id: {last_id}\nevent: resync\ndata: {{}}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    token: str = Query(..., description="Access token; EventSource cannot send headers"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    since: Optional[int] = Query(None, description="Resume after this notification ID")
+):
+    """Stream new notifications as Server-Sent Events"""
+    resume_after = last_event_id if last_event_id is not None else since
+    
+    # Only hold a DB session while authenticating and replaying, not for the
+    # lifetime of the connection
+    db = SessionLocal()
+    try:
+        user = authenticate_token(db, token)
+        if not user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if not user.is_verified:
+            raise HTTPException(status_code=400, detail="User not verified")
+        user_id = user.id
+        
+        # Subscribe before replaying so nothing is missed in between
+        queue = notification_hub.subscribe(user_id)
+        try:
+            backlog = []
+            resync_id = None
+            if resume_after is not None:
+                # Clients keep the unread list, so read notifications are not replayed
+                backlog = db.query(Notification).filter(
+                    and_(
+                        Notification.user_id == user_id,
+                        Notification.id > resume_after,
+                        Notification.is_read == False
+                    )
+                ).order_by(Notification.id).limit(settings.sse_replay_limit + 1).all()
+                if len(backlog) > settings.sse_replay_limit:
+                    # Too far behind to replay: the client refetches and continues from the newest
+                    resync_id = db.query(func.max(Notification.id)).filter(
+                        Notification.user_id == user_id
+                    ).scalar()
+                    backlog = []
+                backlog = [notification_event(notification) for notification in backlog]
+        except Exception:
+            notification_hub.unsubscribe(user_id, queue)
+            raise
+    finally:
+        db.close()
+    
+    async def event_stream():
+        last_id = resume_after or 0
+        try:
+            yield f"retry: {settings.sse_heartbeat_seconds * 1000}\n\n"
+            if resync_id is not None:
+                last_id = resync_id
+                yield _format_resync(resync_id)
+            for event in backlog:
+                last_id = event["id"]
+                yield _format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is RESYNC:
+                    break
+                if event["id"] <= last_id:
+                    continue
+                last_id = event["id"]
+                yield _format_event(event)
+        finally:
+            notification_hub.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.put("/{notification_id}/read", response_model=MessageResponse)
 async def mark_notification_read(
     notification_id: int,
@@ -68,12 +217,14 @@ async def mark_all_notifications_read(
     db: Session = Depends(get_db)
 ):
     """Mark all notifications as read"""
-    db.query(Notification).filter(
+    updated = db.query(Notification).filter(
         and_(
             Notification.user_id == current_user.id,
             Notification.is_read == False
         )
     ).update({"is_read": True})
+    # Only the rows this UPDATE flipped, so concurrent inserts keep their count
+    adjust_unread_count(db, current_user.id, -updated)
     
     db.commit()
     
@@ -1,18 +1,29 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, not_
 from app.database import get_db
 from app.models import User, Offer, UserLike, OfferCategory
 from app.schemas import (
-    OfferResponse, SwipeRequest,
+    OfferResponse, OfferChangesResponse, SwipeRequest,
     MessageResponse
 )
 from app.auth import get_current_verified_user
+from app.services.engagement import engagement_counter, IMPRESSION
+from app.services.reach import reach_tracker
+from app.services.trending import trending_engine
+from app.services.ranking import content_ranker
+from app.services.similar_offers import similar_offers
+from app.services.text_index import text_index
+from app.services.offer_changes import offer_change_log
+from app.config import settings
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/offers", tags=["offers"])
 
+SORT_OPTIONS = ("relevance", "newest", "trending")
+
 
 def calculate_time_until_expiry(expiry_date: datetime) -> str:
     """Calculate time until expiry in human readable format"""
@@ -38,13 +49,28 @@ def calculate_time_until_expiry(expiry_date: datetime) -> str:
         return f"{minutes}m"
 
 
+def rank_for_user(db: Session, user_id: int, offer_ids: List[int]):
+    """Positions ordering ``offer_ids`` best first for the user; ties stay in the given order"""
+    vector = content_ranker.affinity(db, user_id)
+    boosts = similar_offers.boosts(db, user_id)
+    if vector.any() or boosts:
+        return content_ranker.rank(vector, offer_ids, boosts)
+    # New users: offers that read like what is trending right now
+    seeds = [offer_id for offer_id, _ in trending_engine.top(10)]
+    return text_index.rank(db, seeds, offer_ids)
+
+
 @router.get("/", response_model=List[OfferResponse])
 async def get_offers(
     category: Optional[OfferCategory] = Query(None, description="Filter by category"),
+    sort: str = Query("relevance", description="relevance, newest or trending"),
     current_user: User = Depends(get_current_verified_user),
     db: Session = Depends(get_db)
 ):
     """Get available offers for swiping"""
+    if sort not in SORT_OPTIONS:
+        raise HTTPException(status_code=400, detail="Invalid sort. Use 'relevance', 'newest' or 'trending'")
+    
     # Get offers that user hasn't liked yet and are still active
     now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
     query = db.query(Offer).filter(
@@ -63,21 +89,34 @@ async def get_offers(
         query = query.filter(Offer.category == category)
     
     offers = query.order_by(Offer.created_at.desc()).all()
+    if sort == "relevance":
+        order = rank_for_user(db, current_user.id, [offer.id for offer in offers])
+        offers = [offers[i] for i in order]
+    elif sort == "trending":
+        # Trending offers first, the rest stay newest first
+        rank = trending_engine.rank()
+        offers.sort(key=lambda offer: rank.get(offer.id, len(rank)))
     
     # Add time until expiry to each offer
     for offer in offers:
         offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
     
+    # The whole unpaginated list is not what the user sees; /next counts
+    # the impression and reach of the one offer it shows
     return offers
 
 
 @router.get("/next", response_model=OfferResponse)
 async def get_next_offer(
     category: Optional[OfferCategory] = Query(None, description="Filter by category"),
+    sort: str = Query("relevance", description="relevance, newest or trending"),
     current_user: User = Depends(get_current_verified_user),
     db: Session = Depends(get_db)
 ):
     """Get the next offer for swiping"""
+    if sort not in SORT_OPTIONS:
+        raise HTTPException(status_code=400, detail="Invalid sort. Use 'relevance', 'newest' or 'trending'")
+    
     now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
     query = db.query(Offer).filter(
         and_(
@@ -94,7 +133,18 @@ async def get_next_offer(
     if category:
         query = query.filter(Offer.category == category)
     
-    offer = query.order_by(Offer.created_at.desc()).first()
+    offer = None
+    if sort == "relevance":
+        offer_ids = [row.id for row in query.with_entities(Offer.id).order_by(Offer.created_at.desc()).all()]
+        if offer_ids:
+            offer = db.get(Offer, offer_ids[int(rank_for_user(db, current_user.id, offer_ids)[0])])
+    elif sort == "trending":
+        rank = trending_engine.rank()
+        if rank:
+            candidates = query.filter(Offer.id.in_(list(rank))).all()
+            offer = min(candidates, key=lambda candidate: rank[candidate.id], default=None)
+    if offer is None:
+        offer = query.order_by(Offer.created_at.desc()).first()
     
     if not offer:
         raise HTTPException(
@@ -103,9 +153,79 @@ async def get_next_offer(
         )
     
     offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
+    engagement_counter.record(offer.id, IMPRESSION)
+    reach_tracker.record_seen(current_user.id, [offer])
     return offer
 
 
+@router.get("/trending", response_model=List[OfferResponse])
+async def get_trending_offers(
+    category: Optional[OfferCategory] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=settings.trending_top_k),
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db)
+):
+    """Get the offers with the highest recent like activity"""
+    scores = dict(trending_engine.top())
+    if not scores:
+        return []
+    
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
+    query = db.query(Offer).filter(
+        and_(
+            Offer.id.in_(list(scores)),
+            Offer.is_active == True,
+            Offer.expiry_date > now
+        )
+    )
+    if category:
+        query = query.filter(Offer.category == category)
+    
+    offers = sorted(query.all(), key=lambda offer: scores[offer.id], reverse=True)[:limit]
+    for offer in offers:
+        offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
+        offer.trending_score = round(scores[offer.id], 4)
+    
+    return offers
+
+
+@router.get("/changes", response_model=OfferChangesResponse)
+async def get_offer_changes(
+    response: Response,
+    since: int = Query(0, ge=0, description="Version returned by the previous call; 0 for a snapshot"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous snapshot page"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db)
+):
+    """Get offers upserted or removed after a change log version, oldest change first.
+    
+    Without ``since`` this returns a snapshot of the live offers, paged with
+    the X-Next-Cursor header; after the last page, poll with ``since`` set
+    to the returned version. A 410 means the client fell behind the pruned
+    log and must take a new snapshot.
+    """
+    after = decode_cursor(cursor, 2)
+    if after is not None or not since:
+        if after is None:
+            version, after_id = offer_change_log.current_version(db), 0
+        elif all(isinstance(value, int) for value in after):
+            version, after_id = after
+        else:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        changes = dict(offer_change_log.snapshot(db, after_id, limit), version=version)
+        if changes["has_more"]:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(version, changes["upserted"][-1].id)
+    elif since < offer_change_log.pruned_version(db):
+        raise HTTPException(status_code=410, detail="Change log pruned past this version; take a new snapshot")
+    else:
+        changes = offer_change_log.changes_since(db, since, limit)
+    
+    for offer in changes["upserted"]:
+        offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
+    return changes
+
+
 @router.post("/swipe", response_model=MessageResponse)
 async def swipe_offer(
     swipe_data: SwipeRequest,
@@ -152,6 +272,11 @@ async def swipe_offer(
         )
         db.add(user_like)
         db.commit()
+        engagement_counter.record(swipe_data.offer_id, user_like.action)
+        trending_engine.record(swipe_data.offer_id, user_like.action)
+        reach_tracker.record_seen(current_user.id, [offer])
+        if user_like.action == "like":
+            reach_tracker.record_liked(current_user.id, offer)
         
         if swipe_data.action.lower() == "like":
             return {"message": "Offer liked successfully"}
@@ -230,7 +355,83 @@ async def unlike_offer(
             detail="Liked offer not found"
         )
     
+    action, liked_at = user_like.action, user_like.created_at
     db.delete(user_like)
+    # In the same transaction, so a reconcile never sees the row gone but the counter not yet decremented
+    engagement_counter.apply(db, offer_id, action, -1)
     db.commit()
+    # Take back the decayed weight the swipe has now, not a fresh one
+    trending_engine.record(offer_id, action, -1, at=liked_at)
     
     return {"message": "Offer unliked successfully"}
+
+
+@router.get("/{offer_id}/similar", response_model=List[OfferResponse])
+async def get_similar_offers(
+    offer_id: int,
+    limit: int = Query(10, ge=1, le=settings.similar_offers_top_n),
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db)
+):
+    """Get offers liked by users who also liked this offer"""
+    if not db.query(Offer.id).filter(Offer.id == offer_id).first():
+        raise HTTPException(
+            status_code=404,
+            detail="Offer not found"
+        )
+    
+    scores = dict(similar_offers.neighbors(db, offer_id))
+    if not scores:
+        return []
+    
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
+    offers = db.query(Offer).filter(
+        and_(
+            Offer.id.in_(list(scores)),
+            Offer.is_active == True,
+            Offer.expiry_date > now
+        )
+    ).all()
+    
+    offers = sorted(offers, key=lambda offer: scores[offer.id], reverse=True)[:limit]
+    for offer in offers:
+        offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
+        offer.similarity = round(scores[offer.id], 4)
+    
+    return offers
+
+
+@router.get("/{offer_id}/more-like-this", response_model=List[OfferResponse])
+async def get_more_like_this(
+    offer_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_verified_user),
+    db: Session = Depends(get_db)
+):
+    """Get offers whose title, description and provider read most like this offer"""
+    if not db.query(Offer.id).filter(Offer.id == offer_id).first():
+        raise HTTPException(
+            status_code=404,
+            detail="Offer not found"
+        )
+    
+    # Ask for a few extra in case some went inactive since the index last synced
+    scores = dict(text_index.similar(db, [offer_id], limit + 10))
+    if not scores:
+        return []
+    
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
+    offers = db.query(Offer).filter(
+        and_(
+            Offer.id.in_(list(scores)),
+            Offer.is_active == True,
+            Offer.expiry_date > now
+        )
+    ).all()
+    
+    offers = sorted(offers, key=lambda offer: scores[offer.id], reverse=True)[:limit]
+    for offer in offers:
+        offer.time_until_expiry = calculate_time_until_expiry(offer.expiry_date)
+        offer.similarity = round(scores[offer.id], 4)
+    
+    return offers
@@ -47,6 +47,106 @@ class Settings:
     vapid_private_key: str = os.getenv("VAPID_PRIVATE_KEY", "")
     vapid_public_key: str = os.getenv("VAPID_PUBLIC_KEY", "")
     contact_email: str = os.getenv("CONTACT_EMAIL", "admin@tinderlike.com")
+    # Lifetime of a signed VAPID JWT (RFC 8292 caps this at 24h) and how long
+    # before expiry a cached header is re-signed
+    vapid_token_ttl_seconds: int = int(os.getenv("VAPID_TOKEN_TTL_SECONDS", "43200"))
+    vapid_refresh_margin_seconds: int = int(os.getenv("VAPID_REFRESH_MARGIN_SECONDS", "600"))
+    # Dead push subscription reaper
+    push_reaper_interval_seconds: int = int(os.getenv("PUSH_REAPER_INTERVAL_SECONDS", "3600"))
+    push_max_failures: int = int(os.getenv("PUSH_MAX_FAILURES", "5"))
+    push_inactive_retention_days: int = int(os.getenv("PUSH_INACTIVE_RETENTION_DAYS", "7"))
+    
+    # Liked-offer expiry reminders
+    expiry_reminder_windows_hours: str = os.getenv("EXPIRY_REMINDER_WINDOWS_HOURS", "24,1")
+    expiry_reminder_interval_seconds: int = int(os.getenv("EXPIRY_REMINDER_INTERVAL_SECONDS", "300"))
+    expiry_reminder_batch_size: int = int(os.getenv("EXPIRY_REMINDER_BATCH_SIZE", "500"))
+    
+    # Offer lifecycle (go-live and expiry transitions)
+    offer_lifecycle_interval_seconds: int = int(os.getenv("OFFER_LIFECYCLE_INTERVAL_SECONDS", "5"))
+    offer_lifecycle_batch_size: int = int(os.getenv("OFFER_LIFECYCLE_BATCH_SIZE", "500"))
+    offer_lifecycle_resync_seconds: int = int(os.getenv("OFFER_LIFECYCLE_RESYNC_SECONDS", "60"))
+    
+    # Real-time notification stream (SSE)
+    notification_broker: str = os.getenv("NOTIFICATION_BROKER", "memory")  # memory or redis
+    sse_heartbeat_seconds: int = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    sse_queue_size: int = int(os.getenv("SSE_QUEUE_SIZE", "32"))
+    sse_replay_limit: int = int(os.getenv("SSE_REPLAY_LIMIT", "100"))
+    
+    # Notification retention
+    notification_read_ttl_days: int = int(os.getenv("NOTIFICATION_READ_TTL_DAYS", "30"))
+    notification_unread_ttl_days: int = int(os.getenv("NOTIFICATION_UNREAD_TTL_DAYS", "90"))
+    notification_retention_interval_seconds: int = int(os.getenv("NOTIFICATION_RETENTION_INTERVAL_SECONDS", "3600"))
+    notification_retention_batch_size: int = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000"))
+    notification_retention_max_batches: int = int(os.getenv("NOTIFICATION_RETENTION_MAX_BATCHES", "50"))
+    notification_archive_dir: str = os.getenv("NOTIFICATION_ARCHIVE_DIR", "")  # Empty disables archiving
+    
+    # Offer engagement counters
+    engagement_flush_interval_seconds: int = int(os.getenv("ENGAGEMENT_FLUSH_INTERVAL_SECONDS", "5"))
+    engagement_reconcile_interval_seconds: int = int(os.getenv("ENGAGEMENT_RECONCILE_INTERVAL_SECONDS", "21600"))
+    # Offers swiped more recently are skipped by the reconcile; keep well above the flush interval
+    engagement_reconcile_quiet_seconds: int = int(os.getenv("ENGAGEMENT_RECONCILE_QUIET_SECONDS", "60"))
+    
+    # Admin dashboard stats
+    admin_stats_max_staleness_seconds: int = int(os.getenv("ADMIN_STATS_MAX_STALENESS_SECONDS", "10"))
+    admin_stats_recount_interval_seconds: int = int(os.getenv("ADMIN_STATS_RECOUNT_INTERVAL_SECONDS", "86400"))
+    
+    # Analytics rollups
+    rollup_interval_seconds: int = int(os.getenv("ROLLUP_INTERVAL_SECONDS", "60"))
+    rollup_batch_size: int = int(os.getenv("ROLLUP_BATCH_SIZE", "5000"))
+    rollup_max_batches: int = int(os.getenv("ROLLUP_MAX_BATCHES", "20"))
+    rollup_lag_seconds: int = int(os.getenv("ROLLUP_LAG_SECONDS", "30"))
+    reach_flush_interval_seconds: int = int(os.getenv("REACH_FLUSH_INTERVAL_SECONDS", "30"))
+    
+    # Trending offers
+    trending_half_life_seconds: int = int(os.getenv("TRENDING_HALF_LIFE_SECONDS", "10800"))
+    trending_top_k: int = int(os.getenv("TRENDING_TOP_K", "100"))
+    trending_dislike_weight: float = float(os.getenv("TRENDING_DISLIKE_WEIGHT", "0.5"))
+    trending_snapshot_interval_seconds: int = int(os.getenv("TRENDING_SNAPSHOT_INTERVAL_SECONDS", "60"))
+    
+    # Feed ranking
+    ranking_sync_interval_seconds: int = int(os.getenv("RANKING_SYNC_INTERVAL_SECONDS", "30"))
+    ranking_history_limit: int = int(os.getenv("RANKING_HISTORY_LIMIT", "500"))
+    
+    # Similar offers (item-item collaborative filtering)
+    similar_offers_interval_seconds: int = int(os.getenv("SIMILAR_OFFERS_INTERVAL_SECONDS", "3600"))
+    similar_offers_top_n: int = int(os.getenv("SIMILAR_OFFERS_TOP_N", "20"))
+    similar_offers_chunk_size: int = int(os.getenv("SIMILAR_OFFERS_CHUNK_SIZE", "512"))
+    similar_offers_min_support: int = int(os.getenv("SIMILAR_OFFERS_MIN_SUPPORT", "2"))
+    similar_offers_boost_weight: float = float(os.getenv("SIMILAR_OFFERS_BOOST_WEIGHT", "0.5"))
+    
+    # Bulk offer import
+    offer_import_chunk_size: int = int(os.getenv("OFFER_IMPORT_CHUNK_SIZE", "1000"))
+    offer_import_max_errors: int = int(os.getenv("OFFER_IMPORT_MAX_ERRORS", "1000"))
+    
+    # Admin audit log
+    audit_flush_interval_seconds: int = int(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "2"))
+    audit_batch_size: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    audit_max_queued: int = int(os.getenv("AUDIT_MAX_QUEUED", "5000"))
+    
+    # Admin audit log partitions and archive
+    audit_partition_interval_seconds: int = int(os.getenv("AUDIT_PARTITION_INTERVAL_SECONDS", "3600"))
+    audit_hot_days: int = int(os.getenv("AUDIT_HOT_DAYS", "30"))
+    audit_archive_after_days: int = int(os.getenv("AUDIT_ARCHIVE_AFTER_DAYS", "180"))
+    audit_partitions_ahead: int = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "2"))
+    audit_archive_dir: str = os.getenv("AUDIT_ARCHIVE_DIR", "")  # Empty keeps old months in the database
+    
+    # Offer change log (catalog delta sync)
+    offer_changes_lag_seconds: int = int(os.getenv("OFFER_CHANGES_LAG_SECONDS", "2"))
+    offer_changes_retention_days: int = int(os.getenv("OFFER_CHANGES_RETENTION_DAYS", "7"))
+    offer_changes_prune_interval_seconds: int = int(os.getenv("OFFER_CHANGES_PRUNE_INTERVAL_SECONDS", "3600"))
+    
+    # Admin data exports
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    
+    # Analytics change export (date-partitioned Parquet; needs pyarrow)
+    change_export_dir: str = os.getenv("CHANGE_EXPORT_DIR", "")  # Empty disables the export
+    change_export_interval_seconds: int = int(os.getenv("CHANGE_EXPORT_INTERVAL_SECONDS", "3600"))
+    change_export_batch_size: int = int(os.getenv("CHANGE_EXPORT_BATCH_SIZE", "100000"))
+    change_export_max_batches: int = int(os.getenv("CHANGE_EXPORT_MAX_BATCHES", "10"))
+    change_export_compression: str = os.getenv("CHANGE_EXPORT_COMPRESSION", "zstd")
+    
+    # Background jobs (disable on all but one worker when running several)
+    background_jobs_enabled: bool = os.getenv("BACKGROUND_JOBS_ENABLED", "true").lower() == "true"
 
 
 settings = Settings()
@@ -9,6 +9,19 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def dialect_insert(db):
+    """Return the dialect's insert() construct, which supports ON CONFLICT upserts.
+
+    Accepts a Session or a Connection.
+    """
+    dialect = db.dialect if hasattr(db, "dialect") else db.bind.dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -3,11 +3,31 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.database import engine
 from app.models import Base
-from app.api import auth, offers, users, notifications, admin, push_notifications
+from app.api import auth, offers, users, notifications, admin, analytics, push_notifications
 from app.config import settings
+from app.services.scheduler import scheduler
+from app.services.push_notifications import push_service
+from app.services.expiry_reminders import expiry_reminder_service
+from app.services.offer_lifecycle import offer_lifecycle
+from app.services.notification_hub import notification_hub
+from app.services.notification_retention import notification_retention
+from app.services.engagement import engagement_counter
+from app.services.admin_stats import admin_stats
+from app.services.rollups import rollup_pipeline
+from app.services.reach import reach_tracker
+from app.services.trending import trending_engine
+from app.services.ranking import content_ranker
+from app.services.text_index import text_index
+from app.services.similar_offers import similar_offers
+from app.services.search import install_search_index
+from app.services.audit_log import audit_log
+from app.services.audit_archive import audit_archive
+from app.services.change_export import change_exporter
+from app.services.offer_changes import offer_change_log
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+install_search_index(engine)
 
 app = FastAPI(
     title="Flash Offers API",
@@ -30,8 +50,44 @@ app.include_router(offers.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(notifications.router, prefix="/api/v1")
 app.include_router(admin.router, prefix="/api/v1")
+app.include_router(analytics.router, prefix="/api/v1")
 app.include_router(push_notifications.router, prefix="/api/v1/push", tags=["push-notifications"])
 
+# Background jobs
+scheduler.add_job("push-subscription-reaper", settings.push_reaper_interval_seconds, push_service.reap_subscriptions)
+scheduler.add_job("offer-expiry-reminders", settings.expiry_reminder_interval_seconds, expiry_reminder_service.run)
+scheduler.add_job("offer-lifecycle", settings.offer_lifecycle_interval_seconds, offer_lifecycle.run)
+scheduler.add_job("notification-retention", settings.notification_retention_interval_seconds, notification_retention.run)
+scheduler.add_job("engagement-flush", settings.engagement_flush_interval_seconds, engagement_counter.flush, per_worker=True)
+scheduler.add_job("engagement-reconcile", settings.engagement_reconcile_interval_seconds, engagement_counter.reconcile)
+scheduler.add_job("admin-stats-recount", settings.admin_stats_recount_interval_seconds, admin_stats.recount)
+scheduler.add_job("metric-rollups", settings.rollup_interval_seconds, rollup_pipeline.run)
+scheduler.add_job("reach-flush", settings.reach_flush_interval_seconds, reach_tracker.flush, per_worker=True)
+scheduler.add_job("trending-snapshot", settings.trending_snapshot_interval_seconds, trending_engine.snapshot, per_worker=True)
+scheduler.add_job("ranking-sync", settings.ranking_sync_interval_seconds, content_ranker.sync, per_worker=True)
+scheduler.add_job("text-index-sync", settings.ranking_sync_interval_seconds, text_index.sync, per_worker=True)
+scheduler.add_job("similar-offers", settings.similar_offers_interval_seconds, similar_offers.run)
+scheduler.add_job("audit-log-flush", settings.audit_flush_interval_seconds, audit_log.flush, per_worker=True)
+scheduler.add_job("audit-partitions", settings.audit_partition_interval_seconds, audit_archive.run)
+scheduler.add_job("change-export", settings.change_export_interval_seconds, change_exporter.run)
+scheduler.add_job("offer-changes-prune", settings.offer_changes_prune_interval_seconds, offer_change_log.prune)
+scheduler.on_shutdown(scheduler.tasks["engagement-flush"].run_once)
+scheduler.on_shutdown(scheduler.tasks["reach-flush"].run_once)
+scheduler.on_shutdown(scheduler.tasks["trending-snapshot"].run_once)
+scheduler.on_shutdown(scheduler.tasks["audit-log-flush"].run_once)
+
+
+@app.on_event("startup")
+async def start_background_jobs():
+    await notification_hub.start()
+    scheduler.start(include_shared=settings.background_jobs_enabled)
+
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await scheduler.stop()
+    await notification_hub.stop()
+
 
 @app.get("/")
 async def root():
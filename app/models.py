@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Enum, Index, JSON, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 from sqlalchemy.ext.declarative import declarative_base
 import enum
 
@@ -53,6 +53,9 @@ class User(Base):
     notify_push = Column(Boolean, default=True)  # Push notifications
     telegram_chat_id = Column(String)
     
+    # Maintained by app.services.unread_counter
+    unread_notification_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Relationships
     likes = relationship("UserLike", back_populates="user")
     notifications = relationship("Notification", back_populates="user")
@@ -77,13 +80,30 @@ class Offer(Base):
     promo_code = Column(String)
     terms_conditions = Column(Text)
     instructions = Column(Text)
-    expiry_date = Column(DateTime(timezone=True), nullable=False)
+    starts_at = Column(DateTime(timezone=True))  # Scheduled go-live time
+    expiry_date = Column(DateTime(timezone=True), nullable=False, index=True)
     is_active = Column(Boolean, default=True)
+    # Inactive only until starts_at; cleared when it goes live or an admin sets is_active
+    pending_activation = Column(Boolean, default=False, server_default=false(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Engagement counters, maintained by app.services.engagement
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
+    dislike_count = Column(Integer, default=0, server_default="0", nullable=False)
+    impression_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    # Set by bulk imports (app.services.offer_import): the partner's ID for the
+    # offer, or a hash of its content when the feed has none
+    external_id = Column(String)
+    content_hash = Column(String(64))
+    
     # Relationships
     likes = relationship("UserLike", back_populates="offer")
+    
+    __table_args__ = (
+        Index("ix_offers_provider_external_id", "provider_name", "external_id", unique=True),
+    )
 
 
 class UserLike(Base):
@@ -98,6 +118,10 @@ class UserLike(Base):
     # Relationships
     user = relationship("User", back_populates="likes")
     offer = relationship("Offer", back_populates="likes")
+    
+    __table_args__ = (
+        Index("ix_user_likes_offer_id_action", "offer_id", "action"),
+    )
 
 
 class Notification(Base):
@@ -108,12 +132,139 @@ class Notification(Base):
     offer_id = Column(Integer, ForeignKey("offers.id"), nullable=False)
     notification_type = Column(Enum(NotificationType), nullable=False)
     message = Column(Text, nullable=False)
-    sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     is_read = Column(Boolean, default=False)
     
     # Relationships
     user = relationship("User", back_populates="notifications")
     offer = relationship("Offer")
+    
+    __table_args__ = (
+        Index("ix_notifications_user_id_sent_at", "user_id", "sent_at"),
+    )
+
+
+class OfferReminder(Base):
+    """Marks that an expiry reminder was sent, so each window fires once per user and offer"""
+    __tablename__ = "offer_reminders"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    offer_id = Column(Integer, ForeignKey("offers.id", ondelete="CASCADE"), nullable=False)
+    window = Column(String, nullable=False)  # e.g. 24h, 1h
+    sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "offer_id", "window", name="uq_offer_reminders_user_offer_window"),
+    )
+
+
+class ReminderCursor(Base):
+    """Position of the expiry reminder scan in each window, by (expiry_date, offer_id, user_id)"""
+    __tablename__ = "reminder_cursors"
+    
+    window = Column(String, primary_key=True)
+    expiry_date = Column(DateTime(timezone=True), nullable=False)
+    offer_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class StatCounter(Base):
+    """Admin dashboard totals, one row per metric, maintained by app.services.admin_stats"""
+    __tablename__ = "stat_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MetricRollup(Base):
+    """Event counts per hour or day bucket, by offer category and provider ('' when not applicable)"""
+    __tablename__ = "metric_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String, nullable=False)  # hour, day
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    metric = Column(String, nullable=False)  # swipes, likes, dislikes, signups, notifications
+    category = Column(String, nullable=False, default="")
+    provider = Column(String, nullable=False, default="")
+    value = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint("granularity", "metric", "bucket_start", "category", "provider", name="uq_metric_rollups_bucket"),
+    )
+
+
+class OfferDailyStat(Base):
+    """Impressions, likes and dislikes per offer per UTC day"""
+    __tablename__ = "offer_daily_stats"
+    
+    offer_id = Column(Integer, ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(DateTime(timezone=True), primary_key=True)
+    impressions = Column(Integer, nullable=False, default=0)
+    likes = Column(Integer, nullable=False, default=0)
+    dislikes = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_offer_daily_stats_day", "day"),
+    )
+
+
+class ReachSketch(Base):
+    """Compressed HyperLogLog registers counting unique users per offer or category per UTC day"""
+    __tablename__ = "reach_sketches"
+    
+    scope = Column(String, primary_key=True)  # offer, category
+    kind = Column(String, primary_key=True)  # seen, liked
+    key = Column(String, primary_key=True)  # offer ID or category value
+    day = Column(DateTime(timezone=True), primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_reach_sketches_scope_kind_day", "scope", "kind", "day"),
+    )
+
+
+class OfferTrendingScore(Base):
+    """Decayed like/dislike scores per offer as of ``updated_at``, merged from every worker"""
+    __tablename__ = "offer_trending_scores"
+    
+    offer_id = Column(Integer, ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True)
+    like_score = Column(Float, nullable=False, default=0.0)
+    dislike_score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class OfferNeighbors(Base):
+    """Top similar offers by shared likers, packed as int32 IDs then float32 scores, best first"""
+    __tablename__ = "offer_neighbors"
+    
+    offer_id = Column(Integer, ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True)
+    neighbors = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class RollupWatermark(Base):
+    """Last source row ID folded into the rollups, per source table"""
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class OfferChange(Base):
+    """Offer change log: a row per offer write, numbered by a version that only grows"""
+    __tablename__ = "offer_changes"
+    
+    version = Column(Integer, primary_key=True)
+    offer_id = Column(Integer, nullable=False)  # No foreign key: removals outlive the offer
+    changed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    # Never reuse the versions of pruned rows on SQLite
+    __table_args__ = {"sqlite_autoincrement": True}
 
 
 class VerificationCode(Base):
@@ -136,11 +287,17 @@ class AdminAction(Base):
     action_type = Column(String, nullable=False)  # create, update, delete
     resource_type = Column(String, nullable=False)  # user, offer
     resource_id = Column(Integer, nullable=False)
-    details = Column(Text)  # JSON string with action details
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    details = Column(JSON(none_as_null=True))
+    # Partition key on PostgreSQL (see app.services.audit_archive)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     admin_user = relationship("User", back_populates="admin_actions")
+    
+    __table_args__ = (
+        # Keyset pagination of the action log, newest first
+        Index("ix_admin_actions_created_at_id", "created_at", "id"),
+    )
 
 
 class PushSubscription(Base):
@@ -148,12 +305,14 @@ class PushSubscription(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    endpoint = Column(String, nullable=False)  # Push service endpoint
+    endpoint = Column(String, nullable=False, unique=True, index=True)  # Push service endpoint
     p256dh_key = Column(String, nullable=False)  # Public key for encryption
     auth_token = Column(String, nullable=False)  # Auth token for encryption
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    failure_count = Column(Integer, default=0, nullable=False)  # Consecutive failed sends
+    last_failure_at = Column(DateTime(timezone=True))
     
     # Relationships
     user = relationship("User", back_populates="push_subscriptions")
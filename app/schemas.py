@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from app.models import NotificationType, OfferCategory
 
@@ -62,6 +62,20 @@ class AdminUserResponse(UserResponse):
     oauth_id: Optional[str] = None
     updated_at: Optional[datetime] = None
 
+class UserBulkFilter(BaseModel):
+    ids: Optional[List[int]] = None
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    created_before: Optional[datetime] = None
+    created_after: Optional[datetime] = None
+
+class UserBulkUpdate(BaseModel):
+    filter: UserBulkFilter
+    changes: AdminUserUpdate
+
+class BulkActionResponse(BaseModel):
+    affected: int
+
 # Offer schemas
 class OfferBase(BaseModel):
     title: str
@@ -77,11 +91,29 @@ class OfferBase(BaseModel):
     promo_code: Optional[str] = None
     terms_conditions: Optional[str] = None
     instructions: Optional[str] = None
+    starts_at: Optional[datetime] = None
     expiry_date: datetime
 
 class OfferCreate(OfferBase):
     pass
 
+class OfferImportRow(OfferCreate):
+    external_id: Optional[str] = None  # Partner's ID; rows without one are keyed by content
+
+class OfferImportError(BaseModel):
+    line: int
+    error: str
+
+class OfferImportResponse(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    duplicates: int
+    failed: int
+    batches: int
+    errors: List[OfferImportError]
+    errors_truncated: bool = False
+
 class OfferUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -96,18 +128,43 @@ class OfferUpdate(BaseModel):
     promo_code: Optional[str] = None
     terms_conditions: Optional[str] = None
     instructions: Optional[str] = None
+    starts_at: Optional[datetime] = None
     expiry_date: Optional[datetime] = None
     is_active: Optional[bool] = None
 
+class OfferBulkFilter(BaseModel):
+    ids: Optional[List[int]] = None
+    provider_name: Optional[str] = None
+    category: Optional[OfferCategory] = None
+    is_active: Optional[bool] = None
+    expires_before: Optional[datetime] = None
+    expires_after: Optional[datetime] = None
+
+class OfferBulkUpdate(BaseModel):
+    filter: OfferBulkFilter
+    changes: OfferUpdate = OfferUpdate()  # Optional when only extending expiry
+    extend_expiry_hours: Optional[float] = None  # Added to each offer's own expiry
+
 class OfferResponse(OfferBase):
     id: int
     is_active: bool
     created_at: datetime
     time_until_expiry: Optional[str] = None
+    like_count: int = 0
+    dislike_count: int = 0
+    impression_count: int = 0
+    trending_score: Optional[float] = None
+    similarity: Optional[float] = None
 
     class Config:
         from_attributes = True
 
+class OfferChangesResponse(BaseModel):
+    version: int  # Pass back as since to continue
+    upserted: List[OfferResponse]  # Offers now live, in their current state
+    removed: List[int]  # Offers deleted, deactivated or expired since then
+    has_more: bool = False
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
@@ -149,13 +206,23 @@ class AdminActionResponse(BaseModel):
     action_type: str
     resource_type: str
     resource_id: int
-    details: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
     created_at: datetime
     admin_user: Optional[AdminUserResponse] = None
 
     class Config:
         from_attributes = True
 
+class AdminActionHistoryEntry(BaseModel):
+    id: int
+    admin_user_id: int
+    action_type: str
+    resource_type: str
+    resource_id: int
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    archived: bool = False
+
 # Statistics schemas
 class AdminStats(BaseModel):
     total_users: int
@@ -166,6 +233,51 @@ class AdminStats(BaseModel):
     verified_users: int
     admin_users: int
 
+# Analytics schemas
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    value: int
+
+class TimeSeries(BaseModel):
+    key: str
+    points: List[TimeSeriesPoint]
+
+class TimeSeriesResponse(BaseModel):
+    metric: str
+    granularity: str
+    step_seconds: int
+    series: List[TimeSeries]
+
+class ConversionRow(BaseModel):
+    key: str
+    offer_id: Optional[int] = None
+    title: Optional[str] = None
+    provider_name: Optional[str] = None
+    category: Optional[OfferCategory] = None
+    impressions: int
+    likes: int
+    dislikes: int
+    like_rate: float
+
+class ConversionReportResponse(BaseModel):
+    group_by: str
+    start: datetime
+    end: datetime
+    rows: List[ConversionRow]
+
+class ReachRow(BaseModel):
+    key: str
+    unique_users: int
+    days: int
+
+class ReachResponse(BaseModel):
+    scope: str
+    kind: str
+    start: datetime
+    end: datetime
+    relative_error: float
+    rows: List[ReachRow]
+
 # Notification schemas
 class NotificationResponse(BaseModel):
     id: int
@@ -179,6 +291,17 @@ class NotificationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
+class NotificationBatchRequest(BaseModel):
+    ids: List[int]
+    action: str  # read, delete
+
+class NotificationBatchResponse(BaseModel):
+    affected: int
+    unread_count: int
+
 # Push Notification schemas
 class PushSubscriptionCreate(BaseModel):
     endpoint: str
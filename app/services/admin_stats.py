@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, attributes
+from app.config import settings
+from app.database import dialect_insert
+from app.models import Offer, StatCounter, User, UserLike
+
+logger = logging.getLogger(__name__)
+
+TOTAL_USERS = "total_users"
+VERIFIED_USERS = "verified_users"
+ADMIN_USERS = "admin_users"
+TOTAL_OFFERS = "total_offers"
+ACTIVE_OFFERS = "active_offers"
+TOTAL_LIKES = "total_likes"
+TOTAL_DISLIKES = "total_dislikes"
+METRICS = (TOTAL_USERS, TOTAL_OFFERS, TOTAL_LIKES, TOTAL_DISLIKES, ACTIVE_OFFERS, VERIFIED_USERS, ADMIN_USERS)
+
+
+def adjust_stats(connection_or_session, deltas: Dict[str, int]):
+    """Add deltas to the counters inside the caller's transaction"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = dialect_insert(connection_or_session)
+    for name, delta in deltas.items():
+        stmt = insert(StatCounter.__table__).values(name=name, value=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StatCounter.__table__.c.name],
+            set_={"value": StatCounter.__table__.c.value + delta, "updated_at": func.now()}
+        )
+        connection_or_session.execute(stmt)
+
+
+class AdminStatsService:
+    """Serves the admin dashboard totals from the ``stat_counters`` table.
+
+    Counters are adjusted in the transactions that change users, offers and
+    swipes, reads come from a cache at most ``max_staleness_seconds`` old,
+    and ``recount`` periodically recomputes every total from the source
+    tables and fixes any drift.
+    """
+
+    def __init__(self, max_staleness_seconds: float):
+        self.max_staleness_seconds = max_staleness_seconds
+        self._cached: Optional[Dict[str, int]] = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_stats(self, db: Session) -> Dict[str, int]:
+        with self._lock:
+            if self._cached is not None and time.monotonic() - self._cached_at < self.max_staleness_seconds:
+                return dict(self._cached)
+
+        values = dict(db.query(StatCounter.name, StatCounter.value).all())
+        if any(name not in values for name in METRICS):
+            # Fresh database without seeded counters
+            self.recount(db)
+            values = dict(db.query(StatCounter.name, StatCounter.value).all())
+
+        stats = {name: max(int(values.get(name, 0)), 0) for name in METRICS}
+        with self._lock:
+            self._cached = stats
+            self._cached_at = time.monotonic()
+        return dict(stats)
+
+    def invalidate(self):
+        with self._lock:
+            self._cached = None
+
+    def _exact_counts(self, db: Session) -> Dict[str, int]:
+        return {
+            TOTAL_USERS: db.query(func.count(User.id)).scalar(),
+            VERIFIED_USERS: db.query(func.count(User.id)).filter(User.is_verified == True).scalar(),
+            ADMIN_USERS: db.query(func.count(User.id)).filter(User.is_admin == True).scalar(),
+            TOTAL_OFFERS: db.query(func.count(Offer.id)).scalar(),
+            ACTIVE_OFFERS: db.query(func.count(Offer.id)).filter(Offer.is_active == True).scalar(),
+            TOTAL_LIKES: db.query(func.count(UserLike.id)).filter(UserLike.action == "like").scalar(),
+            TOTAL_DISLIKES: db.query(func.count(UserLike.id)).filter(UserLike.action == "dislike").scalar(),
+        }
+
+    def recount(self, db: Session) -> Dict:
+        """Recompute every counter from the source tables and report the drift found"""
+        exact = self._exact_counts(db)
+        current = dict(db.query(StatCounter.name, StatCounter.value).all())
+        drift = {name: exact[name] - current[name] for name in METRICS
+                 if name in current and exact[name] != current[name]}
+
+        insert = dialect_insert(db)
+        for name, value in exact.items():
+            stmt = insert(StatCounter.__table__).values(name=name, value=value)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[StatCounter.__table__.c.name],
+                set_={"value": value, "updated_at": func.now()}
+            )
+            db.execute(stmt)
+        db.commit()
+        self.invalidate()
+
+        if drift:
+            logger.warning(f"Admin stat counters drifted, corrected: {drift}")
+        return {"drift": drift} if drift else {}
+
+
+# ORM hooks keeping the counters in step with the rows they count. Bulk
+# UPDATE/DELETE statements bypass them and must call adjust_stats.
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    adjust_stats(connection, {
+        TOTAL_USERS: 1,
+        VERIFIED_USERS: 1 if target.is_verified else 0,
+        ADMIN_USERS: 1 if target.is_admin else 0
+    })
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    adjust_stats(connection, {
+        TOTAL_USERS: -1,
+        VERIFIED_USERS: -1 if target.is_verified else 0,
+        ADMIN_USERS: -1 if target.is_admin else 0
+    })
+
+
+def _flag_delta(target, name: str) -> int:
+    history = attributes.get_history(target, name)
+    if not history.has_changes():
+        return 0
+    was = bool(history.deleted[0]) if history.deleted else False
+    now = bool(getattr(target, name))
+    return int(now) - int(was)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    adjust_stats(connection, {
+        VERIFIED_USERS: _flag_delta(target, "is_verified"),
+        ADMIN_USERS: _flag_delta(target, "is_admin")
+    })
+
+
+@event.listens_for(Offer, "after_insert")
+def _offer_inserted(mapper, connection, target):
+    adjust_stats(connection, {TOTAL_OFFERS: 1, ACTIVE_OFFERS: 1 if target.is_active else 0})
+
+
+@event.listens_for(Offer, "after_delete")
+def _offer_deleted(mapper, connection, target):
+    adjust_stats(connection, {TOTAL_OFFERS: -1, ACTIVE_OFFERS: -1 if target.is_active else 0})
+
+
+@event.listens_for(Offer, "after_update")
+def _offer_updated(mapper, connection, target):
+    adjust_stats(connection, {ACTIVE_OFFERS: _flag_delta(target, "is_active")})
+
+
+admin_stats = AdminStatsService(settings.admin_stats_max_staleness_seconds)
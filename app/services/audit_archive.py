@@ -0,0 +1,325 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import Column, MetaData, Table, and_, delete, func, insert, inspect, select, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import AdminAction
+
+logger = logging.getLogger(__name__)
+
+HOT_TABLE = AdminAction.__tablename__
+# Monthly partitions on PostgreSQL, rolled tables elsewhere: admin_actions_YYYYMM
+MONTH_TABLE = re.compile(rf"^{HOT_TABLE}_(\d{{6}})$")
+MANIFEST = "manifest.json"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the DB comparisons
+
+
+def month_start(value: datetime) -> datetime:
+    return _naive_utc(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def month_table_name(month: datetime) -> str:
+    return f"{HOT_TABLE}_{month:%Y%m}"
+
+
+class AuditArchive:
+    """Keeps ``admin_actions`` small by splitting it by month and archiving old months.
+
+    When the table is natively partitioned (PostgreSQL, after the migration)
+    it is ``PARTITION BY RANGE (created_at)`` with one partition per month;
+    ``run`` creates partitions ``partitions_ahead`` months ahead. Anywhere
+    else (SQLite) ``run`` moves rows older than ``hot_days`` out of the hot
+    table into rolled ``admin_actions_YYYYMM`` tables.
+
+    With an ``archive_dir``, months that ended more than
+    ``archive_after_days`` ago are detached (partitions), written to a
+    gzip-compressed NDJSON file, listed in ``manifest.json`` and dropped.
+    ``history`` reads the database tables and the archive files together.
+    """
+
+    def __init__(self, hot_days: int, archive_after_days: int, partitions_ahead: int,
+                 archive_dir: Optional[str] = None):
+        self.hot_days = hot_days
+        self.archive_after_days = archive_after_days
+        self.partitions_ahead = partitions_ahead
+        self.archive_dir = archive_dir or None
+        self._metadata = MetaData()
+        self._partitioned: Optional[bool] = None
+
+    def _month_table(self, name: str) -> Table:
+        table = self._metadata.tables.get(name)
+        if table is None:
+            # Same columns as the hot table, without its foreign key and indexes
+            table = Table(name, self._metadata, *[
+                Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                for column in AdminAction.__table__.columns
+            ])
+        return table
+
+    def is_partitioned(self, db: Session) -> bool:
+        if self._partitioned is None:
+            self._partitioned = db.bind.dialect.name == "postgresql" and bool(db.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:name AS regclass))"
+            ), {"name": HOT_TABLE}).scalar())
+        return self._partitioned
+
+    def _partitions(self, db: Session) -> Dict[datetime, str]:
+        """Attached monthly partitions by month"""
+        rows = db.execute(text(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE pg_inherits.inhparent = CAST(:name AS regclass)"
+        ), {"name": HOT_TABLE}).scalars()
+        return self._by_month(rows)
+
+    def _by_month(self, names) -> Dict[datetime, str]:
+        months = {}
+        for name in names:
+            match = MONTH_TABLE.match(name)
+            if match:
+                months[datetime.strptime(match.group(1), "%Y%m")] = name
+        return months
+
+    def rolled_tables(self, db: Session) -> Dict[datetime, str]:
+        """Monthly tables outside the hot table: rolled tables, or partitions detached for archiving"""
+        months = self._by_month(inspect(db.connection()).get_table_names())
+        if self.is_partitioned(db):
+            attached = set(self._partitions(db).values())
+            months = {month: name for month, name in months.items() if name not in attached}
+        return months
+
+    def _create_partitions(self, db: Session, now: datetime) -> int:
+        existing = self._partitions(db)
+        created = 0
+        month = month_start(now)
+        for _ in range(self.partitions_ahead + 1):
+            if month not in existing:
+                try:
+                    db.execute(text(
+                        f"CREATE TABLE {month_table_name(month)} PARTITION OF {HOT_TABLE} "
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{next_month(month):%Y-%m-%d} 00:00:00+00')"
+                    ))
+                    db.commit()
+                    created += 1
+                except Exception as e:
+                    # e.g. rows for that month already sit in the default partition
+                    logger.error(f"Error creating audit partition for {month:%Y-%m}: {e}")
+                    db.rollback()
+            month = next_month(month)
+        return created
+
+    def _detach(self, db: Session, cutoff: datetime) -> int:
+        detached = 0
+        for month, name in sorted(self._partitions(db).items()):
+            if next_month(month) > cutoff:
+                break
+            db.execute(text(f"ALTER TABLE {HOT_TABLE} DETACH PARTITION {name}"))
+            db.commit()
+            detached += 1
+        return detached
+
+    def _roll(self, db: Session, cutoff: datetime) -> int:
+        """Move rows older than the cutoff into their month's rolled table"""
+        hot = AdminAction.__table__
+        columns = [column.name for column in hot.columns]
+        moved = 0
+        while True:
+            # Each pass empties the oldest month, so this walks only months that have rows
+            oldest = db.query(func.min(AdminAction.created_at)).filter(AdminAction.created_at < cutoff).scalar()
+            if oldest is None:
+                break
+            month = month_start(oldest)
+            window = and_(hot.c.created_at >= month, hot.c.created_at < min(next_month(month), cutoff))
+            table = self._month_table(month_table_name(month))
+            try:
+                table.create(db.connection(), checkfirst=True)
+                db.execute(insert(table).from_select(columns, select(*hot.columns).where(window)))
+                moved += db.execute(delete(hot).where(window)).rowcount
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error rolling audit log for {month:%Y-%m}: {e}")
+                db.rollback()
+                break
+        return moved
+
+    def _read_manifest(self) -> Dict:
+        path = os.path.join(self.archive_dir, MANIFEST)
+        if not os.path.exists(path):
+            return {"files": []}
+        with open(path, encoding="utf-8") as manifest:
+            return json.load(manifest)
+
+    def _write_manifest(self, manifest: Dict):
+        path = os.path.join(self.archive_dir, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as temporary:
+            json.dump(manifest, temporary, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _export(self, db: Session, month: datetime, name: str) -> Dict:
+        """Write a monthly table to a new archive file and return its manifest entry"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stem = f"{HOT_TABLE}-{month:%Y%m}"
+        filename, attempt = f"{stem}.ndjson.gz", 1
+        # A month archived again (late entries) gets a second file; readers dedupe by id
+        while os.path.exists(os.path.join(self.archive_dir, filename)):
+            attempt += 1
+            filename = f"{stem}-{attempt}.ndjson.gz"
+        path = os.path.join(self.archive_dir, filename)
+
+        table = self._month_table(name)
+        rows, first_id, last_id = 0, None, None
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as archive:
+            query = select(table).order_by(table.c.created_at, table.c.id).execution_options(yield_per=1000)
+            for row in db.execute(query):
+                archive.write(json.dumps({
+                    "id": row.id,
+                    "admin_user_id": row.admin_user_id,
+                    "action_type": row.action_type,
+                    "resource_type": row.resource_type,
+                    "resource_id": row.resource_id,
+                    "details": row.details,
+                    "created_at": _naive_utc(row.created_at).isoformat() if row.created_at else None
+                }) + "\n")
+                rows += 1
+                first_id = row.id if first_id is None else min(first_id, row.id)
+                last_id = row.id if last_id is None else max(last_id, row.id)
+        digest = hashlib.sha256()
+        with open(path + ".tmp", "rb") as archive:
+            for block in iter(lambda: archive.read(1 << 20), b""):
+                digest.update(block)
+        os.replace(path + ".tmp", path)
+        return {
+            "file": filename,
+            "table": name,
+            "start": month.isoformat(),
+            "end": next_month(month).isoformat(),
+            "rows": rows,
+            "first_id": first_id,
+            "last_id": last_id,
+            "sha256": digest.hexdigest(),
+            "archived_at": _utcnow().isoformat()
+        }
+
+    def _archive(self, db: Session, cutoff: datetime) -> int:
+        archived = 0
+        for month, name in sorted(self.rolled_tables(db).items()):
+            if next_month(month) > cutoff:
+                break
+            table = self._month_table(name)
+            try:
+                if db.query(table).first() is not None:
+                    entry = self._export(db, month, name)
+                    manifest = self._read_manifest()
+                    manifest["files"].append(entry)
+                    self._write_manifest(manifest)
+                    archived += entry["rows"]
+                # Dropped only once the file is listed in the manifest
+                table.drop(db.connection())
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error archiving audit log table {name}: {e}")
+                db.rollback()
+                break
+        return archived
+
+    def run(self, db: Session) -> Dict:
+        now = _utcnow()
+        stats = {}
+        if self.is_partitioned(db):
+            stats["partitions_created"] = self._create_partitions(db, now)
+        else:
+            stats["rolled"] = self._roll(db, now - timedelta(days=self.hot_days))
+        if self.archive_dir:
+            cutoff = now - timedelta(days=self.archive_after_days)
+            if self.is_partitioned(db):
+                stats["partitions_detached"] = self._detach(db, cutoff)
+            stats["archived"] = self._archive(db, cutoff)
+        return {name: value for name, value in stats.items() if value}
+
+    def _matches(self, row: Dict, start: Optional[datetime], end: Optional[datetime], filters: Dict) -> bool:
+        if start is not None and row["created_at"] < start:
+            return False
+        if end is not None and row["created_at"] >= end:
+            return False
+        return all(row[name] == value for name, value in filters.items())
+
+    def history(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                limit: int = 100, **filters) -> List[Dict]:
+        """Actions in ``[start, end)``, newest first, from the database and then the archive.
+
+        ``filters`` are exact matches on ``admin_user_id``, ``action_type``
+        or ``resource_type``; ``None`` values are ignored.
+        """
+        start = _naive_utc(start) if start else None
+        end = _naive_utc(end) if end else None
+        filters = {name: value for name, value in filters.items() if value is not None}
+
+        tables = [AdminAction.__table__] + [
+            self._month_table(name) for month, name in self.rolled_tables(db).items()
+            if (end is None or month < end) and (start is None or next_month(month) > start)
+        ]
+        results = []
+        for table in tables:
+            conditions = [table.c[name] == value for name, value in filters.items()]
+            if start is not None:
+                conditions.append(table.c.created_at >= start)
+            if end is not None:
+                conditions.append(table.c.created_at < end)
+            query = select(table).where(*conditions).order_by(
+                table.c.created_at.desc(), table.c.id.desc()
+            ).limit(limit)
+            for row in db.execute(query):
+                entry = dict(row._mapping)
+                entry["created_at"] = _naive_utc(entry["created_at"])
+                entry["archived"] = False
+                results.append(entry)
+        results.sort(key=lambda entry: (entry["created_at"], entry["id"]), reverse=True)
+
+        if self.archive_dir:
+            files = [
+                entry for entry in self._read_manifest()["files"]
+                if (end is None or datetime.fromisoformat(entry["start"]) < end)
+                and (start is None or datetime.fromisoformat(entry["end"]) > start)
+            ]
+            seen = {entry["id"] for entry in results}
+            for entry in sorted(files, key=lambda entry: entry["start"], reverse=True):
+                if len(results) >= limit and results[limit - 1]["created_at"] >= datetime.fromisoformat(entry["end"]):
+                    break  # Everything in this file and older ones is past the page
+                with gzip.open(os.path.join(self.archive_dir, entry["file"]), "rt", encoding="utf-8") as archive:
+                    for line in archive:
+                        row = json.loads(line)
+                        row["created_at"] = datetime.fromisoformat(row["created_at"])
+                        if row["id"] not in seen and self._matches(row, start, end, filters):
+                            row["archived"] = True
+                            results.append(row)
+                            seen.add(row["id"])
+                results.sort(key=lambda entry: (entry["created_at"], entry["id"]), reverse=True)
+                del results[limit:]
+        return results[:limit]
+
+
+audit_archive = AuditArchive(
+    settings.audit_hot_days,
+    settings.audit_archive_after_days,
+    settings.audit_partitions_ahead,
+    settings.audit_archive_dir
+)
@@ -0,0 +1,107 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AdminAction
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Writes admin audit entries to ``admin_actions`` without commits of their own.
+
+    ``record`` adds the entry to the caller's transaction, for changes whose
+    audit entry must exist exactly when the change does (deletes, bulk
+    actions). ``enqueue`` queues the entry in memory and the per-worker
+    flush job writes queued entries ``batch_size`` rows per executemany
+    INSERT. Entries keep the time they were made, not the time of the flush.
+
+    The queue is bounded by backpressure: a caller that fills it to
+    ``max_queued`` flushes it before returning. Entries that fail to write
+    go back to the front of the queue for the next scheduled flush; until
+    one succeeds, entries that arrive at a full queue are dropped and
+    counted rather than flushed again on every call.
+    """
+
+    def __init__(self, batch_size: int, max_queued: int):
+        self.batch_size = batch_size
+        self.max_queued = max_queued
+        self._queue: Deque[Dict] = deque()
+        self._failing = False
+        self._dropped = 0
+        self._lock = threading.Lock()
+        # One flush at a time, so entries are written in the order they were made
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _entry(self, admin_user_id: int, action_type: str, resource_type: str, resource_id: int,
+               details: Optional[Dict]) -> Dict:
+        return {
+            "admin_user_id": admin_user_id,
+            "action_type": action_type,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details or None,
+            "created_at": datetime.now(timezone.utc)
+        }
+
+    def record(self, db: Session, admin_user_id: int, action_type: str, resource_type: str,
+               resource_id: int, details: Optional[Dict] = None):
+        """Add an entry to the caller's transaction; it commits or rolls back with the change"""
+        db.add(AdminAction(**self._entry(admin_user_id, action_type, resource_type, resource_id, details)))
+
+    def enqueue(self, admin_user_id: int, action_type: str, resource_type: str,
+                resource_id: int, details: Optional[Dict] = None):
+        """Queue an entry for the next batched flush"""
+        entry = self._entry(admin_user_id, action_type, resource_type, resource_id, details)
+        with self._lock:
+            if self._failing and len(self._queue) >= self.max_queued:
+                self._dropped += 1
+                if self._dropped == 1:
+                    logger.error("Audit log queue full after a failed flush; dropping entries until a flush succeeds")
+                return
+            self._queue.append(entry)
+            full = len(self._queue) >= self.max_queued
+        if full:
+            db = SessionLocal()
+            try:
+                self.flush(db)
+            finally:
+                db.close()
+
+    def flush(self, db: Session) -> Dict:
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    break
+                try:
+                    db.execute(insert(AdminAction), batch)
+                    db.commit()
+                except Exception as e:
+                    logger.error(f"Error writing {len(batch)} audit log entries: {e}")
+                    db.rollback()
+                    with self._lock:
+                        self._queue.extendleft(reversed(batch))
+                        self._failing = True
+                    break
+                written += len(batch)
+                with self._lock:
+                    if self._failing:
+                        self._failing = False
+                        if self._dropped:
+                            logger.error(f"Audit log writes recovered; {self._dropped} entries were dropped")
+                        self._dropped = 0
+        return {"written": written} if written else {}
+
+
+audit_log = AuditLogWriter(settings.audit_batch_size, settings.audit_max_queued)
@@ -0,0 +1,269 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.models import Notification, Offer, PushSubscription, User, UserLike, VerificationCode
+from app.schemas import OfferBulkFilter, UserBulkFilter
+from app.services.admin_stats import (
+    admin_stats, adjust_stats, ACTIVE_OFFERS, ADMIN_USERS, TOTAL_DISLIKES, TOTAL_LIKES,
+    TOTAL_OFFERS, TOTAL_USERS, VERIFIED_USERS
+)
+from app.services.audit_log import audit_log
+from app.services.offer_changes import record_changes
+from app.services.offer_lifecycle import offer_lifecycle, starts_in_future, UPDATE, DEACTIVATE, REMOVE
+from app.services.trending import trending_engine, LIKE
+
+logger = logging.getLogger(__name__)
+
+# Affected IDs recorded in an audit entry; the count is always exact
+MAX_AUDITED_IDS = 1000
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def offer_conditions(filters: OfferBulkFilter) -> List:
+    conditions = []
+    if filters.ids is not None:
+        conditions.append(Offer.id.in_(filters.ids))
+    if filters.provider_name is not None:
+        conditions.append(Offer.provider_name == filters.provider_name)
+    if filters.category is not None:
+        conditions.append(Offer.category == filters.category)
+    if filters.is_active is not None:
+        conditions.append(Offer.is_active == filters.is_active)
+    if filters.expires_before is not None:
+        conditions.append(Offer.expiry_date < _naive_utc(filters.expires_before))
+    if filters.expires_after is not None:
+        conditions.append(Offer.expiry_date >= _naive_utc(filters.expires_after))
+    return conditions
+
+
+def user_conditions(filters: UserBulkFilter) -> List:
+    conditions = []
+    if filters.ids is not None:
+        conditions.append(User.id.in_(filters.ids))
+    if filters.is_active is not None:
+        conditions.append(User.is_active == filters.is_active)
+    if filters.is_verified is not None:
+        conditions.append(User.is_verified == filters.is_verified)
+    if filters.created_before is not None:
+        conditions.append(User.created_at < _naive_utc(filters.created_before))
+    if filters.created_after is not None:
+        conditions.append(User.created_at >= _naive_utc(filters.created_after))
+    return conditions
+
+
+class BulkAdminService:
+    """Filter-based admin mutations of offers and users.
+
+    Each call is one set-based ``UPDATE`` or ``DELETE ... RETURNING`` in one
+    transaction, together with the dashboard counter adjustments (the ORM
+    events do not see set-based statements), the offer change log entries
+    and a single ``bulk_*`` admin action. Lifecycle hooks fire once for
+    all affected offers after the commit. Acting admins never change
+    themselves, and admins are never deactivated or deleted in bulk.
+    """
+
+    def _audit(self, db: Session, admin_user_id: int, action_type: str, resource_type: str,
+               ids: List[int], details: Dict):
+        # A bulk action has no single resource; the IDs are in details
+        audit_log.record(db, admin_user_id, action_type, resource_type, 0, {
+            "count": len(ids), "ids": ids[:MAX_AUDITED_IDS], **details
+        })
+
+    def _flag_delta(self, db: Session, model, conditions: List, name: str, changes: Dict) -> int:
+        """Change in the number of rows with a boolean column set, before the update runs"""
+        if name not in changes or changes[name] is None:
+            return 0
+        flag = bool(changes[name])
+        flipped = db.query(func.count(model.id)).filter(*conditions, getattr(model, name) != flag).scalar()
+        return flipped if flag else -flipped
+
+    def _uncount_swipes(self, db: Session, swipes: Counter):
+        """Take deleted ``(offer_id, action)`` swipes off the offer counters, one executemany UPDATE"""
+        totals: Dict[int, List[int]] = {}
+        for (offer_id, action), count in swipes.items():
+            totals.setdefault(offer_id, [0, 0])[0 if action == LIKE else 1] += count
+        if not totals:
+            return
+        offers = Offer.__table__
+        db.execute(
+            update(offers)
+            .where(offers.c.id == bindparam("b_id"))
+            .values(
+                like_count=offers.c.like_count - bindparam("b_likes"),
+                dislike_count=offers.c.dislike_count - bindparam("b_dislikes"),
+                # Counter changes are not edits; keep the onupdate timestamp untouched
+                updated_at=offers.c.updated_at
+            ),
+            [{"b_id": offer_id, "b_likes": likes, "b_dislikes": dislikes} for offer_id, (likes, dislikes) in totals.items()]
+        )
+
+    def _shifted(self, db: Session, column, hours: float):
+        if db.bind.dialect.name == "sqlite":
+            # Keep the format SQLAlchemy stores SQLite datetimes in
+            return func.strftime("%Y-%m-%d %H:%M:%f", column, f"{hours:+} hours")
+        return column + timedelta(hours=hours)
+
+    def update_offers(self, db: Session, admin_user_id: int, filters: OfferBulkFilter, changes: Dict,
+                      extend_expiry_hours: Optional[float] = None, action_type: str = "bulk_update") -> int:
+        conditions = offer_conditions(filters)
+        values = dict(changes)
+        flags = changes
+        if starts_in_future(changes.get("starts_at")):
+            # Live and scheduled offers wait for the new go-live; deactivated ones stay off
+            values["pending_activation"] = (
+                bool(changes["is_active"]) if "is_active" in changes
+                else or_(Offer.is_active == True, Offer.pending_activation == True)
+            )
+            values["is_active"] = False
+            flags = {**changes, "is_active": False}
+        elif "is_active" in changes:
+            # An explicit activation or deactivation replaces a scheduled go-live
+            values["pending_activation"] = False
+        if extend_expiry_hours:
+            values["expiry_date"] = self._shifted(db, Offer.expiry_date, extend_expiry_hours)
+        values["updated_at"] = datetime.now(timezone.utc)
+        try:
+            active_delta = self._flag_delta(db, Offer, conditions, "is_active", flags)
+            offers = db.execute(
+                update(Offer).where(*conditions).values(**values)
+                .returning(Offer.id, Offer.is_active, Offer.pending_activation, Offer.starts_at, Offer.expiry_date)
+                .execution_options(synchronize_session=False)
+            ).all()
+            adjust_stats(db, {ACTIVE_OFFERS: active_delta})
+            record_changes(db, [offer.id for offer in offers])
+            self._audit(db, admin_user_id, action_type, "offer", [offer.id for offer in offers], {
+                "filter": filters.model_dump(mode="json", exclude_none=True),
+                "updated_fields": list(changes) + (["expiry_date"] if extend_expiry_hours else []),
+                "extend_expiry_hours": extend_expiry_hours
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for offer in offers:
+            offer_lifecycle.schedule(offer)
+        offer_lifecycle.fire_hooks(UPDATE, [offer.id for offer in offers if offer.is_active])
+        offer_lifecycle.fire_hooks(DEACTIVATE, [offer.id for offer in offers if not offer.is_active])
+        admin_stats.invalidate()
+        return len(offers)
+
+    def deactivate_offers(self, db: Session, admin_user_id: int, filters: OfferBulkFilter) -> int:
+        return self.update_offers(db, admin_user_id, filters, {"is_active": False}, action_type="bulk_deactivate")
+
+    def delete_offers(self, db: Session, admin_user_id: int, filters: OfferBulkFilter) -> int:
+        conditions = offer_conditions(filters)
+        matched = select(Offer.id).where(*conditions)
+        try:
+            # Swipes and notifications reference offers without ON DELETE CASCADE
+            swipes = dict(db.query(UserLike.action, func.count(UserLike.id)).filter(
+                UserLike.offer_id.in_(matched)
+            ).group_by(UserLike.action).all())
+            db.execute(delete(UserLike).where(UserLike.offer_id.in_(matched)))
+            db.execute(delete(Notification).where(Notification.offer_id.in_(matched)))
+            offers = db.execute(
+                delete(Offer).where(*conditions).returning(Offer.id, Offer.is_active)
+                .execution_options(synchronize_session=False)
+            ).all()
+            adjust_stats(db, {
+                TOTAL_OFFERS: -len(offers),
+                ACTIVE_OFFERS: -sum(1 for offer in offers if offer.is_active),
+                TOTAL_LIKES: -swipes.get("like", 0),
+                TOTAL_DISLIKES: -swipes.get("dislike", 0)
+            })
+            ids = [offer.id for offer in offers]
+            record_changes(db, ids)
+            self._audit(db, admin_user_id, "bulk_delete", "offer", ids, {
+                "filter": filters.model_dump(mode="json", exclude_none=True)
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for offer_id in ids:
+            offer_lifecycle.unschedule(offer_id)
+        offer_lifecycle.fire_hooks(REMOVE, ids)
+        admin_stats.invalidate()
+        return len(ids)
+
+    def update_users(self, db: Session, admin_user_id: int, filters: UserBulkFilter, changes: Dict,
+                     exclude_admins: bool = False, action_type: str = "bulk_update") -> int:
+        conditions = user_conditions(filters) + [User.id != admin_user_id]
+        if exclude_admins:
+            conditions.append(User.is_admin == False)
+        values = dict(changes, updated_at=datetime.now(timezone.utc))
+        try:
+            deltas = {
+                VERIFIED_USERS: self._flag_delta(db, User, conditions, "is_verified", changes),
+                ADMIN_USERS: self._flag_delta(db, User, conditions, "is_admin", changes)
+            }
+            ids = list(db.execute(
+                update(User).where(*conditions).values(**values).returning(User.id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+            adjust_stats(db, deltas)
+            self._audit(db, admin_user_id, action_type, "user", ids, {
+                "filter": filters.model_dump(mode="json", exclude_none=True),
+                "updated_fields": list(changes)
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        admin_stats.invalidate()
+        return len(ids)
+
+    def deactivate_users(self, db: Session, admin_user_id: int, filters: UserBulkFilter) -> int:
+        return self.update_users(
+            db, admin_user_id, filters, {"is_active": False}, exclude_admins=True, action_type="bulk_deactivate"
+        )
+
+    def delete_users(self, db: Session, admin_user_id: int, filters: UserBulkFilter) -> int:
+        conditions = user_conditions(filters) + [User.id != admin_user_id, User.is_admin == False]
+        matched = select(User.id).where(*conditions)
+        try:
+            removed = db.execute(
+                delete(UserLike).where(UserLike.user_id.in_(matched))
+                .returning(UserLike.offer_id, UserLike.action, UserLike.created_at)
+                .execution_options(synchronize_session=False)
+            ).all()
+            swipes = Counter((row.offer_id, row.action) for row in removed)
+            self._uncount_swipes(db, swipes)
+            for model in (Notification, PushSubscription, VerificationCode):
+                db.execute(delete(model).where(model.user_id.in_(matched)))
+            users = db.execute(
+                delete(User).where(*conditions).returning(User.id, User.is_verified)
+                .execution_options(synchronize_session=False)
+            ).all()
+            adjust_stats(db, {
+                TOTAL_USERS: -len(users),
+                VERIFIED_USERS: -sum(1 for user in users if user.is_verified),
+                TOTAL_LIKES: -sum(count for (_, action), count in swipes.items() if action == LIKE),
+                TOTAL_DISLIKES: -sum(count for (_, action), count in swipes.items() if action != LIKE)
+            })
+            ids = [user.id for user in users]
+            self._audit(db, admin_user_id, "bulk_delete", "user", ids, {
+                "filter": filters.model_dump(mode="json", exclude_none=True)
+            })
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for row in removed:
+            trending_engine.record(row.offer_id, row.action, -1, at=row.created_at)
+        admin_stats.invalidate()
+        return len(ids)
+
+
+bulk_admin = BulkAdminService()
@@ -0,0 +1,152 @@
+import enum
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.services.exports import DATASETS
+from app.services.rollups import get_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+# Append-only sources exported by ID, under the admin export column lists
+SOURCES = ("swipes", "notifications", "users")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _arrow_type(pa, column):
+    sql_type = column.type
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()  # String, Text and Enum (stored by value)
+
+
+def part_name(after_id: int) -> str:
+    # Named by the watermark a batch starts from, so a retried batch overwrites its own files
+    return f"part-{after_id + 1:012d}.parquet"
+
+
+class ChangeExporter:
+    """Exports new swipes, notifications and users as date-partitioned Parquet.
+
+    Each source is read by primary key past its own ``export:<source>``
+    watermark in ``rollup_watermarks``, ``batch_size`` rows at a time, so a
+    run costs only as much as the rows added since the last one. A batch is
+    split by the UTC day of its timestamp into
+    ``<export_dir>/<source>/date=YYYY-MM-DD/part-<first id>.parquet``
+    (Hive-style, so DuckDB, Spark and ``pyarrow.dataset`` prune by date),
+    and the watermark commits only after its files are in place.
+
+    A batch that fails before its watermark commits is retried from the
+    same watermark, and since file names come from that watermark the retry
+    replaces the earlier files instead of duplicating rows. Rows newer than
+    ``lag_seconds`` wait for the next run, so IDs that commit out of order
+    are not skipped. Files are sorted by ID and carry per-row-group min/max
+    statistics; pyarrow is imported only when an export directory is set.
+    """
+
+    def __init__(self, export_dir: Optional[str], batch_size: int, max_batches: int,
+                 lag_seconds: int, compression: str = "zstd"):
+        self.export_dir = export_dir or None
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.lag_seconds = lag_seconds
+        self.compression = compression
+
+    def _write(self, source: str, day: date, after_id: int, rows: List) -> str:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns, _ = DATASETS[source]
+        schema = pa.schema([pa.field(column.key, _arrow_type(pa, column)) for column in columns])
+        data = {
+            column.key: [
+                value.value if isinstance(value, enum.Enum) else value
+                for value in (row[index] for row in rows)
+            ]
+            for index, column in enumerate(columns)
+        }
+        directory = os.path.join(self.export_dir, source, f"date={day.isoformat()}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, part_name(after_id))
+        pq.write_table(
+            pa.Table.from_pydict(data, schema=schema), path + ".tmp",
+            compression=self.compression, write_statistics=True
+        )
+        os.replace(path + ".tmp", path)
+        return path
+
+    def _export(self, db: Session, source: str, cutoff: datetime, max_batches: Optional[int]) -> int:
+        columns, timestamp = DATASETS[source]
+        key = columns[0]
+        name = f"export:{source}"
+        exported = batches = 0
+        while max_batches is None or batches < max_batches:
+            after_id = get_watermark(db, name)
+            rows = db.execute(
+                select(*columns, timestamp.label("_partition_time"))
+                .where(key > after_id).order_by(key).limit(self.batch_size)
+            ).all()
+            ready = []
+            for row in rows:
+                if row._partition_time is None or _naive_utc(row._partition_time) > cutoff:
+                    break
+                ready.append(row)
+            if not ready:
+                break
+
+            by_day = defaultdict(list)
+            for row in ready:
+                by_day[_naive_utc(row._partition_time).date()].append(row)
+            for day, day_rows in sorted(by_day.items()):
+                self._write(source, day, after_id, day_rows)
+            set_watermark(db, name, ready[-1][0])
+            db.commit()
+            exported += len(ready)
+            batches += 1
+            if len(ready) < self.batch_size:
+                break
+        return exported
+
+    def _run(self, db: Session, max_batches: Optional[int]) -> Dict:
+        if not self.export_dir:
+            return {}
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.lag_seconds)
+        result = {}
+        for source in SOURCES:
+            try:
+                result[source] = self._export(db, source, cutoff, max_batches)
+            except Exception as e:
+                logger.error(f"Error exporting {source} changes: {e}")
+                db.rollback()
+        return {source: count for source, count in result.items() if count}
+
+    def run(self, db: Session) -> Dict:
+        return self._run(db, self.max_batches)
+
+    def catch_up(self, db: Session) -> Dict:
+        """Export everything past the watermarks, however many batches it takes"""
+        return self._run(db, None)
+
+
+change_exporter = ChangeExporter(
+    settings.change_export_dir,
+    settings.change_export_batch_size,
+    settings.change_export_max_batches,
+    settings.rollup_lag_seconds,
+    settings.change_export_compression
+)
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import Float, and_, cast, func
+from sqlalchemy.orm import Session
+from app.models import Offer, OfferCategory, OfferDailyStat
+from app.services.rollups import bucket_start, DAY
+
+GROUP_BY = ("offer", "provider", "category")
+SORT_FIELDS = ("impressions", "likes", "dislikes", "like_rate")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ConversionReport:
+    """Impressions, likes, dislikes and like rate per offer, provider or category.
+
+    Reads only ``offer_daily_stats`` (one row per offer per day), so the cost
+    depends on the number of offers and days in the range, not on the number
+    of swipes. Like rate is likes per impression.
+    """
+
+    def report(self, db: Session, group_by: str, start: datetime, end: datetime,
+               sort: str = "like_rate", descending: bool = True, limit: int = 50,
+               category: Optional[OfferCategory] = None, provider: Optional[str] = None,
+               min_impressions: int = 0) -> List[Dict]:
+        stat = OfferDailyStat
+        impressions = func.sum(stat.impressions)
+        likes = func.sum(stat.likes)
+        dislikes = func.sum(stat.dislikes)
+        like_rate = func.coalesce(cast(likes, Float) / func.nullif(impressions, 0), 0.0)
+
+        if group_by == "offer":
+            keys = [stat.offer_id, Offer.title, Offer.provider_name, Offer.category]
+        elif group_by == "provider":
+            keys = [Offer.provider_name]
+        else:
+            keys = [Offer.category]
+
+        # Whole days overlapping [start, end)
+        filters = [stat.day >= bucket_start(start, DAY), stat.day < _naive_utc(end)]
+        if category:
+            filters.append(Offer.category == category)
+        if provider:
+            filters.append(Offer.provider_name == provider)
+
+        query = db.query(
+            *keys,
+            impressions.label("impressions"),
+            likes.label("likes"),
+            dislikes.label("dislikes"),
+            like_rate.label("like_rate")
+        ).join(Offer, Offer.id == stat.offer_id).filter(and_(*filters)).group_by(*keys)
+        if min_impressions:
+            query = query.having(impressions >= min_impressions)
+
+        order = {"impressions": impressions, "likes": likes, "dislikes": dislikes, "like_rate": like_rate}[sort]
+        query = query.order_by(order.desc() if descending else order.asc(), keys[0])
+
+        results = []
+        for row in query.limit(limit).all():
+            if group_by == "offer":
+                key = str(row.offer_id)
+            elif group_by == "provider":
+                key = row.provider_name or ""
+            else:
+                key = row.category.value if row.category else ""
+            results.append({
+                "key": key,
+                "offer_id": row.offer_id if group_by == "offer" else None,
+                "title": row.title if group_by == "offer" else None,
+                "provider_name": row.provider_name if group_by != "category" else None,
+                "category": row.category if group_by != "provider" else None,
+                "impressions": int(row.impressions or 0),
+                "likes": int(row.likes or 0),
+                "dislikes": int(row.dislikes or 0),
+                "like_rate": round(float(row.like_rate or 0), 4)
+            })
+        return results
+
+
+conversion_report = ConversionReport()
@@ -0,0 +1,148 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import and_, bindparam, exists, func, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Offer, UserLike
+from app.services.admin_stats import adjust_stats, TOTAL_LIKES, TOTAL_DISLIKES
+from app.services.rollups import add_offer_daily_stats, bucket_start, DAY
+
+logger = logging.getLogger(__name__)
+
+LIKE = "like"
+DISLIKE = "dislike"
+IMPRESSION = "impression"
+_FIELDS = (LIKE, DISLIKE, IMPRESSION)
+
+
+class EngagementCounter:
+    """Accumulates like/dislike/impression deltas per offer in memory.
+
+    Swipes only touch a dict; ``flush`` applies the summed deltas with one
+    executemany UPDATE, so a viral offer costs one row update per flush
+    instead of one per swipe. Each worker holds its own accumulator, so the
+    flush runs on every worker. Impressions are also added to the current
+    day in ``offer_daily_stats``; likes and dislikes reach that table through
+    the rollup job instead, which reads them from ``user_likes``.
+
+    Removing a swipe adjusts the counters in its own transaction through
+    ``apply`` instead, so ``reconcile`` can tell from ``user_likes`` alone
+    which offers may still have deltas waiting in some worker.
+    """
+
+    def __init__(self, quiet_seconds: int):
+        self.quiet_seconds = quiet_seconds
+        self._deltas: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, offer_id: int, kind: str, amount: int = 1):
+        index = _FIELDS.index(kind)
+        with self._lock:
+            deltas = self._deltas.get(offer_id)
+            if deltas is None:
+                deltas = self._deltas[offer_id] = [0, 0, 0]
+            deltas[index] += amount
+
+    def apply(self, db: Session, offer_id: int, kind: str, amount: int):
+        """Adjust a like/dislike counter in the caller's transaction, bypassing the accumulator"""
+        column = "like_count" if kind == LIKE else "dislike_count"
+        db.execute(
+            update(Offer.__table__)
+            .where(Offer.__table__.c.id == offer_id)
+            .values({column: Offer.__table__.c[column] + amount, "updated_at": Offer.__table__.c.updated_at})
+        )
+        adjust_stats(db, {TOTAL_LIKES if kind == LIKE else TOTAL_DISLIKES: amount})
+
+    def flush(self, db: Session) -> Dict:
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        rows = [
+            {"b_id": offer_id, "b_likes": likes, "b_dislikes": dislikes, "b_impressions": impressions}
+            for offer_id, (likes, dislikes, impressions) in deltas.items()
+            if likes or dislikes or impressions
+        ]
+        if not rows:
+            return {}
+
+        try:
+            db.execute(
+                update(Offer.__table__)
+                .where(Offer.__table__.c.id == bindparam("b_id"))
+                .values(
+                    like_count=Offer.__table__.c.like_count + bindparam("b_likes"),
+                    dislike_count=Offer.__table__.c.dislike_count + bindparam("b_dislikes"),
+                    impression_count=Offer.__table__.c.impression_count + bindparam("b_impressions"),
+                    # Counter bumps are not edits; keep the onupdate timestamp untouched
+                    updated_at=Offer.__table__.c.updated_at
+                ),
+                rows
+            )
+            adjust_stats(db, {
+                TOTAL_LIKES: sum(row["b_likes"] for row in rows),
+                TOTAL_DISLIKES: sum(row["b_dislikes"] for row in rows)
+            })
+            day = bucket_start(datetime.now(timezone.utc), DAY)
+            add_offer_daily_stats(db, {
+                (row["b_id"], day): [row["b_impressions"], 0, 0]
+                for row in rows if row["b_impressions"] > 0
+            })
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error flushing engagement counters: {e}")
+            db.rollback()
+            # Merge back so the next flush retries
+            with self._lock:
+                for offer_id, values in deltas.items():
+                    current = self._deltas.setdefault(offer_id, [0, 0, 0])
+                    for index, value in enumerate(values):
+                        current[index] += value
+            return {}
+
+        return {"offers": len(rows)}
+
+    def reconcile(self, db: Session, batch_size: int = 1000) -> Dict:
+        """Recount like/dislike counters from user_likes, one batch of offers at a time.
+
+        Only offers without swipes in the last ``quiet_seconds`` are touched:
+        every worker flushes well within that, so no delta already counted in
+        ``user_likes`` can still be pending and get added on top afterwards.
+        """
+        self.flush(db)
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.quiet_seconds)
+        recent = exists().where(and_(UserLike.offer_id == Offer.id, UserLike.created_at >= cutoff))
+        likes = select(func.count(UserLike.id)).where(
+            and_(UserLike.offer_id == Offer.id, UserLike.action == LIKE)
+        ).scalar_subquery()
+        dislikes = select(func.count(UserLike.id)).where(
+            and_(UserLike.offer_id == Offer.id, UserLike.action == DISLIKE)
+        ).scalar_subquery()
+
+        corrected = 0
+        last_id = 0
+        while True:
+            ids = [row.id for row in db.query(Offer.id).filter(Offer.id > last_id)
+                   .order_by(Offer.id).limit(batch_size).all()]
+            if not ids:
+                break
+            result = db.execute(
+                update(Offer)
+                .where(
+                    and_(
+                        Offer.id.in_(ids),
+                        ~recent,
+                        (Offer.like_count != likes) | (Offer.dislike_count != dislikes)
+                    )
+                )
+                .values(like_count=likes, dislike_count=dislikes, updated_at=Offer.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            corrected += result.rowcount
+            last_id = ids[-1]
+
+        return {"corrected": corrected}
+
+
+engagement_counter = EngagementCounter(settings.engagement_reconcile_quiet_seconds)
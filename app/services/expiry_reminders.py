@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import (
+    Notification, NotificationType, Offer, OfferReminder, PushSubscription, ReminderCursor, User, UserLike
+)
+from app.services.notification_service import notification_service
+from app.services.push_notifications import push_service
+
+logger = logging.getLogger(__name__)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_windows(windows_hours: str) -> List[Tuple[str, timedelta]]:
+    """Parse "24,1" into [("24h", 24h), ("1h", 1h)], largest window first"""
+    hours = sorted({float(h) for h in windows_hours.split(",") if h.strip()}, reverse=True)
+    return [(f"{h:g}h", timedelta(hours=h)) for h in hours]
+
+
+class ExpiryReminderService:
+    """Reminds users about liked offers that are about to expire.
+
+    Each tick scans, per window, the liked offers whose ``expiry_date`` falls
+    between the next smaller window and this one, in ``(expiry_date,
+    offer_id, user_id)`` order from where the previous tick stopped. The
+    position is kept in ``reminder_cursors`` and commits with the reminders,
+    so a tick reads at most ``batch_size`` likes past it and never revisits
+    reminders already sent, however large ``user_likes`` or
+    ``offer_reminders`` grow. ``OfferReminder`` markers stay unique, so
+    concurrent workers still send each reminder once.
+
+    Likes added after the scan has passed their offer, and offers whose
+    expiry moves behind the cursor, get only the reminders of the smaller
+    windows still ahead.
+    """
+
+    def __init__(self, windows_hours: str, batch_size: int):
+        self.windows = parse_windows(windows_hours)
+        self.batch_size = batch_size
+
+    def _due_reminders(self, db: Session, now: datetime, cursor: Optional[ReminderCursor], lower: timedelta,
+                       upper: timedelta, limit: int) -> List[Tuple[int, int, str, datetime]]:
+        query = db.query(UserLike.user_id, Offer.id, Offer.title, Offer.expiry_date).join(
+            Offer, Offer.id == UserLike.offer_id
+        ).filter(
+            and_(
+                UserLike.action == "like",
+                Offer.is_active == True,
+                Offer.expiry_date > now + lower,
+                Offer.expiry_date <= now + upper
+            )
+        )
+        if cursor is not None:
+            query = query.filter(or_(
+                Offer.expiry_date > cursor.expiry_date,
+                and_(Offer.expiry_date == cursor.expiry_date, Offer.id > cursor.offer_id),
+                and_(Offer.expiry_date == cursor.expiry_date, Offer.id == cursor.offer_id,
+                     UserLike.user_id > cursor.user_id)
+            ))
+        return query.order_by(Offer.expiry_date, Offer.id, UserLike.user_id).limit(limit).all()
+
+    def _advance(self, db: Session, label: str, row):
+        insert = dialect_insert(db)
+        values = {"expiry_date": row.expiry_date, "offer_id": row.id, "user_id": row.user_id}
+        stmt = insert(ReminderCursor.__table__).values(window=label, **values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ReminderCursor.__table__.c.window],
+            set_={**values, "updated_at": datetime.now(timezone.utc)}
+        ))
+
+    def run(self, db: Session) -> Dict:
+        """Send one bounded batch of due reminders"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
+        remaining = self.batch_size
+        due = []
+        cursors = {cursor.window: cursor for cursor in db.query(ReminderCursor).all()}
+        scanned = {}
+
+        # Largest window first; each window only covers offers outside the smaller ones
+        for index, (label, upper) in enumerate(self.windows):
+            lower = self.windows[index + 1][1] if index + 1 < len(self.windows) else timedelta(0)
+            if remaining <= 0:
+                break
+            rows = self._due_reminders(db, now, cursors.get(label), lower, upper, remaining)
+            if rows:
+                scanned[label] = rows[-1]
+            due.extend((label, row) for row in rows)
+            remaining -= len(rows)
+
+        if not due:
+            return {}
+
+        for label, row in scanned.items():
+            self._advance(db, label, row)
+
+        # Claim the reminders first: markers are unique, so a concurrent worker
+        # that already claimed a row makes our insert a no-op for it
+        insert = dialect_insert(db)
+        stmt = insert(OfferReminder).values([
+            {"user_id": row.user_id, "offer_id": row.id, "window": label}
+            for label, row in due
+        ]).on_conflict_do_nothing().returning(OfferReminder.user_id, OfferReminder.offer_id, OfferReminder.window)
+        claimed = set(db.execute(stmt).all())
+        due = [(label, row) for label, row in due if (row.user_id, row.id, label) in claimed]
+
+        user_ids = {row.user_id for _, row in due}
+        users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids)).all()}
+
+        for label, row in due:
+            db.add(Notification(
+                user_id=row.user_id,
+                offer_id=row.id,
+                notification_type=NotificationType.PUSH,
+                message=f"'{row.title}' expires in {self._time_left(row.expiry_date, now)}. Don't miss out!"
+            ))
+        db.commit()
+
+        pushed = self._send_push(db, due, users, now)
+        emailed = asyncio.run(self._send_emails(due, users, now))
+
+        return {"reminders": len(due), "pushed": pushed, "emailed": emailed}
+
+    def _send_push(self, db: Session, due, users: Dict[int, User], now: datetime) -> int:
+        user_ids = [user_id for user_id, user in users.items() if user.notify_push]
+        if not user_ids:
+            return 0
+        # One query for the whole batch's subscriptions, one failure flush at the end
+        subscriptions = defaultdict(list)
+        for subscription in db.query(PushSubscription).filter(
+            PushSubscription.user_id.in_(user_ids),
+            PushSubscription.is_active == True
+        ):
+            subscriptions[subscription.user_id].append(subscription)
+
+        pushed = 0
+        for label, row in due:
+            if not subscriptions.get(row.user_id):
+                continue
+            payload = push_service.offer_expiry_payload(row.title, self._time_left(row.expiry_date, now), row.id)
+            # Let the push service drop the message once the offer has expired
+            ttl = max(int((_naive_utc(row.expiry_date) - now).total_seconds()), 0)
+            sent = [push_service.send_notification(subscription, payload, ttl)
+                    for subscription in subscriptions[row.user_id]]
+            if any(sent):
+                pushed += 1
+        push_service.flush_failures(db)
+        return pushed
+
+    async def _send_emails(self, due, users: Dict[int, User], now: datetime) -> int:
+        sends = []
+        for label, row in due:
+            user = users.get(row.user_id)
+            if not user or not user.notify_email:
+                continue
+            sends.append(notification_service.send_notification(
+                NotificationType.EMAIL,
+                to_email=user.email,
+                subject="Offer Expiring Soon!",
+                body=f"<p>'{row.title}' expires in {self._time_left(row.expiry_date, now)}. Don't miss out!</p>"
+            ))
+        results = await asyncio.gather(*sends)
+        return sum(1 for sent in results if sent)
+
+    @staticmethod
+    def _time_left(expiry_date: datetime, now: datetime) -> str:
+        minutes = max(int((_naive_utc(expiry_date) - now).total_seconds() // 60), 0)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+
+expiry_reminder_service = ExpiryReminderService(
+    settings.expiry_reminder_windows_hours,
+    settings.expiry_reminder_batch_size
+)
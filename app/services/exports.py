@@ -0,0 +1,141 @@
+import csv
+import enum
+import io
+import json
+import logging
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Notification, Offer, User, UserLike
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+MEDIA_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
+# Exported columns and the timestamp since/until filter on; credentials and
+# OAuth identifiers never leave the database
+DATASETS: Dict[str, Tuple[List, object]] = {
+    "users": ([
+        User.id, User.email, User.phone, User.username, User.full_name, User.is_active, User.is_verified,
+        User.email_verified, User.phone_verified, User.is_admin, User.oauth_provider, User.notify_email,
+        User.notify_sms, User.notify_whatsapp, User.notify_telegram, User.notify_push,
+        User.created_at, User.updated_at
+    ], User.created_at),
+    "offers": ([
+        Offer.id, Offer.title, Offer.description, Offer.image_url, Offer.provider_name, Offer.external_id,
+        Offer.category, Offer.discount_percentage, Offer.discount_amount, Offer.original_price,
+        Offer.discounted_price, Offer.referral_link, Offer.promo_code, Offer.terms_conditions,
+        Offer.instructions, Offer.starts_at, Offer.expiry_date, Offer.is_active, Offer.like_count,
+        Offer.dislike_count, Offer.impression_count, Offer.created_at, Offer.updated_at
+    ], Offer.created_at),
+    "swipes": ([
+        UserLike.id, UserLike.user_id, UserLike.offer_id, UserLike.action, UserLike.created_at
+    ], UserLike.created_at),
+    "notifications": ([
+        Notification.id, Notification.user_id, Notification.offer_id, Notification.notification_type,
+        Notification.message, Notification.is_read, Notification.sent_at
+    ], Notification.sent_at),
+}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class DataExporter:
+    """Streams a whole table out as CSV or NDJSON in constant memory.
+
+    Rows are read in ``id`` order through a server-side cursor
+    (``stream_results``; psycopg2 uses a named cursor) ``batch_size`` at a
+    time, and each batch is encoded, optionally gzip-compressed, and yielded
+    before the next one is fetched. ``id`` is always the first column, so an
+    interrupted export resumes with ``after_id`` set to the last complete
+    row. The export holds its own session, since it outlives the request
+    handler that starts it.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def _encode(self, rows, names: List[str], fmt: str) -> str:
+        if fmt == CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([[_value(value) for value in row] for row in rows])
+            return buffer.getvalue()
+        return "".join(
+            json.dumps({name: _value(value) for name, value in zip(names, row)}) + "\n" for row in rows
+        )
+
+    def stream(self, dataset: str, fmt: str, compress: bool = False, after_id: Optional[int] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[bytes]:
+        columns, timestamp = DATASETS[dataset]
+        names = [column.key for column in columns]
+        key = columns[0]
+        query = select(*columns).order_by(key)
+        if after_id is not None:
+            query = query.where(key > after_id)
+        if since is not None:
+            query = query.where(timestamp >= _naive_utc(since))
+        if until is not None:
+            query = query.where(timestamp < _naive_utc(until))
+
+        # 31 window bits: a gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        started = time.perf_counter()
+        rows = written = 0
+        last_id = after_id
+
+        def emit(text: str) -> bytes:
+            nonlocal written
+            data = text.encode("utf-8")
+            if compressor is not None:
+                data = compressor.compress(data)
+            written += len(data)
+            return data
+
+        db = SessionLocal()
+        try:
+            if fmt == CSV:
+                header = emit(",".join(names) + "\r\n")
+                if header:
+                    yield header
+            result = db.execute(query.execution_options(stream_results=True, yield_per=self.batch_size))
+            for batch in result.partitions():
+                chunk = emit(self._encode(batch, names, fmt))
+                rows += len(batch)
+                last_id = batch[-1][0]
+                if chunk:
+                    yield chunk
+            if compressor is not None:
+                tail = compressor.flush()
+                written += len(tail)
+                yield tail
+        finally:
+            db.close()
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Exported {rows} {dataset} as {fmt}{'.gz' if compress else ''}: {written} bytes in "
+                f"{elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s), last id {last_id}"
+            )
+
+
+data_exporter = DataExporter(settings.export_batch_size)
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.config import settings
+from app.models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Put on a stream's queue when it fell too far behind; the client reconnects
+# and resumes from its Last-Event-ID
+RESYNC = object()
+
+
+class InMemoryBroker:
+    """Delivers events to subscribers in this process only.
+
+    Stand-in for a real broker in tests and single-worker deployments.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Callable[[Dict], None]] = None
+
+    async def start(self, handler: Callable[[Dict], None]):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    def publish(self, event: Dict):
+        if self._handler is not None:
+            self._handler(event)
+
+
+class RedisBroker:
+    """Fans events out to every worker through a Redis pub/sub channel"""
+
+    channel = "tinderlike:notifications"
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._publisher = None
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[Dict], None]):
+        import redis
+        import redis.asyncio as aioredis
+
+        self._publisher = redis.Redis.from_url(self.redis_url)
+        self._pubsub = aioredis.Redis.from_url(self.redis_url).pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: Callable[[Dict], None]):
+        async for message in self._pubsub.listen():
+            try:
+                handler(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Error handling broker message: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+
+    def publish(self, event: Dict):
+        try:
+            self._publisher.publish(self.channel, json.dumps(event))
+        except Exception as e:
+            logger.error(f"Error publishing notification event: {e}")
+
+
+class NotificationHub:
+    """Routes notification events to the open SSE streams of each user.
+
+    Every stream is a small bounded queue, so an idle connection costs one
+    queue and one suspended generator. Events go through the broker even for
+    local delivery, so every worker sees the same stream of events.
+    """
+
+    def __init__(self, broker, queue_size: int):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._streams: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._deliver_threadsafe)
+
+    async def stop(self):
+        await self.broker.stop()
+        for queues in self._streams.values():
+            for queue in queues:
+                self._offer(queue, RESYNC)
+        self._loop = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._streams.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._streams.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._streams[user_id]
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._streams.values())
+
+    def publish(self, event: Dict):
+        """Publish a notification event; safe to call from any thread"""
+        self.broker.publish(event)
+
+    def _deliver_threadsafe(self, event: Dict):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict):
+        for queue in list(self._streams.get(event["user_id"], ())):
+            self._offer(queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Slow consumer: drop what is queued and make it reconnect and replay
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+
+def notification_event(notification: Notification) -> Dict:
+    # Read loaded attributes only; this runs inside a flush
+    values = notification.__dict__
+    sent_at = values.get("sent_at") or datetime.now(timezone.utc)
+    notification_type = values.get("notification_type")
+    return {
+        "id": notification.id,
+        "user_id": notification.user_id,
+        "offer_id": notification.offer_id,
+        "notification_type": getattr(notification_type, "value", notification_type),
+        "message": notification.message,
+        "sent_at": sent_at.isoformat(),
+        "is_read": bool(values.get("is_read") or False)
+    }
+
+
+def _create_broker():
+    if settings.notification_broker == "redis":
+        return RedisBroker(settings.redis_url)
+    return InMemoryBroker()
+
+
+notification_hub = NotificationHub(_create_broker(), settings.sse_queue_size)
+
+
+# Publish Notification rows once the transaction that inserted them commits.
+# Rows inserted with Core statements bypass these hooks and must call
+# notification_hub.publish themselves.
+@event.listens_for(Notification, "after_insert")
+def _queue_notification_event(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("notification_events", []).append(notification_event(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_notification_events(session):
+    for payload in session.info.pop("notification_events", []):
+        notification_hub.publish(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notification_events(session):
+    session.info.pop("notification_events", None)
@@ -0,0 +1,129 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Notification
+from app.services.unread_counter import adjust_unread_count
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationRetentionService:
+    """Deletes (and optionally archives) notifications older than their TTL.
+
+    Rows are removed in small batches, each in its own short transaction, so
+    the job never holds long locks on ``notifications``. The rows a
+    ``DELETE ... RETURNING`` removed are staged in a temp file before the
+    batch commits and appended to a gzip-compressed NDJSON file per day once
+    it has.
+    """
+
+    def __init__(self, read_ttl_days: int, unread_ttl_days: int, batch_size: int,
+                 max_batches: int, archive_dir: Optional[str] = None):
+        self.read_ttl_days = read_ttl_days
+        self.unread_ttl_days = unread_ttl_days
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.archive_dir = archive_dir or None
+
+    def _expired_filter(self, now: datetime):
+        read_cutoff = now - timedelta(days=self.read_ttl_days)
+        unread_cutoff = now - timedelta(days=self.unread_ttl_days)
+        return or_(
+            and_(Notification.is_read == True, Notification.sent_at < read_cutoff),
+            and_(Notification.is_read == False, Notification.sent_at < unread_cutoff)
+        )
+
+    def _archive_path(self, now: datetime) -> str:
+        return os.path.join(self.archive_dir, f"notifications-{now:%Y%m%d}.ndjson.gz")
+
+    def _stage(self, notifications: List, now: datetime) -> str:
+        """Write a batch as one gzip member next to the day's archive; returns the temp path"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = f"{self._archive_path(now)}.{notifications[0].id}.tmp"
+        with gzip.open(path, "wt", encoding="utf-8") as archive:
+            for notification in notifications:
+                archive.write(json.dumps({
+                    "id": notification.id,
+                    "user_id": notification.user_id,
+                    "offer_id": notification.offer_id,
+                    "notification_type": notification.notification_type.value,
+                    "message": notification.message,
+                    "sent_at": notification.sent_at.isoformat() if notification.sent_at else None,
+                    "is_read": notification.is_read
+                }) + "\n")
+        return path
+
+    def _publish(self, staged: str, now: datetime):
+        # Appending a gzip member; readers see one continuous stream
+        with open(staged, "rb") as source, open(self._archive_path(now), "ab") as archive:
+            shutil.copyfileobj(source, archive)
+        os.remove(staged)
+
+    def run(self, db: Session) -> Dict:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # Convert to naive datetime for DB comparison
+        expired = self._expired_filter(now)
+        deleted = 0
+        archived = 0
+        batches = 0
+
+        while batches < self.max_batches:
+            ids = db.query(Notification.id).filter(expired).order_by(Notification.id).limit(self.batch_size).all()
+            ids = [row.id for row in ids]
+            if not ids:
+                break
+
+            staged = None
+            try:
+                # Re-check the predicate so rows read in the meantime are kept
+                removed = db.execute(
+                    delete(Notification)
+                    .where(and_(Notification.id.in_(ids), expired))
+                    .returning(
+                        Notification.id, Notification.user_id, Notification.offer_id,
+                        Notification.notification_type, Notification.message,
+                        Notification.sent_at, Notification.is_read
+                    )
+                    .execution_options(synchronize_session=False)
+                ).all()
+                unread = Counter(row.user_id for row in removed if not row.is_read)
+                for user_id, count in unread.items():
+                    adjust_unread_count(db, user_id, -count)
+                if self.archive_dir and removed:
+                    # Exactly the deleted rows; a failed write rolls the delete back
+                    staged = self._stage(removed, now)
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error applying notification retention: {e}")
+                db.rollback()
+                if staged:
+                    os.remove(staged)
+                break
+            # Only committed deletes reach the archive, so a retried batch is not archived twice
+            if staged:
+                self._publish(staged, now)
+
+            if self.archive_dir:
+                archived += len(removed)
+            deleted += len(removed)
+            batches += 1
+
+        if not deleted:
+            return {}
+        return {"deleted": deleted, "archived": archived, "batches": batches}
+
+
+notification_retention = NotificationRetentionService(
+    settings.notification_read_ttl_days,
+    settings.notification_unread_ttl_days,
+    settings.notification_retention_batch_size,
+    settings.notification_retention_max_batches,
+    settings.notification_archive_dir
+)
@@ -0,0 +1,130 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable
+from sqlalchemy import delete, event, func, insert
+from sqlalchemy.orm import Session, attributes
+from app.config import settings
+from app.models import Offer, OfferChange
+from app.services.rollups import get_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+# Highest pruned version; clients behind it must sync again from a snapshot
+PRUNED_WATERMARK = "offer_changes:pruned"
+
+# Engagement counters change on every swipe and are not catalog changes
+IGNORED_COLUMNS = {"like_count", "dislike_count", "impression_count", "updated_at"}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the DB comparisons
+
+
+def record_changes(db, offer_ids: Iterable[int]):
+    """Append offers to the change log in the caller's transaction.
+
+    Accepts a Session or a Connection. ORM writes are recorded by the hooks
+    below; set-based ``UPDATE``/``DELETE`` and upserts must call this.
+    """
+    offer_ids = list(offer_ids)
+    if not offer_ids:
+        return
+    now = _utcnow()
+    db.execute(insert(OfferChange.__table__), [{"offer_id": offer_id, "changed_at": now} for offer_id in offer_ids])
+
+
+class OfferChangeLog:
+    """Delta sync of the offer catalog from the ``offer_changes`` log.
+
+    Every create, update, delete, activation and expiry of an offer appends
+    ``(version, offer_id)``. ``changes_since`` returns each offer touched
+    after a version once, in its current state if it is live and as a
+    removal otherwise, so a payload grows with the changes rather than the
+    catalog. Entries newer than ``lag_seconds`` are held back, so versions
+    that commit out of order are not skipped.
+
+    New clients start from ``snapshot``: the live offers in ID order plus
+    the version to continue from, which changes made while paging are
+    after. ``prune`` drops entries older than ``retention_days``; clients
+    behind the last pruned version must take a new snapshot.
+    """
+
+    def __init__(self, lag_seconds: int, retention_days: int):
+        self.lag_seconds = lag_seconds
+        self.retention_days = retention_days
+
+    def pruned_version(self, db: Session) -> int:
+        return get_watermark(db, PRUNED_WATERMARK)
+
+    def current_version(self, db: Session) -> int:
+        """Version a snapshot taken now is consistent with"""
+        cutoff = _utcnow() - timedelta(seconds=self.lag_seconds)
+        version = db.query(func.max(OfferChange.version)).filter(OfferChange.changed_at <= cutoff).scalar()
+        return max(version or 0, self.pruned_version(db))
+
+    def _live(self, db: Session, now: datetime):
+        return db.query(Offer).filter(Offer.is_active == True, Offer.expiry_date > now)
+
+    def snapshot(self, db: Session, after_id: int, limit: int) -> Dict:
+        offers = self._live(db, _utcnow()).filter(Offer.id > after_id).order_by(Offer.id).limit(limit + 1).all()
+        return {"upserted": offers[:limit], "removed": [], "has_more": len(offers) > limit}
+
+    def changes_since(self, db: Session, since: int, limit: int) -> Dict:
+        now = _utcnow()
+        latest = func.max(OfferChange.version).label("version")
+        rows = db.query(OfferChange.offer_id, latest).filter(
+            OfferChange.version > since,
+            OfferChange.changed_at <= now - timedelta(seconds=self.lag_seconds)
+        ).group_by(OfferChange.offer_id).order_by(latest).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        offer_ids = [row.offer_id for row in rows]
+        live = {}
+        if offer_ids:
+            live = {offer.id: offer for offer in self._live(db, now).filter(Offer.id.in_(offer_ids))}
+        return {
+            "version": rows[-1].version if rows else since,
+            "upserted": [live[offer_id] for offer_id in offer_ids if offer_id in live],
+            "removed": [offer_id for offer_id in offer_ids if offer_id not in live],
+            "has_more": has_more
+        }
+
+    def prune(self, db: Session) -> Dict:
+        cutoff = _utcnow() - timedelta(days=self.retention_days)
+        try:
+            last = db.query(func.max(OfferChange.version)).filter(OfferChange.changed_at < cutoff).scalar()
+            if last is None:
+                return {}
+            pruned = db.execute(delete(OfferChange).where(OfferChange.version <= last)).rowcount
+            set_watermark(db, PRUNED_WATERMARK, max(last, self.pruned_version(db)))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error pruning offer change log: {e}")
+            db.rollback()
+            return {}
+        return {"pruned": pruned}
+
+
+# ORM hooks recording single-offer writes in the same flush
+
+@event.listens_for(Offer, "after_insert")
+def _offer_inserted(mapper, connection, target):
+    record_changes(connection, [target.id])
+
+
+@event.listens_for(Offer, "after_delete")
+def _offer_deleted(mapper, connection, target):
+    record_changes(connection, [target.id])
+
+
+@event.listens_for(Offer, "after_update")
+def _offer_updated(mapper, connection, target):
+    if any(
+        attributes.get_history(target, column.key).has_changes()
+        for column in mapper.column_attrs if column.key not in IGNORED_COLUMNS
+    ):
+        record_changes(connection, [target.id])
+
+
+offer_change_log = OfferChangeLog(settings.offer_changes_lag_seconds, settings.offer_changes_retention_days)
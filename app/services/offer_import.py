@@ -0,0 +1,272 @@
+import csv
+import enum
+import hashlib
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import column, select, table, text, tuple_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import Offer
+from app.schemas import OfferImportRow
+from app.services.admin_stats import adjust_stats, TOTAL_OFFERS, ACTIVE_OFFERS
+from app.services.audit_log import audit_log
+from app.services.offer_changes import record_changes
+from app.services.offer_lifecycle import offer_lifecycle, starts_in_future, UPDATE
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+# Columns an import overwrites on an existing offer; is_active and
+# pending_activation are only set on create
+UPDATED_COLUMNS = tuple(name for name in OfferImportRow.model_fields if name != "external_id") + ("content_hash",)
+
+STAGING_TABLE = "offer_import_staging"
+
+# (line, record, error) as produced by read_rows
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return CSV
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return NDJSON
+    return None
+
+
+def _clean(record: dict) -> dict:
+    # Blank cells and empty strings mean "not set", whichever format they came from
+    cleaned = {}
+    for key, value in record.items():
+        if isinstance(value, str):
+            value = value.strip() or None
+        cleaned[key.strip() if isinstance(key, str) else key] = value
+    return cleaned
+
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[ParsedRow]:
+    """Parse an upload lazily, one record at a time, numbering records by line"""
+    reader_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    line = 0
+    try:
+        if fmt == CSV:
+            reader = csv.DictReader(reader_stream)
+            for record in reader:
+                line = reader.line_num
+                if None in record:
+                    yield line, None, "More fields than the header"
+                    continue
+                yield line, _clean(record), None
+        else:
+            for line, raw in enumerate(reader_stream, 1):
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError as e:
+                    yield line, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line, None, "Expected a JSON object"
+                    continue
+                yield line, _clean(record), None
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The rest of the file cannot be read reliably
+        yield line + 1, None, f"Unreadable input, import stopped: {e}"
+    finally:
+        reader_stream.detach()  # Leave the upload open for its owner
+
+
+def content_hash(row: OfferImportRow) -> str:
+    values = row.model_dump(mode="json", exclude={"external_id"})
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        "{}: {}".format(".".join(str(part) for part in item["loc"]) or "row", item["msg"])
+        for item in error.errors()
+    )
+
+
+def _copy_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy stores enums by name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value)
+
+
+class OfferImporter:
+    """Streams partner offer feeds into the offers table in batches.
+
+    Rows are validated one at a time and written ``chunk_size`` at a time.
+    Each offer is keyed by ``(provider_name, external_id)``; rows without an
+    ``external_id`` are keyed by a SHA-256 of their content, so re-sending
+    a feed is idempotent. Unchanged rows are skipped, the rest are upserted
+    with one batched statement (``COPY`` into a staging table on
+    PostgreSQL with psycopg2), and each batch commits with a single
+    summarizing ``bulk_import`` admin action instead of one per offer.
+
+    A failed batch is rolled back and reported row by row; earlier batches
+    stay committed.
+    """
+
+    def __init__(self, chunk_size: int, max_errors: int):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    def _fail(self, result: Dict, line: int, error: str):
+        result["failed"] += 1
+        if len(result["errors"]) < self.max_errors:
+            result["errors"].append({"line": line, "error": error})
+        else:
+            result["errors_truncated"] = True
+
+    def _use_copy(self, db: Session) -> bool:
+        return db.bind.dialect.name == "postgresql" and db.bind.dialect.driver == "psycopg2"
+
+    def _upsert_statement(self, insert_stmt, now: datetime):
+        offers = Offer.__table__
+        return insert_stmt.on_conflict_do_update(
+            index_elements=[offers.c.provider_name, offers.c.external_id],
+            set_={**{name: insert_stmt.excluded[name] for name in UPDATED_COLUMNS}, "updated_at": now},
+            # A concurrent import may have written the same content already
+            where=offers.c.content_hash != insert_stmt.excluded.content_hash
+        ).returning(
+            offers.c.id, offers.c.is_active, offers.c.pending_activation, offers.c.starts_at, offers.c.expiry_date
+        )
+
+    def _copy_upsert(self, db: Session, rows: List[Dict], now: datetime):
+        names = list(rows[0])
+        connection = db.connection()
+        connection.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DELETE ROWS AS "
+            f"SELECT {', '.join(names)} FROM offers WITH NO DATA"
+        ))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for values in rows:
+            writer.writerow([_copy_value(values[name]) for name in names])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {STAGING_TABLE} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        staging = table(STAGING_TABLE, *[column(name) for name in names])
+        insert = dialect_insert(db)
+        stmt = self._upsert_statement(insert(Offer.__table__).from_select(names, select(*staging.c)), now)
+        return connection.execute(stmt).all()
+
+    def _upsert(self, db: Session, rows: List[Dict], now: datetime):
+        if self._use_copy(db):
+            return self._copy_upsert(db, rows, now)
+        insert = dialect_insert(db)
+        # executemany; SQLAlchemy batches the rows into multi-row INSERTs
+        return db.execute(self._upsert_statement(insert(Offer.__table__), now), rows).all()
+
+    def _write_batch(self, db: Session, batch: List[Tuple[int, OfferImportRow]], result: Dict,
+                     admin_user_id: int, source: Optional[str]):
+        now = datetime.now(timezone.utc)
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for line, row in batch:
+            digest = content_hash(row)
+            values = row.model_dump(exclude={"external_id"})
+            values["external_id"] = row.external_id or f"sha256:{digest}"
+            values["content_hash"] = digest
+            key = (values["provider_name"], values["external_id"])
+            if key in rows:
+                result["duplicates"] += 1  # The last copy in a batch wins
+            rows[key] = values
+
+        try:
+            existing = dict(
+                ((provider_name, external_id), digest)
+                for provider_name, external_id, digest in db.query(
+                    Offer.provider_name, Offer.external_id, Offer.content_hash
+                ).filter(tuple_(Offer.provider_name, Offer.external_id).in_(list(rows)))
+            )
+            changed, counts = [], {"created": 0, "updated": 0, "unchanged": 0}
+            created_active = 0
+            for key, values in rows.items():
+                # Offers that start later go live through the lifecycle scheduler
+                values["pending_activation"] = starts_in_future(values["starts_at"])
+                values["is_active"] = not values["pending_activation"]
+                if key not in existing:
+                    counts["created"] += 1
+                    created_active += values["is_active"]
+                elif existing[key] == values["content_hash"]:
+                    counts["unchanged"] += 1
+                    continue
+                else:
+                    counts["updated"] += 1
+                changed.append(values)
+
+            written = self._upsert(db, changed, now) if changed else []
+            adjust_stats(db, {TOTAL_OFFERS: counts["created"], ACTIVE_OFFERS: created_active})
+            record_changes(db, [offer.id for offer in written])
+            # A batch has no single resource; the lines are in details
+            audit_log.record(db, admin_user_id, "bulk_import", "offer", 0, {
+                "source": source,
+                "batch": result["batches"] + 1,
+                "first_line": batch[0][0],
+                "last_line": batch[-1][0],
+                **counts
+            })
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error importing offers from line {batch[0][0]}: {e}")
+            db.rollback()
+            for line, _ in batch:
+                self._fail(result, line, f"Batch failed: {e}")
+            return
+
+        for name, count in counts.items():
+            result[name] += count
+        result["batches"] += 1
+        for offer in written:
+            offer_lifecycle.schedule(offer)
+        active = [offer.id for offer in written if offer.is_active]
+        if active:
+            offer_lifecycle.fire_hooks(UPDATE, active)
+
+    def import_rows(self, db: Session, rows: Iterable[ParsedRow], admin_user_id: int,
+                    source: Optional[str] = None) -> Dict:
+        """Validate and write parsed rows; returns counts and per-line errors"""
+        result = {
+            "created": 0, "updated": 0, "unchanged": 0, "duplicates": 0, "failed": 0, "batches": 0,
+            "errors": [], "errors_truncated": False
+        }
+        batch: List[Tuple[int, OfferImportRow]] = []
+        for line, record, error in rows:
+            if error is not None:
+                self._fail(result, line, error)
+                continue
+            try:
+                batch.append((line, OfferImportRow.model_validate(record)))
+            except ValidationError as e:
+                self._fail(result, line, _describe(e))
+                continue
+            if len(batch) >= self.chunk_size:
+                self._write_batch(db, batch, result, admin_user_id, source)
+                batch = []
+        if batch:
+            self._write_batch(db, batch, result, admin_user_id, source)
+        return result
+
+
+offer_importer = OfferImporter(settings.offer_import_chunk_size, settings.offer_import_max_errors)
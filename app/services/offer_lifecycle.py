@@ -0,0 +1,185 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Offer
+from app.services.admin_stats import adjust_stats, ACTIVE_OFFERS
+from app.services.offer_changes import record_changes
+
+logger = logging.getLogger(__name__)
+
+# Hook events: the first two are fired by the scheduler, the rest by admin writes
+ACTIVATE = "activate"
+EXPIRE = "expire"
+UPDATE = "update"
+DEACTIVATE = "deactivate"
+REMOVE = "remove"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the DB comparisons
+
+
+def starts_in_future(starts_at: Optional[datetime]) -> bool:
+    return starts_at is not None and _naive_utc(starts_at) > _utcnow()
+
+
+class OfferLifecycleScheduler:
+    """Flips offers live at ``starts_at`` and inactive at ``expiry_date``.
+
+    Pending transitions sit in a min-heap ordered by due time. Rescheduling
+    an offer just records the new due time; superseded heap entries are
+    skipped when popped. State lives in the ``offers`` table, where
+    ``pending_activation`` tells an offer waiting for ``starts_at`` from one
+    an admin deactivated, so the heap is rebuilt from it on the first tick
+    after a restart, go-lives that fell due in between included. The UPDATEs
+    are conditional on the row still needing the transition, so several
+    workers running the job cannot fire the same transition twice.
+    """
+
+    def __init__(self, batch_size: int, resync_seconds: int):
+        self.batch_size = batch_size
+        self.resync_seconds = resync_seconds
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._due: Dict[Tuple[int, str], datetime] = {}
+        self._hooks: List[Callable[[str, List[int]], object]] = []
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+
+    def register_hook(self, hook: Callable[[str, List[int]], object]):
+        """Call ``hook(event, offer_ids)`` after offers go live, change, expire or are removed"""
+        self._hooks.append(hook)
+
+    def fire_hooks(self, event: str, offer_ids: List[int]):
+        if not offer_ids:
+            return
+        for hook in self._hooks:
+            try:
+                hook(event, offer_ids)
+            except Exception as e:
+                logger.error(f"Offer lifecycle hook {hook} failed: {e}")
+
+    def _push(self, offer_id: int, event: str, when: datetime):
+        when = _naive_utc(when)
+        self._due[(offer_id, event)] = when
+        heapq.heappush(self._heap, (when, offer_id, event))
+
+    def schedule(self, offer: Offer, now: Optional[datetime] = None):
+        """(Re)schedule the transitions of an offer after it was created or updated"""
+        pending = offer.pending_activation and not offer.is_active
+        with self._lock:
+            self._due.pop((offer.id, ACTIVATE), None)
+            self._due.pop((offer.id, EXPIRE), None)
+            if pending:
+                # A go-live missed while no worker was running fires on the next tick
+                now = now or _utcnow()
+                starts_at = _naive_utc(offer.starts_at) if offer.starts_at else now
+                self._push(offer.id, ACTIVATE, max(starts_at, now))
+            if offer.is_active or pending:
+                self._push(offer.id, EXPIRE, offer.expiry_date)
+
+    def unschedule(self, offer_id: int):
+        with self._lock:
+            self._due.pop((offer_id, ACTIVATE), None)
+            self._due.pop((offer_id, EXPIRE), None)
+
+    def _sync(self, db: Session, now: datetime):
+        """Load pending transitions, all of them on first run and then offers changed since the last sync"""
+        query = db.query(
+            Offer.id, Offer.is_active, Offer.pending_activation, Offer.starts_at, Offer.expiry_date
+        ).filter(
+            or_(
+                Offer.is_active == True,
+                # Waiting to go live, including go-lives that passed during a restart
+                and_(Offer.pending_activation == True, Offer.expiry_date > now)
+            )
+        )
+        if self._last_sync is not None:
+            # Overlap the previous sync a little; rescheduling is idempotent
+            since = self._last_sync - timedelta(seconds=60)
+            query = query.filter(or_(Offer.created_at >= since, Offer.updated_at >= since))
+        for offer in query.yield_per(1000):
+            self.schedule(offer, now)
+        self._last_sync = now
+
+    def _pop_due(self, now: datetime) -> Dict[str, List[int]]:
+        due = {ACTIVATE: [], EXPIRE: []}
+        with self._lock:
+            count = 0
+            while self._heap and self._heap[0][0] <= now and count < self.batch_size:
+                when, offer_id, event = heapq.heappop(self._heap)
+                # Skip entries superseded by a reschedule or removal
+                if self._due.get((offer_id, event)) != when:
+                    continue
+                del self._due[(offer_id, event)]
+                due[event].append(offer_id)
+                count += 1
+        return due
+
+    def run(self, db: Session) -> Dict:
+        now = _utcnow()
+        if self._last_sync is None or (now - self._last_sync).total_seconds() >= self.resync_seconds:
+            self._sync(db, now)
+
+        due = self._pop_due(now)
+        activated = []
+        expired = []
+        try:
+            if due[ACTIVATE]:
+                activated = db.execute(
+                    update(Offer).where(
+                        and_(
+                            Offer.id.in_(due[ACTIVATE]),
+                            Offer.is_active == False,
+                            Offer.pending_activation == True,
+                            or_(Offer.starts_at == None, Offer.starts_at <= now),
+                            Offer.expiry_date > now
+                        )
+                    ).values(is_active=True, pending_activation=False, updated_at=now).returning(Offer.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+            if due[EXPIRE]:
+                expired = db.execute(
+                    update(Offer).where(
+                        and_(
+                            Offer.id.in_(due[EXPIRE]),
+                            Offer.is_active == True,
+                            Offer.expiry_date <= now
+                        )
+                    ).values(is_active=False, updated_at=now).returning(Offer.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+            adjust_stats(db, {ACTIVE_OFFERS: len(activated) - len(expired)})
+            record_changes(db, list(activated) + list(expired))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error applying offer lifecycle transitions: {e}")
+            db.rollback()
+            # Put them back so the next tick retries
+            with self._lock:
+                for event, offer_ids in due.items():
+                    for offer_id in offer_ids:
+                        self._push(offer_id, event, now)
+            return {}
+
+        self.fire_hooks(ACTIVATE, list(activated))
+        self.fire_hooks(EXPIRE, list(expired))
+        if not (activated or expired):
+            return {}
+        return {"activated": len(activated), "expired": len(expired)}
+
+
+offer_lifecycle = OfferLifecycleScheduler(
+    settings.offer_lifecycle_batch_size,
+    settings.offer_lifecycle_resync_seconds
+)
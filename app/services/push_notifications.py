@@ -1,50 +1,149 @@
 import json
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from py_vapid import Vapid
 from pywebpush import WebPushException, webpush
+from sqlalchemy import and_, delete, or_, update
 from sqlalchemy.orm import Session
 from app.models import PushSubscription, User
 from app.config import settings
+from app.database import dialect_insert
 
 logger = logging.getLogger(__name__)
 
+
+def endpoint_origin(endpoint: str) -> str:
+    """Return the scheme://host[:port] origin of a push service endpoint"""
+    parsed = urlparse(endpoint)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class VapidHeaderCache:
+    """Caches signed VAPID headers per push service origin.
+
+    The VAPID JWT only depends on the push service origin (``aud``), the
+    contact (``sub``) and an expiry, so one ECDSA signature can be reused for
+    every message sent to the same origin until shortly before it expires.
+    """
+
+    def __init__(self, private_key: str, subject: str, ttl_seconds: int, refresh_margin_seconds: int):
+        self.private_key = private_key
+        self.subject = subject
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._vapid: Optional[Vapid] = None
+        self._headers: Dict[str, Tuple[Dict[str, str], int]] = {}
+        self._lock = threading.Lock()
+
+    def _signer(self) -> Vapid:
+        if self._vapid is None:
+            self._vapid = Vapid.from_string(private_key=self.private_key)
+        return self._vapid
+
+    def get_headers(self, endpoint: str) -> Dict[str, str]:
+        """Return VAPID headers for the endpoint's origin, signing only when needed"""
+        origin = endpoint_origin(endpoint)
+        now = int(time.time())
+        with self._lock:
+            cached = self._headers.get(origin)
+            if cached and cached[1] - self.refresh_margin_seconds > now:
+                return dict(cached[0])
+
+            expires_at = now + self.ttl_seconds
+            headers = self._signer().sign({
+                "sub": self.subject,
+                "aud": origin,
+                "exp": expires_at
+            })
+            self._headers[origin] = (headers, expires_at)
+            return dict(headers)
+
+    def clear(self):
+        with self._lock:
+            self._headers.clear()
+
+
+class SubscriptionFailureBuffer:
+    """Collects send outcomes so they can be persisted in a few batched UPDATEs"""
+
+    def __init__(self):
+        self.dead: Set[int] = set()  # 404/410 from the push service
+        self.failed: Set[int] = set()  # Transient failures
+        self.recovered: Set[int] = set()  # Previously failing, now delivered
+        self._lock = threading.Lock()
+
+    def record_dead(self, subscription_id: int):
+        with self._lock:
+            self.dead.add(subscription_id)
+
+    def record_failed(self, subscription_id: int):
+        with self._lock:
+            self.failed.add(subscription_id)
+
+    def record_recovered(self, subscription_id: int):
+        with self._lock:
+            self.recovered.add(subscription_id)
+
+    def drain(self) -> Tuple[Set[int], Set[int], Set[int]]:
+        with self._lock:
+            dead, failed, recovered = self.dead, self.failed - self.dead, self.recovered
+            self.dead, self.failed, self.recovered = set(), set(), set()
+            return dead, failed, recovered
+
+
+def _chunks(ids: Set[int], size: int = 500):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
 class PushNotificationService:
     def __init__(self):
-        self.vapid_private_key = settings.VAPID_PRIVATE_KEY
-        self.vapid_public_key = settings.VAPID_PUBLIC_KEY
-        self.vapid_claims = {
-            "sub": f"mailto:{settings.CONTACT_EMAIL}",
-            "aud": "https://fcm.googleapis.com"
-        }
+        self.failures = SubscriptionFailureBuffer()
+        self.vapid_private_key = settings.vapid_private_key
+        self.vapid_public_key = settings.vapid_public_key
+        self.vapid_headers = VapidHeaderCache(
+            private_key=self.vapid_private_key,
+            subject=f"mailto:{settings.contact_email}",
+            ttl_seconds=settings.vapid_token_ttl_seconds,
+            refresh_margin_seconds=settings.vapid_refresh_margin_seconds
+        )
     
     def subscribe_user(self, db: Session, user_id: int, subscription_data: Dict) -> PushSubscription:
         """Subscribe a user to push notifications"""
         try:
-            # Check if subscription already exists
-            existing = db.query(PushSubscription).filter(
-                PushSubscription.user_id == user_id,
-                PushSubscription.endpoint == subscription_data["endpoint"]
-            ).first()
+            values = {
+                "user_id": user_id,
+                "endpoint": subscription_data["endpoint"],
+                "p256dh_key": subscription_data["keys"]["p256dh"],
+                "auth_token": subscription_data["keys"]["auth"],
+                "is_active": True,
+                "failure_count": 0,
+                "last_failure_at": None
+            }
             
-            if existing:
-                # Update existing subscription
-                existing.p256dh_key = subscription_data["keys"]["p256dh"]
-                existing.auth_token = subscription_data["keys"]["auth"]
-                existing.is_active = True
-                db.commit()
-                return existing
-            
-            # Create new subscription
-            subscription = PushSubscription(
-                user_id=user_id,
-                endpoint=subscription_data["endpoint"],
-                p256dh_key=subscription_data["keys"]["p256dh"],
-                auth_token=subscription_data["keys"]["auth"]
-            )
-            db.add(subscription)
+            # Endpoints are unique per browser, so a re-subscribe (possibly by
+            # another user on the same browser) takes over the existing row
+            stmt = dialect_insert(db)(PushSubscription).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PushSubscription.endpoint],
+                set_={
+                    "user_id": stmt.excluded.user_id,
+                    "p256dh_key": stmt.excluded.p256dh_key,
+                    "auth_token": stmt.excluded.auth_token,
+                    "is_active": True,
+                    "failure_count": 0,
+                    "last_failure_at": None,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            ).returning(PushSubscription.id)
+            subscription_id = db.execute(stmt).scalar_one()
             db.commit()
-            db.refresh(subscription)
-            return subscription
+            return db.get(PushSubscription, subscription_id)
             
         except Exception as e:
             logger.error(f"Error subscribing user {user_id} to push notifications: {e}")
@@ -70,7 +169,7 @@ class PushNotificationService:
             db.rollback()
             return False
     
-    def send_notification(self, subscription: PushSubscription, payload: Dict) -> bool:
+    def send_notification(self, subscription: PushSubscription, payload: Dict, ttl: int = 0) -> bool:
         """Send a push notification to a specific subscription"""
         try:
             subscription_info = {
@@ -81,26 +180,37 @@ class PushNotificationService:
                 }
             }
             
+            # Headers are signed once per push service origin and reused
             webpush(
                 subscription_info=subscription_info,
                 data=json.dumps(payload),
-                vapid_private_key=self.vapid_private_key,
-                vapid_claims=self.vapid_claims
+                headers=self.vapid_headers.get_headers(subscription.endpoint),
+                ttl=ttl
             )
+            if subscription.failure_count:
+                self.failures.record_recovered(subscription.id)
             return True
             
         except WebPushException as e:
             logger.error(f"WebPush error for subscription {subscription.id}: {e}")
-            if e.response and e.response.status_code == 410:
-                # Subscription is no longer valid
-                return self._mark_subscription_inactive(subscription)
+            if e.response is not None and e.response.status_code in (404, 410):
+                # Subscription is no longer valid, deactivated on the next flush
+                self.failures.record_dead(subscription.id)
+            else:
+                self.failures.record_failed(subscription.id)
             return False
         except Exception as e:
             logger.error(f"Error sending push notification to subscription {subscription.id}: {e}")
+            self.failures.record_failed(subscription.id)
             return False
     
-    def send_notification_to_user(self, db: Session, user_id: int, payload: Dict) -> bool:
+    def send_notification_to_user(self, db: Session, user_id: int, payload: Dict, ttl: int = 0) -> bool:
         """Send a push notification to all active subscriptions of a user"""
+        sent = self._send_to_user(db, user_id, payload, ttl)
+        self.flush_failures(db)
+        return sent
+    
+    def _send_to_user(self, db: Session, user_id: int, payload: Dict, ttl: int = 0) -> bool:
         try:
             subscriptions = db.query(PushSubscription).filter(
                 PushSubscription.user_id == user_id,
@@ -113,7 +223,7 @@ class PushNotificationService:
             
             success_count = 0
             for subscription in subscriptions:
-                if self.send_notification(subscription, payload):
+                if self.send_notification(subscription, payload, ttl):
                     success_count += 1
             
             logger.info(f"Sent push notification to {success_count}/{len(subscriptions)} subscriptions for user {user_id}")
@@ -140,11 +250,12 @@ class PushNotificationService:
             }
             
             for user in users:
-                if self.send_notification_to_user(db, user.id, payload):
+                if self._send_to_user(db, user.id, payload):
                     results["successful_sends"] += 1
                 else:
                     results["failed_sends"] += 1
             
+            self.flush_failures(db)
             logger.info(f"Bulk push notification results: {results}")
             return results
             
@@ -152,9 +263,8 @@ class PushNotificationService:
             logger.error(f"Error sending bulk push notifications: {e}")
             return {"total_users": 0, "successful_sends": 0, "failed_sends": 0}
     
-    def send_offer_expiry_notification(self, db: Session, user_id: int, offer_title: str, time_left: str) -> bool:
-        """Send a notification about offer expiry"""
-        payload = {
+    def offer_expiry_payload(self, offer_title: str, time_left: str, offer_id: Optional[int] = None) -> Dict:
+        return {
             "title": "Offer Expiring Soon!",
             "body": f"'{offer_title}' expires in {time_left}. Don't miss out!",
             "icon": "/static/icon-192x192.png",
@@ -162,6 +272,7 @@ class PushNotificationService:
             "tag": "offer-expiry",
             "data": {
                 "type": "offer_expiry",
+                "offer_id": offer_id,
                 "offer_title": offer_title,
                 "time_left": time_left
             },
@@ -176,8 +287,14 @@ class PushNotificationService:
                 }
             ]
         }
-        
-        return self.send_notification_to_user(db, user_id, payload)
+    
+    def send_offer_expiry_notification(
+        self, db: Session, user_id: int, offer_title: str, time_left: str,
+        offer_id: Optional[int] = None, ttl: int = 0
+    ) -> bool:
+        """Send a notification about offer expiry, dropped by the push service after ``ttl`` seconds"""
+        payload = self.offer_expiry_payload(offer_title, time_left, offer_id)
+        return self.send_notification_to_user(db, user_id, payload, ttl)
     
     def send_new_offer_notification(self, db: Session, user_id: int, offer_title: str, provider_name: str) -> bool:
         """Send a notification about a new offer"""
@@ -206,17 +323,73 @@ class PushNotificationService:
         
         return self.send_notification_to_user(db, user_id, payload)
     
-    def _mark_subscription_inactive(self, subscription: PushSubscription) -> bool:
-        """Mark a subscription as inactive (called when push fails)"""
+    def flush_failures(self, db: Session) -> Dict:
+        """Persist collected send failures in batched UPDATEs"""
+        dead, failed, recovered = self.failures.drain()
+        if not (dead or failed or recovered):
+            return {"deactivated": 0, "failed": 0, "recovered": 0}
+        
+        now = datetime.now(timezone.utc)
         try:
-            subscription.is_active = False
-            # Note: This requires a database session, but we don't have one here
-            # In a real implementation, you'd want to queue this for later processing
-            logger.info(f"Marked subscription {subscription.id} as inactive due to push failure")
-            return True
+            for ids in _chunks(dead):
+                db.execute(
+                    update(PushSubscription)
+                    .where(PushSubscription.id.in_(ids))
+                    .values(is_active=False, last_failure_at=now,
+                            failure_count=PushSubscription.failure_count + 1)
+                )
+            for ids in _chunks(failed):
+                db.execute(
+                    update(PushSubscription)
+                    .where(PushSubscription.id.in_(ids))
+                    .values(last_failure_at=now,
+                            failure_count=PushSubscription.failure_count + 1)
+                )
+            for ids in _chunks(recovered - dead - failed):
+                db.execute(
+                    update(PushSubscription)
+                    .where(PushSubscription.id.in_(ids))
+                    .values(failure_count=0, last_failure_at=None)
+                )
+            db.commit()
         except Exception as e:
-            logger.error(f"Error marking subscription {subscription.id} as inactive: {e}")
-            return False
+            logger.error(f"Error persisting push subscription failures: {e}")
+            db.rollback()
+            return {"deactivated": 0, "failed": 0, "recovered": 0}
+        
+        logger.info(f"Deactivated {len(dead)} dead push subscriptions, {len(failed)} failed sends recorded")
+        return {"deactivated": len(dead), "failed": len(failed), "recovered": len(recovered)}
+    
+    def reap_subscriptions(self, db: Session) -> Dict:
+        """Delete subscriptions that have been inactive or failing past the configured thresholds"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.push_inactive_retention_days)
+        try:
+            result = db.execute(
+                delete(PushSubscription).where(
+                    or_(
+                        PushSubscription.failure_count >= settings.push_max_failures,
+                        and_(
+                            PushSubscription.is_active == False,
+                            or_(
+                                PushSubscription.last_failure_at < cutoff,
+                                PushSubscription.updated_at < cutoff,
+                                and_(
+                                    PushSubscription.last_failure_at.is_(None),
+                                    PushSubscription.updated_at.is_(None),
+                                    PushSubscription.created_at < cutoff
+                                )
+                            )
+                        )
+                    )
+                ).execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error reaping push subscriptions: {e}")
+            db.rollback()
+            return {"reaped": 0}
+        
+        return {"reaped": result.rowcount}
 
 # Global instance
 push_service = PushNotificationService()
@@ -0,0 +1,196 @@
+import logging
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Offer, OfferCategory, UserLike
+from app.services.offer_lifecycle import offer_lifecycle, EXPIRE, DEACTIVATE, REMOVE
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = list(OfferCategory)
+# Upper bounds of the discount percentage bands; the last band also takes offers without a percentage
+DISCOUNT_BANDS = (10.0, 25.0, 50.0, 75.0, 100.0)
+PROVIDER_BUCKETS = 64
+
+_CATEGORY_OFFSET = 0
+_PROVIDER_OFFSET = _CATEGORY_OFFSET + len(CATEGORIES)
+_DISCOUNT_OFFSET = _PROVIDER_OFFSET + PROVIDER_BUCKETS
+DIMENSIONS = _DISCOUNT_OFFSET + len(DISCOUNT_BANDS) + 1
+
+# Relative weight of each feature group in an offer's row
+CATEGORY_WEIGHT = 1.0
+PROVIDER_WEIGHT = 1.0
+DISCOUNT_WEIGHT = 0.5
+DISLIKE_WEIGHT = -0.5
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the DB comparisons
+
+
+def feature_columns(category, provider_name: Optional[str], discount_percentage: Optional[float]) -> List[tuple]:
+    """``(column, weight)`` pairs set for an offer with these attributes"""
+    columns = []
+    if category is not None:
+        columns.append((_CATEGORY_OFFSET + CATEGORIES.index(OfferCategory(category)), CATEGORY_WEIGHT))
+    if provider_name:
+        # Hashed so the width stays fixed as providers come and go
+        bucket = zlib.crc32(provider_name.strip().lower().encode()) % PROVIDER_BUCKETS
+        columns.append((_PROVIDER_OFFSET + bucket, PROVIDER_WEIGHT))
+    if discount_percentage is None:
+        band = len(DISCOUNT_BANDS)
+    else:
+        band = next((i for i, bound in enumerate(DISCOUNT_BANDS) if discount_percentage < bound), len(DISCOUNT_BANDS) - 1)
+    columns.append((_DISCOUNT_OFFSET + band, DISCOUNT_WEIGHT))
+    return columns
+
+
+class ContentRanker:
+    """Orders candidate offers by how well they match a user's swipe history.
+
+    Active offers are rows of a float32 feature matrix (category, hashed
+    provider and discount band) kept in memory and updated row by row from
+    offers changed since the last sync. A user's affinity vector sums the
+    features of offers they liked, minus half of those they disliked, and
+    ranking is one matrix-vector product over the whole matrix followed by
+    a gather of the candidates' scores. Offers not yet in the matrix score
+    zero and keep their incoming order.
+    """
+
+    def __init__(self, history_limit: int, boost_weight: float):
+        self.history_limit = history_limit
+        self.boost_weight = boost_weight
+        self._matrix = np.zeros((1024, DIMENSIONS), dtype=np.float32)
+        self._row_of = np.full(1024, -1, dtype=np.int64)  # offer_id -> row
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+
+    def _ensure_capacity(self, offer_id: int):
+        if self._size >= len(self._matrix):
+            self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+        if offer_id >= len(self._row_of):
+            grown = np.full(max(offer_id + 1, 2 * len(self._row_of)), -1, dtype=np.int64)
+            grown[:len(self._row_of)] = self._row_of
+            self._row_of = grown
+
+    def upsert(self, offer):
+        with self._lock:
+            row = self._rows.get(offer.id)
+            if row is None:
+                self._ensure_capacity(offer.id)
+                row = self._free.pop() if self._free else self._size
+                if row == self._size:
+                    self._size += 1
+                self._rows[offer.id] = row
+                self._row_of[offer.id] = row
+            self._matrix[row] = 0.0
+            for column, weight in feature_columns(offer.category, offer.provider_name, offer.discount_percentage):
+                self._matrix[row, column] = weight
+
+    def remove(self, offer_ids: Sequence[int]):
+        with self._lock:
+            for offer_id in offer_ids:
+                row = self._rows.pop(offer_id, None)
+                if row is None:
+                    continue
+                self._matrix[row] = 0.0
+                self._row_of[offer_id] = -1
+                self._free.append(row)
+
+    def sync(self, db: Session) -> Dict:
+        """Load all live offers on first run, then offers changed since the last sync"""
+        now = _utcnow()
+        query = db.query(
+            Offer.id, Offer.category, Offer.provider_name, Offer.discount_percentage,
+            Offer.is_active, Offer.expiry_date
+        )
+        if self._last_sync is None:
+            query = query.filter(Offer.is_active == True, Offer.expiry_date > now)
+        else:
+            # Overlap the previous sync a little; upserts are idempotent
+            since = self._last_sync - timedelta(seconds=60)
+            query = query.filter(or_(Offer.created_at >= since, Offer.updated_at >= since))
+
+        loaded, removed = 0, []
+        for offer in query.yield_per(1000):
+            if offer.is_active and _naive_utc(offer.expiry_date) > now:
+                self.upsert(offer)
+                loaded += 1
+            else:
+                removed.append(offer.id)
+        self.remove(removed)
+        self._last_sync = now
+        if not loaded and not removed:
+            return {}
+        return {"loaded": loaded, "removed": len(removed)}
+
+    def affinity(self, db: Session, user_id: int) -> np.ndarray:
+        """Weighted feature sum over the user's most recent swipes, L2-normalised"""
+        recent = db.query(UserLike.offer_id, UserLike.action).filter(
+            UserLike.user_id == user_id
+        ).order_by(UserLike.created_at.desc()).limit(self.history_limit).subquery()
+        history = db.query(
+            Offer.category, Offer.provider_name, Offer.discount_percentage, recent.c.action, func.count()
+        ).join(recent, recent.c.offer_id == Offer.id).group_by(
+            Offer.category, Offer.provider_name, Offer.discount_percentage, recent.c.action
+        ).all()
+
+        vector = np.zeros(DIMENSIONS, dtype=np.float32)
+        for category, provider_name, discount_percentage, action, count in history:
+            weight = count * (1.0 if action == "like" else DISLIKE_WEIGHT)
+            for column, feature in feature_columns(category, provider_name, discount_percentage):
+                vector[column] += weight * feature
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(self, vector: np.ndarray, offer_ids: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if not self._size:
+                return np.zeros(len(offer_ids), dtype=np.float32)
+            scores = self._matrix[:self._size] @ vector
+            in_range = offer_ids < len(self._row_of)
+            rows = np.full(len(offer_ids), -1, dtype=np.int64)
+            rows[in_range] = self._row_of[offer_ids[in_range]]
+        # Offers without a row score zero
+        return np.where(rows >= 0, scores[rows], 0.0)
+
+    def rank(self, vector: np.ndarray, offer_ids: Sequence[int],
+             boosts: Optional[Dict[int, float]] = None) -> np.ndarray:
+        """Positions that order ``offer_ids`` best match first; ties keep the incoming order.
+
+        ``boosts`` adds ``boost_weight`` times a per-offer bonus, such as
+        collaborative-filtering similarity to the user's likes.
+        """
+        if not len(offer_ids) or (not vector.any() and not boosts):
+            return np.arange(len(offer_ids))
+        scores = self.score(vector, np.asarray(offer_ids, dtype=np.int64))
+        if boosts:
+            scores = scores + self.boost_weight * np.fromiter(
+                (boosts.get(offer_id, 0.0) for offer_id in offer_ids), dtype=np.float32, count=len(offer_ids)
+            )
+        return np.argsort(-scores, kind="stable")
+
+
+content_ranker = ContentRanker(settings.ranking_history_limit, settings.similar_offers_boost_weight)
+
+
+def _on_lifecycle(event: str, offer_ids: List[int]):
+    if event in (EXPIRE, DEACTIVATE, REMOVE):
+        content_ranker.remove(offer_ids)
+
+
+offer_lifecycle.register_hook(_on_lifecycle)
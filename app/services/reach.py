@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import math
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session
+from app.database import dialect_insert
+from app.models import ReachSketch
+from app.services.rollups import bucket_start, DAY
+
+logger = logging.getLogger(__name__)
+
+SEEN = "seen"
+LIKED = "liked"
+OFFER = "offer"
+CATEGORY = "category"
+
+# 2**12 one-byte registers: 4 KB per sketch, ~1.6% standard error.
+# Stored sketches can only be merged at the same precision, so this is not a setting.
+PRECISION = 12
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes.
+
+    Uses ``2**precision`` registers and has a relative standard error of
+    about ``1.04 / sqrt(2**precision)``. Sketches at the same precision merge
+    by taking the maximum of each register, so per-day and per-worker
+    sketches can be combined without losing accuracy.
+    """
+
+    def __init__(self, precision: int = PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(self.registers)}")
+
+    @staticmethod
+    def relative_error(precision: int = PRECISION) -> float:
+        return 1.04 / math.sqrt(1 << precision)
+
+    @staticmethod
+    def _hash(value) -> int:
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def add(self, value):
+        x = self._hash(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        # Sketches for quiet offers are mostly zero registers and compress well
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, precision: int = PRECISION) -> "HyperLogLog":
+        return cls(precision, zlib.decompress(blob))
+
+
+SketchKey = Tuple[str, str, str, datetime]  # scope, kind, key, day
+
+
+class ReachTracker:
+    """Per-day unique reach for each offer and category, as HyperLogLog sketches.
+
+    Views and swipes only update sketches held in this worker's memory;
+    ``flush`` merges them into ``reach_sketches`` with a register-wise max,
+    so every worker can flush into the same rows. A sketch is a few KB no
+    matter how many users it has seen.
+    """
+
+    def __init__(self):
+        self._pending: Dict[SketchKey, HyperLogLog] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, user_id: int, kind: str, offers: Iterable):
+        day = bucket_start(datetime.now(timezone.utc), DAY)
+        with self._lock:
+            for offer in offers:
+                category = getattr(offer.category, "value", offer.category) or ""
+                for scope, key in ((OFFER, str(offer.id)), (CATEGORY, category)):
+                    sketch = self._pending.get((scope, kind, key, day))
+                    if sketch is None:
+                        sketch = self._pending[(scope, kind, key, day)] = HyperLogLog()
+                    sketch.add(user_id)
+
+    def record_seen(self, user_id: int, offers: Iterable):
+        self._add(user_id, SEEN, offers)
+
+    def record_liked(self, user_id: int, offer):
+        self._add(user_id, LIKED, [offer])
+
+    def flush(self, db: Session) -> Dict:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return {}
+
+        table = ReachSketch.__table__
+        insert = dialect_insert(db)
+        try:
+            for (scope, kind, key, day), sketch in pending.items():
+                inserted = db.execute(
+                    insert(table).values(scope=scope, kind=kind, key=key, day=day, registers=sketch.to_bytes())
+                    .on_conflict_do_nothing()
+                )
+                if inserted.rowcount:
+                    continue
+                identity = and_(table.c.scope == scope, table.c.kind == kind, table.c.key == key, table.c.day == day)
+                # Lock the row so concurrent flushes from other workers merge in turn
+                stored = db.execute(table.select().where(identity).with_for_update()).first()
+                sketch.merge(HyperLogLog.from_bytes(stored.registers))
+                db.execute(update(table).where(identity).values(registers=sketch.to_bytes(), updated_at=datetime.now(timezone.utc)))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error flushing reach sketches: {e}")
+            db.rollback()
+            # Merge back so the next flush retries
+            with self._lock:
+                for sketch_key, sketch in pending.items():
+                    current = self._pending.get(sketch_key)
+                    if current is not None:
+                        sketch.merge(current)
+                    self._pending[sketch_key] = sketch
+            return {}
+
+        return {"sketches": len(pending)}
+
+    def estimate(self, db: Session, scope: str, kind: str, start: datetime, end: datetime,
+                 key: Optional[str] = None) -> List[Dict]:
+        """Merge the daily sketches in [start, end) and estimate unique users per key"""
+        filters = [
+            ReachSketch.scope == scope,
+            ReachSketch.kind == kind,
+            ReachSketch.day >= bucket_start(start, DAY),
+            ReachSketch.day < _naive_utc(end)
+        ]
+        if key is not None:
+            filters.append(ReachSketch.key == key)
+
+        merged: Dict[str, HyperLogLog] = {}
+        days: Dict[str, int] = {}
+        for row in db.query(ReachSketch.key, ReachSketch.registers).filter(and_(*filters)).yield_per(500):
+            sketch = HyperLogLog.from_bytes(row.registers)
+            if row.key in merged:
+                merged[row.key].merge(sketch)
+            else:
+                merged[row.key] = sketch
+            days[row.key] = days.get(row.key, 0) + 1
+
+        return [
+            {"key": sketch_key, "unique_users": sketch.count(), "days": days[sketch_key]}
+            for sketch_key, sketch in sorted(merged.items())
+        ]
+
+
+reach_tracker = ReachTracker()
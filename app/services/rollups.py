@@ -0,0 +1,248 @@
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import MetricRollup, Notification, Offer, OfferDailyStat, RollupWatermark, User, UserLike
+
+logger = logging.getLogger(__name__)
+
+HOUR = "hour"
+DAY = "day"
+GRANULARITY_SECONDS = {HOUR: 3600, DAY: 86400}
+METRICS = ("swipes", "likes", "dislikes", "signups", "notifications")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    value = _naive_utc(value).replace(minute=0, second=0, microsecond=0)
+    if granularity == DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+def get_watermark(db: Session, name: str) -> int:
+    watermark = db.get(RollupWatermark, name)
+    return watermark.last_id if watermark else 0
+
+
+def set_watermark(db: Session, name: str, last_id: int):
+    insert = dialect_insert(db)
+    stmt = insert(RollupWatermark.__table__).values(name=name, last_id=last_id)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[RollupWatermark.__table__.c.name],
+        set_={"last_id": last_id, "updated_at": datetime.now(timezone.utc)}
+    ))
+
+
+def add_offer_daily_stats(db: Session, deltas: Dict[Tuple[int, datetime], List[int]]):
+    """Add ``{(offer_id, day): [impressions, likes, dislikes]}`` to offer_daily_stats"""
+    rows = [
+        {"offer_id": offer_id, "day": day, "impressions": impressions, "likes": likes, "dislikes": dislikes}
+        for (offer_id, day), (impressions, likes, dislikes) in deltas.items()
+        if impressions or likes or dislikes
+    ]
+    if not rows:
+        return
+    table = OfferDailyStat.__table__
+    insert = dialect_insert(db)
+    stmt = insert(table).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.offer_id, table.c.day],
+        set_={
+            "impressions": table.c.impressions + stmt.excluded.impressions,
+            "likes": table.c.likes + stmt.excluded.likes,
+            "dislikes": table.c.dislikes + stmt.excluded.dislikes
+        }
+    ))
+
+
+def _category_value(category) -> str:
+    return getattr(category, "value", category) or ""
+
+
+class RollupPipeline:
+    """Folds new swipes, signups and notifications into hourly and daily buckets.
+
+    Swipes are also folded into per-offer daily likes and dislikes in
+    ``offer_daily_stats``, under their own watermark.
+
+    Each source is read by primary key past its watermark, in batches, and
+    the bucket increments and the new watermark commit together, so every
+    row is counted exactly once and a run only touches new rows. Rows newer
+    than ``lag_seconds`` are left for the next run, so IDs that commit out
+    of order are not skipped.
+    """
+
+    def __init__(self, batch_size: int, max_batches: int, lag_seconds: int):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.lag_seconds = lag_seconds
+
+    def _swipe_rows(self, db: Session, after_id: int):
+        return db.query(
+            UserLike.id, UserLike.created_at, UserLike.action, Offer.category, Offer.provider_name
+        ).join(Offer, Offer.id == UserLike.offer_id).filter(
+            UserLike.id > after_id
+        ).order_by(UserLike.id).limit(self.batch_size).all()
+
+    def _offer_swipe_rows(self, db: Session, after_id: int):
+        return db.query(UserLike.id, UserLike.created_at, UserLike.offer_id, UserLike.action).filter(
+            UserLike.id > after_id
+        ).order_by(UserLike.id).limit(self.batch_size).all()
+
+    def _signup_rows(self, db: Session, after_id: int):
+        return db.query(User.id, User.created_at).filter(
+            User.id > after_id
+        ).order_by(User.id).limit(self.batch_size).all()
+
+    def _notification_rows(self, db: Session, after_id: int):
+        return db.query(
+            Notification.id, Notification.sent_at.label("created_at"), Offer.category, Offer.provider_name
+        ).join(Offer, Offer.id == Notification.offer_id).filter(
+            Notification.id > after_id
+        ).order_by(Notification.id).limit(self.batch_size).all()
+
+    @staticmethod
+    def _swipe_events(row) -> List[Tuple[str, str, str]]:
+        key = (_category_value(row.category), row.provider_name or "")
+        return [("swipes",) + key, (("likes" if row.action == "like" else "dislikes"),) + key]
+
+    @staticmethod
+    def _signup_events(row) -> List[Tuple[str, str, str]]:
+        return [("signups", "", "")]
+
+    @staticmethod
+    def _notification_events(row) -> List[Tuple[str, str, str]]:
+        return [("notifications", _category_value(row.category), row.provider_name or "")]
+
+    @staticmethod
+    def _metric_applier(events: Callable) -> Callable:
+        def apply(db: Session, rows):
+            counts = Counter()
+            for row in rows:
+                for metric, category, provider in events(row):
+                    for granularity in GRANULARITY_SECONDS:
+                        counts[(granularity, bucket_start(row.created_at, granularity), metric, category, provider)] += 1
+            if not counts:
+                return
+            insert = dialect_insert(db)
+            stmt = insert(MetricRollup.__table__).values([
+                {"granularity": granularity, "bucket_start": start, "metric": metric,
+                 "category": category, "provider": provider, "value": value}
+                for (granularity, start, metric, category, provider), value in counts.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["granularity", "metric", "bucket_start", "category", "provider"],
+                set_={"value": MetricRollup.__table__.c.value + stmt.excluded.value}
+            ))
+        return apply
+
+    @staticmethod
+    def _apply_offer_daily(db: Session, rows):
+        deltas: Dict[Tuple[int, datetime], List[int]] = {}
+        for row in rows:
+            values = deltas.setdefault((row.offer_id, bucket_start(row.created_at, DAY)), [0, 0, 0])
+            values[1 if row.action == "like" else 2] += 1
+        add_offer_daily_stats(db, deltas)
+
+    def _fold(self, db: Session, name: str, fetch: Callable, apply: Callable, cutoff: datetime) -> int:
+        processed = 0
+        for _ in range(self.max_batches):
+            rows = fetch(db, get_watermark(db, name))
+            ready = []
+            for row in rows:
+                if row.created_at is None or _naive_utc(row.created_at) > cutoff:
+                    break
+                ready.append(row)
+            if not ready:
+                break
+
+            apply(db, ready)
+            set_watermark(db, name, ready[-1].id)
+            db.commit()
+            processed += len(ready)
+            if len(ready) < self.batch_size:
+                break
+        return processed
+
+    def run(self, db: Session) -> Dict:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.lag_seconds)
+        try:
+            result = {
+                "swipes": self._fold(db, "rollup:user_likes", self._swipe_rows,
+                                     self._metric_applier(self._swipe_events), cutoff),
+                "signups": self._fold(db, "rollup:users", self._signup_rows,
+                                      self._metric_applier(self._signup_events), cutoff),
+                "notifications": self._fold(db, "rollup:notifications", self._notification_rows,
+                                            self._metric_applier(self._notification_events), cutoff),
+                "offer_swipes": self._fold(db, "rollup:offer_daily", self._offer_swipe_rows,
+                                           self._apply_offer_daily, cutoff)
+            }
+        except Exception as e:
+            logger.error(f"Error updating metric rollups: {e}")
+            db.rollback()
+            return {}
+        return result if any(result.values()) else {}
+
+    def timeseries(self, db: Session, metric: str, start: datetime, end: datetime,
+                   granularity: Optional[str] = None, group_by: Optional[str] = None,
+                   category: Optional[str] = None, provider: Optional[str] = None,
+                   max_points: int = 200) -> Dict:
+        """Read a metric from the rollup tables, downsampled to at most ``max_points`` per series"""
+        start, end = _naive_utc(start), _naive_utc(end)
+        if granularity is None:
+            granularity = HOUR if end - start <= timedelta(days=7) else DAY
+
+        filters = [
+            MetricRollup.granularity == granularity,
+            MetricRollup.metric == metric,
+            MetricRollup.bucket_start >= bucket_start(start, granularity),
+            MetricRollup.bucket_start < end
+        ]
+        if category:
+            filters.append(MetricRollup.category == category)
+        if provider:
+            filters.append(MetricRollup.provider == provider)
+        rows = db.query(
+            MetricRollup.bucket_start, MetricRollup.category, MetricRollup.provider, MetricRollup.value
+        ).filter(and_(*filters)).all()
+
+        step_seconds = GRANULARITY_SECONDS[granularity]
+        bucket_count = max(math.ceil((end - bucket_start(start, granularity)).total_seconds() / step_seconds), 1)
+        if bucket_count > max_points:
+            # Downsample by merging consecutive buckets
+            step_seconds *= math.ceil(bucket_count / max_points)
+        origin = bucket_start(start, granularity)
+
+        series: Dict[str, Counter] = {}
+        for row in rows:
+            key = row.category if group_by == "category" else row.provider if group_by == "provider" else "all"
+            offset = int((_naive_utc(row.bucket_start) - origin).total_seconds() // step_seconds)
+            series.setdefault(key or "none", Counter())[origin + timedelta(seconds=offset * step_seconds)] += row.value
+
+        return {
+            "metric": metric,
+            "granularity": granularity,
+            "step_seconds": step_seconds,
+            "series": [
+                {"key": key, "points": [{"bucket_start": point, "value": value} for point, value in sorted(points.items())]}
+                for key, points in sorted(series.items())
+            ]
+        }
+
+
+rollup_pipeline = RollupPipeline(
+    settings.rollup_batch_size,
+    settings.rollup_max_batches,
+    settings.rollup_lag_seconds
+)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs a synchronous job with its own DB session every ``interval_seconds``"""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[Session], object], per_worker: bool = False):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.per_worker = per_worker
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            return self.func(db)
+        finally:
+            db.close()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                # Jobs use the blocking SQLAlchemy session, keep them off the event loop
+                result = await asyncio.to_thread(self.run_once)
+                if result:
+                    logger.info(f"Background job {self.name}: {result}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background job {self.name} failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class Scheduler:
+    """Registry of background jobs started and stopped with the application.
+
+    Jobs run on one worker only unless registered with ``per_worker=True``,
+    which is meant for jobs that flush state held in the worker's memory.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, PeriodicTask] = {}
+        self._shutdown_hooks: List[Callable[[], object]] = []
+
+    def add_job(self, name: str, interval_seconds: float, func: Callable[[Session], object],
+                per_worker: bool = False) -> PeriodicTask:
+        task = PeriodicTask(name, interval_seconds, func, per_worker)
+        self.tasks[name] = task
+        return task
+
+    def on_shutdown(self, hook: Callable[[], object]):
+        """Register a synchronous hook to run after the jobs are stopped"""
+        self._shutdown_hooks.append(hook)
+
+    def start(self, include_shared: bool = True):
+        for task in self.tasks.values():
+            if task.per_worker or include_shared:
+                task.start()
+
+    async def stop(self):
+        for task in self.tasks.values():
+            await task.stop()
+        for hook in self._shutdown_hooks:
+            try:
+                await asyncio.to_thread(hook)
+            except Exception as e:
+                logger.error(f"Shutdown hook failed: {e}")
+
+
+scheduler = Scheduler()
@@ -0,0 +1,175 @@
+import logging
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import Float, Integer, and_, literal, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+# Tokens keep the characters of emails and phone numbers so they match by prefix
+_TOKEN = re.compile(r"[\w@.+-]+")
+
+# SQLite: external-content FTS5 tables over users and offers, kept in sync by triggers
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        email, username, full_name, phone,
+        content='users', content_rowid='id',
+        tokenize="unicode61 tokenchars '@.+_-'", prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, username, full_name, phone)
+        VALUES (new.id, new.email, new.username, new.full_name, new.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, username, full_name, phone)
+        VALUES ('delete', old.id, old.email, old.username, old.full_name, old.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF email, username, full_name, phone ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, username, full_name, phone)
+        VALUES ('delete', old.id, old.email, old.username, old.full_name, old.phone);
+        INSERT INTO users_fts(rowid, email, username, full_name, phone)
+        VALUES (new.id, new.email, new.username, new.full_name, new.phone);
+    END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+        title, description, provider_name,
+        content='offers', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_insert AFTER INSERT ON offers BEGIN
+        INSERT INTO offers_fts(rowid, title, description, provider_name)
+        VALUES (new.id, new.title, new.description, new.provider_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_delete AFTER DELETE ON offers BEGIN
+        INSERT INTO offers_fts(offers_fts, rowid, title, description, provider_name)
+        VALUES ('delete', old.id, old.title, old.description, old.provider_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_update AFTER UPDATE OF title, description, provider_name ON offers BEGIN
+        INSERT INTO offers_fts(offers_fts, rowid, title, description, provider_name)
+        VALUES ('delete', old.id, old.title, old.description, old.provider_name);
+        INSERT INTO offers_fts(rowid, title, description, provider_name)
+        VALUES (new.id, new.title, new.description, new.provider_name);
+    END""",
+]
+
+# PostgreSQL objects created by migration 5b8d2f4e7a31, as (catalog, name)
+POSTGRES_OBJECTS = [
+    ("column", "users.search_vector"),
+    ("column", "offers.search_vector"),
+    ("trigger", "users_search_vector_trigger"),
+    ("trigger", "offers_search_vector_trigger"),
+    ("index", "ix_users_search_vector"),
+    ("index", "ix_users_email_trgm"),
+    ("index", "ix_users_phone_trgm"),
+    ("index", "ix_offers_search_vector"),
+]
+
+
+def install_search_index(engine: Engine):
+    """Create the SQLite FTS tables if missing; on PostgreSQL only check the migration ran.
+
+    The PostgreSQL DDL and backfill take ACCESS EXCLUSIVE locks and rewrite
+    whole tables, so they live in the Alembic migration and never run on
+    worker start.
+    """
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as connection:
+            existing = {row[0] for row in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE name IN ('users_fts', 'offers_fts')")
+            )}
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+            for table in ("users_fts", "offers_fts"):
+                if table not in existing:
+                    connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+    elif engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            found = {("column", f"{row[0]}.{row[1]}") for row in connection.execute(text(
+                "SELECT table_name, column_name FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND column_name = 'search_vector'"
+            ))}
+            found |= {("trigger", row[0]) for row in connection.execute(text("SELECT tgname FROM pg_trigger"))}
+            found |= {("index", row[0]) for row in connection.execute(
+                text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+            )}
+        missing = [name for kind, name in POSTGRES_OBJECTS if (kind, name) not in found]
+        if missing:
+            logger.warning(f"Admin search index incomplete, run 'alembic upgrade head'; missing: {', '.join(missing)}")
+
+
+def _tokens(term: str) -> List[str]:
+    return _TOKEN.findall(term)
+
+
+def _fts5_query(term: str) -> str:
+    # Every token is a quoted prefix, so user input cannot inject FTS5 syntax
+    return " ".join('"{}"*'.format(token.replace('"', '""')) for token in _tokens(term))
+
+
+def _tsquery(term: str) -> str:
+    return " & ".join("'{}':*".format(token.replace("\\", "").replace("'", "''")) for token in _tokens(term))
+
+
+def _like_prefix(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class AdminSearch:
+    """Ranked, keyset-paginated admin search over users and offers.
+
+    Matching uses FTS5 on SQLite and tsvector/pg_trgm GIN indexes on
+    PostgreSQL (see ``install_search_index``). Results are ordered by a
+    ``rank`` where lower is better, then by ID, and the cursor is the
+    ``(rank, id)`` of the last row of a page.
+    """
+
+    def _matches(self, db: Session, kind: str, term: str):
+        """Subquery of ``(id, rank)`` for rows matching ``term``, or None when there is nothing to match"""
+        if not _tokens(term):
+            return None
+        if db.bind.dialect.name == "sqlite":
+            table = f"{kind}_fts"
+            statement = text(
+                f"SELECT rowid AS id, bm25({table}) AS rank FROM {table} WHERE {table} MATCH :query"
+            ).bindparams(query=_fts5_query(term))
+        elif kind == "users":
+            statement = text(
+                "SELECT id, -(ts_rank_cd(search_vector, query)"
+                " + CASE WHEN email ILIKE :prefix OR phone LIKE :prefix THEN 1 ELSE 0 END) AS rank"
+                " FROM users, to_tsquery('simple', :query) query"
+                " WHERE search_vector @@ query OR email ILIKE :prefix OR phone LIKE :prefix"
+            ).bindparams(query=_tsquery(term), prefix=_like_prefix(term.strip()))
+        else:
+            statement = text(
+                "SELECT id, -ts_rank_cd(search_vector, query) AS rank"
+                " FROM offers, to_tsquery('english', :query) query"
+                " WHERE search_vector @@ query"
+            ).bindparams(query=_tsquery(term))
+        return statement.columns(id=Integer, rank=Float).subquery()
+
+    def search(self, db: Session, query: Query, model, term: Optional[str], cursor: Optional[list],
+               limit: int, skip: int = 0) -> List[Tuple]:
+        """Apply the search to an ORM query over ``model``; returns ``(row, rank)`` pairs.
+
+        ``skip`` is the legacy offset and is only honoured without a cursor.
+        """
+        if term and term.strip():
+            matches = self._matches(db, "users" if model is User else "offers", term)
+            if matches is None:
+                return []  # Only punctuation, nothing can match
+            rank = matches.c.rank
+            query = query.add_columns(rank).join(matches, matches.c.id == model.id)
+            if cursor is not None:
+                after_rank, after_id = cursor
+                query = query.filter(or_(rank > after_rank, and_(rank == after_rank, model.id > after_id)))
+            query = query.order_by(rank, model.id)
+        else:
+            if cursor is not None:
+                query = query.filter(model.id > cursor[1])
+            query = query.add_columns(literal(0.0, Float)).order_by(model.id)
+        if cursor is None and skip:
+            query = query.offset(skip)
+        return [tuple(row) for row in query.limit(limit).all()]
+
+
+admin_search = AdminSearch()
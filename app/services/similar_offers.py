@@ -0,0 +1,200 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import OfferNeighbors, UserLike
+from app.services.rollups import get_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "similar_offers:user_likes"
+
+
+def pack_neighbors(offer_ids: np.ndarray, scores: np.ndarray) -> bytes:
+    """Neighbor IDs as little-endian int32 followed by their scores as float32"""
+    return offer_ids.astype("<i4").tobytes() + scores.astype("<f4").tobytes()
+
+
+def unpack_neighbors(blob: bytes) -> List[Tuple[int, float]]:
+    count = len(blob) // 8
+    offer_ids = np.frombuffer(blob, dtype="<i4", count=count)
+    scores = np.frombuffer(blob, dtype="<f4", count=count, offset=4 * count)
+    return list(zip(offer_ids.tolist(), scores.tolist()))
+
+
+class SimilarOffersJob:
+    """Item-item collaborative filtering over likes ("users who liked this also liked").
+
+    Likes form a sparse binary user x offer matrix. Cosine similarity between
+    offer columns is computed ``chunk_size`` offers at a time as a sparse
+    product, so memory is bounded by one chunk of the similarity matrix, and
+    only the ``top_n`` neighbors with at least ``min_support`` shared likers
+    are kept per offer.
+
+    The scheduled run recomputes only offers liked since the last run and
+    the offers sharing a liker with them, whose scores against the changed
+    offers moved too. It reads just the likes of users who liked one of
+    those offers, with global like counts for normalization, so its cost
+    follows the changes rather than the table. A full recompute
+    (``scripts/compute_similar_offers.py``) also picks up removed likes and
+    can split the chunks across processes.
+    """
+
+    def __init__(self, top_n: int, chunk_size: int, min_support: int):
+        self.top_n = top_n
+        self.chunk_size = chunk_size
+        self.min_support = min_support
+
+    def _load_matrix(self, db: Session, users_subquery=None) -> Tuple[csr_matrix, np.ndarray]:
+        """Likes as a user x offer matrix, of every user or those in ``users_subquery``"""
+        users: Dict[int, int] = {}
+        offers: Dict[int, int] = {}
+        rows, cols = [], []
+        query = db.query(UserLike.user_id, UserLike.offer_id).filter(UserLike.action == "like")
+        if users_subquery is not None:
+            query = query.filter(UserLike.user_id.in_(users_subquery))
+        for user_id, offer_id in query.yield_per(10000):
+            rows.append(users.setdefault(user_id, len(users)))
+            cols.append(offers.setdefault(offer_id, len(offers)))
+        matrix = csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+            shape=(len(users), len(offers))
+        )
+        matrix.data[:] = 1.0  # Duplicates were summed
+        return matrix, np.fromiter(offers, dtype=np.int64, count=len(offers))
+
+    def _neighbors(self, similarity: csr_matrix, columns: np.ndarray, counts: np.ndarray,
+                   offer_ids: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for position, column in enumerate(columns):
+            start, end = similarity.indptr[position], similarity.indptr[position + 1]
+            neighbors = similarity.indices[start:end]
+            scores = similarity.data[start:end]
+            # Recover shared likers from the cosine to apply the support threshold
+            shared = np.rint(scores * np.sqrt(counts[column] * counts[neighbors]))
+            keep = (neighbors != column) & (shared >= self.min_support)
+            neighbors, scores = neighbors[keep], scores[keep]
+            if len(scores) > self.top_n:
+                best = np.argpartition(-scores, self.top_n - 1)[:self.top_n]
+                neighbors, scores = neighbors[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            yield int(offer_ids[column]), pack_neighbors(offer_ids[neighbors[order]], scores[order])
+
+    def _store(self, db: Session, results: List[Tuple[int, bytes]]):
+        table = OfferNeighbors.__table__
+        insert = dialect_insert(db)
+        now = datetime.now(timezone.utc)
+        stmt = insert(table).values([
+            {"offer_id": offer_id, "neighbors": blob, "updated_at": now} for offer_id, blob in results
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.offer_id],
+            set_={"neighbors": stmt.excluded.neighbors, "updated_at": stmt.excluded.updated_at}
+        ))
+
+    def _like_counts(self, db: Session, offer_ids: np.ndarray) -> np.ndarray:
+        """Likes per offer over the whole table, in ``offer_ids`` order"""
+        totals: Dict[int, int] = {}
+        for start in range(0, len(offer_ids), 10000):
+            batch = offer_ids[start:start + 10000].tolist()
+            totals.update(db.query(UserLike.offer_id, func.count(UserLike.id)).filter(
+                UserLike.action == "like", UserLike.offer_id.in_(batch)
+            ).group_by(UserLike.offer_id).all())
+        return np.array([totals.get(offer_id, 0) for offer_id in offer_ids.tolist()], dtype=np.float64)
+
+    def compute(self, db: Session, only_offer_ids: Optional[Iterable[int]] = None,
+                shard: int = 0, shards: int = 1) -> int:
+        """Recompute neighbor lists, for every liked offer or around ``only_offer_ids``.
+
+        ``only_offer_ids`` are offers whose likers changed; they are
+        recomputed together with the offers sharing a liker with them. With
+        ``shards > 1`` this process handles every ``shards``-th chunk,
+        starting at ``shard``, so several processes can share a full run.
+        """
+        if only_offer_ids is None:
+            matrix, offer_ids = self._load_matrix(db)
+            if not len(offer_ids):
+                return 0
+            counts = np.asarray(matrix.getnnz(axis=0), dtype=np.float64)
+            columns = np.arange(len(offer_ids))
+        else:
+            likes = select(UserLike.offer_id).where(UserLike.action == "like")
+            changed = list(only_offer_ids)
+            likers = select(UserLike.user_id).where(UserLike.action == "like", UserLike.offer_id.in_(changed))
+            # Changed offers and their reverse neighbors: every score they take part in moved
+            affected = likes.where(UserLike.user_id.in_(likers))
+            # Everyone who liked an affected offer, enough for their full similarity rows
+            matrix, offer_ids = self._load_matrix(
+                db, select(UserLike.user_id).where(UserLike.action == "like", UserLike.offer_id.in_(affected))
+            )
+            if not len(offer_ids):
+                return 0
+            counts = self._like_counts(db, offer_ids)
+            wanted = np.array([row.offer_id for row in db.execute(affected.distinct())], dtype=np.int64)
+            columns = np.flatnonzero(np.isin(offer_ids, wanted))
+
+        normalized = (matrix @ diags(1.0 / np.sqrt(np.maximum(counts, 1.0)))).tocsr().astype(np.float32)
+        by_column = normalized.T.tocsr()  # offers x users
+
+        computed = 0
+        for index, start in enumerate(range(0, len(columns), self.chunk_size)):
+            if index % shards != shard:
+                continue
+            chunk = columns[start:start + self.chunk_size]
+            similarity = (by_column[chunk] @ normalized).tocsr()  # chunk x offers
+            similarity.sort_indices()
+            self._store(db, list(self._neighbors(similarity, chunk, counts, offer_ids)))
+            db.commit()
+            computed += len(chunk)
+
+        if only_offer_ids is None and shard == 0:
+            # Offers that lost all their likes
+            db.query(OfferNeighbors).filter(
+                OfferNeighbors.offer_id.notin_(db.query(UserLike.offer_id).filter(UserLike.action == "like"))
+            ).delete(synchronize_session=False)
+            db.commit()
+        return computed
+
+    def run(self, db: Session) -> Dict:
+        """Scheduled incremental recompute around offers liked since the last run"""
+        after_id = get_watermark(db, WATERMARK)
+        last_id = db.query(func.max(UserLike.id)).scalar() or 0
+        if last_id <= after_id:
+            return {}
+
+        if after_id == 0:
+            computed = self.compute(db)
+        else:
+            changed = [row.offer_id for row in db.query(UserLike.offer_id).filter(
+                UserLike.id > after_id, UserLike.id <= last_id, UserLike.action == "like"
+            ).distinct()]
+            computed = self.compute(db, changed) if changed else 0
+        set_watermark(db, WATERMARK, last_id)
+        db.commit()
+        return {"offers": computed, "full": after_id == 0}
+
+    def neighbors(self, db: Session, offer_id: int) -> List[Tuple[int, float]]:
+        row = db.get(OfferNeighbors, offer_id)
+        return unpack_neighbors(row.neighbors) if row else []
+
+    def boosts(self, db: Session, user_id: int, recent_likes: int = 20) -> Dict[int, float]:
+        """Summed similarity of offers to the user's most recent likes"""
+        liked = db.query(UserLike.offer_id).filter(
+            UserLike.user_id == user_id, UserLike.action == "like"
+        ).order_by(UserLike.created_at.desc()).limit(recent_likes).subquery()
+        boosts: Dict[int, float] = {}
+        for row in db.query(OfferNeighbors.neighbors).filter(OfferNeighbors.offer_id.in_(liked.select())):
+            for neighbor_id, score in unpack_neighbors(row.neighbors):
+                boosts[neighbor_id] = boosts.get(neighbor_id, 0.0) + score
+        return boosts
+
+
+similar_offers = SimilarOffersJob(
+    settings.similar_offers_top_n,
+    settings.similar_offers_chunk_size,
+    settings.similar_offers_min_support
+)
@@ -0,0 +1,266 @@
+import logging
+import re
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models import Offer
+from app.services.offer_lifecycle import offer_lifecycle, ACTIVATE, UPDATE, EXPIRE, DEACTIVATE, REMOVE
+
+logger = logging.getLogger(__name__)
+
+# Hashed vocabulary; terms that share a bucket get independent signs so collisions cancel out on average
+DIMENSIONS = 1 << 18
+# Strongest terms kept per offer, which fixes the memory per offer
+MAX_TERMS = 24
+
+TITLE_WEIGHT = 2.0
+PROVIDER_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from get in is it of off on or our the this to up with you your".split()
+)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the DB comparisons
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    words = [word for word in _TOKEN.findall((text or "").lower()) if len(word) > 1 and word not in STOPWORDS]
+    # Adjacent word pairs catch phrases like "free shipping"
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def term_frequencies(title: Optional[str], description: Optional[str], provider_name: Optional[str]) -> Counter:
+    """Signed weighted term counts keyed by hashed bucket"""
+    counts = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (provider_name, PROVIDER_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+        for token in _tokens(text):
+            digest = zlib.crc32(token.encode())
+            counts[digest % DIMENSIONS] += weight if digest >> 31 else -weight
+    return counts
+
+
+class TextSimilarityIndex:
+    """In-memory hashed TF-IDF vectors of live offers for "more like this" queries.
+
+    Each offer keeps its ``MAX_TERMS`` strongest hashed terms from title,
+    provider and description in fixed-width arrays, so memory is bounded at
+    about ``MAX_TERMS * 20`` bytes per offer, term-major copy included
+    (about 60 MB for 100k offers).
+    After changes the TF-IDF weights are recomputed and copied into a
+    term-major (CSC) matrix, so a cosine query only reads the postings of
+    its own terms. Offers changed by admins on this worker are reloaded
+    before the next query; the sync job picks up changes from other workers.
+    """
+
+    def __init__(self):
+        capacity = 1024
+        self._indices = np.zeros((capacity, MAX_TERMS), dtype=np.int32)
+        self._tf = np.zeros((capacity, MAX_TERMS), dtype=np.float32)
+        self._weights = np.zeros((capacity, MAX_TERMS), dtype=np.float32)
+        self._lengths = np.zeros(capacity, dtype=np.int32)
+        self._offer_ids = np.full(capacity, -1, dtype=np.int64)
+        self._df = np.zeros(DIMENSIONS, dtype=np.int32)
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._dirty: Set[int] = set()
+        self._stale_weights = False
+        self._by_term = csr_matrix((0, DIMENSIONS), dtype=np.float32).tocsc()
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(array.nbytes for array in (
+            self._indices, self._tf, self._weights, self._lengths, self._offer_ids, self._df,
+            self._by_term.data, self._by_term.indices, self._by_term.indptr
+        ))
+
+    def _grow(self):
+        for name in ("_indices", "_tf", "_weights"):
+            array = getattr(self, name)
+            setattr(self, name, np.vstack([array, np.zeros_like(array)]))
+        self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+        self._offer_ids = np.concatenate([self._offer_ids, np.full_like(self._offer_ids, -1)])
+
+    def _remove_row(self, offer_id: int):
+        row = self._rows.pop(offer_id, None)
+        if row is None:
+            return
+        length = self._lengths[row]
+        self._df[self._indices[row, :length]] -= 1
+        self._indices[row] = 0
+        self._tf[row] = 0.0
+        self._weights[row] = 0.0
+        self._lengths[row] = 0
+        self._offer_ids[row] = -1
+        self._free.append(row)
+        self._stale_weights = True
+
+    def upsert(self, offer):
+        counts = term_frequencies(offer.title, offer.description, offer.provider_name)
+        terms = sorted(((bucket, count) for bucket, count in counts.items() if count),
+                       key=lambda term: -abs(term[1]))[:MAX_TERMS]
+        with self._lock:
+            self._remove_row(offer.id)
+            if not terms:
+                return
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._size >= len(self._offer_ids):
+                    self._grow()
+                row = self._size
+                self._size += 1
+            buckets = np.array([bucket for bucket, _ in terms], dtype=np.int32)
+            self._indices[row, :len(terms)] = buckets
+            self._tf[row, :len(terms)] = [count for _, count in terms]
+            self._lengths[row] = len(terms)
+            self._offer_ids[row] = offer.id
+            self._df[buckets] += 1
+            self._rows[offer.id] = row
+            self._stale_weights = True
+
+    def remove(self, offer_ids: Sequence[int]):
+        with self._lock:
+            for offer_id in offer_ids:
+                self._remove_row(offer_id)
+                self._dirty.discard(offer_id)
+
+    def mark_dirty(self, offer_ids: Sequence[int]):
+        with self._lock:
+            self._dirty.update(offer_ids)
+
+    def _reweight(self):
+        # Recompute every row with the current IDF; vectorised, a few ms at 100k offers
+        documents = len(self._rows)
+        idf = (np.log((1.0 + documents) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        size = self._size
+        weights = self._tf[:size] * idf[self._indices[:size]]
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        np.divide(weights, norms, out=weights, where=norms > 0)
+        self._weights[:size] = weights
+        by_term = csr_matrix(
+            (weights.ravel(), self._indices[:size].ravel(), np.arange(0, size * MAX_TERMS + 1, MAX_TERMS)),
+            shape=(size, DIMENSIONS)
+        )
+        by_term.eliminate_zeros()  # Padding and freed rows
+        self._by_term = by_term.tocsc()
+        self._stale_weights = False
+
+    def _load(self, db: Session, query) -> Tuple[List[int], List[int]]:
+        now = _utcnow()
+        loaded, removed = [], []
+        for offer in query.yield_per(1000):
+            if offer.is_active and _naive_utc(offer.expiry_date) > now:
+                self.upsert(offer)
+                loaded.append(offer.id)
+            else:
+                removed.append(offer.id)
+        self.remove(removed)
+        return loaded, removed
+
+    def _columns(self, db: Session):
+        return db.query(
+            Offer.id, Offer.title, Offer.description, Offer.provider_name, Offer.is_active, Offer.expiry_date
+        )
+
+    def refresh(self, db: Session):
+        """Reload offers marked dirty by admin changes on this worker"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if dirty:
+            loaded, removed = self._load(db, self._columns(db).filter(Offer.id.in_(dirty)))
+            # Offers deleted since they were marked are no longer in the table
+            self.remove(list(dirty - set(loaded) - set(removed)))
+
+    def sync(self, db: Session) -> Dict:
+        """Load all live offers on first run, then offers changed since the last sync"""
+        now = _utcnow()
+        query = self._columns(db)
+        if self._last_sync is None:
+            query = query.filter(Offer.is_active == True, Offer.expiry_date > now)
+        else:
+            # Overlap the previous sync a little; upserts are idempotent
+            since = self._last_sync - timedelta(seconds=60)
+            query = query.filter(or_(Offer.created_at >= since, Offer.updated_at >= since))
+        loaded, removed = self._load(db, query)
+        self._last_sync = now
+        with self._lock:
+            if self._stale_weights:
+                self._reweight()
+        if not loaded and not removed:
+            return {}
+        return {"loaded": len(loaded), "removed": len(removed)}
+
+    def _scores(self, rows: Sequence[int]) -> np.ndarray:
+        """Cosine similarity of every row to the normalised sum of ``rows``"""
+        lengths = self._lengths[rows]
+        mask = np.arange(MAX_TERMS) < lengths[:, None]
+        terms, inverse = np.unique(self._indices[rows][mask], return_inverse=True)
+        values = np.bincount(inverse, weights=self._weights[rows][mask]).astype(np.float32)
+        norm = np.linalg.norm(values)
+        if norm:
+            values /= norm
+        return np.asarray(self._by_term[:, terms] @ values).ravel()
+
+    def similar(self, db: Session, offer_ids: Sequence[int], limit: int) -> List[Tuple[int, float]]:
+        """Offers closest to the combined text of ``offer_ids``, best first, excluding them"""
+        self.refresh(db)
+        with self._lock:
+            if self._stale_weights:
+                self._reweight()
+            rows = [self._rows[offer_id] for offer_id in offer_ids if offer_id in self._rows]
+            if not rows:
+                return []
+            scores = self._scores(rows)
+            scores[rows] = -1.0
+            scores[self._offer_ids[:self._size] < 0] = -1.0
+            count = min(limit, len(scores))
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [(int(self._offer_ids[row]), float(scores[row])) for row in best if scores[row] > 0]
+
+    def rank(self, db: Session, seed_ids: Sequence[int], offer_ids: Sequence[int]) -> np.ndarray:
+        """Positions that order ``offer_ids`` by text similarity to the seeds; ties keep the incoming order"""
+        self.refresh(db)
+        with self._lock:
+            if self._stale_weights:
+                self._reweight()
+            rows = [self._rows[offer_id] for offer_id in seed_ids if offer_id in self._rows]
+            if not rows or not len(offer_ids):
+                return np.arange(len(offer_ids))
+            scores = self._scores(rows)
+            candidate_rows = np.fromiter((self._rows.get(offer_id, -1) for offer_id in offer_ids),
+                                         dtype=np.int64, count=len(offer_ids))
+        candidate_scores = np.where(candidate_rows >= 0, scores[candidate_rows], 0.0)
+        return np.argsort(-candidate_scores, kind="stable")
+
+
+text_index = TextSimilarityIndex()
+
+
+def _on_lifecycle(event: str, offer_ids: List[int]):
+    if event in (ACTIVATE, UPDATE):
+        text_index.mark_dirty(offer_ids)
+    elif event in (EXPIRE, DEACTIVATE, REMOVE):
+        text_index.remove(offer_ids)
+
+
+offer_lifecycle.register_hook(_on_lifecycle)
@@ -0,0 +1,273 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import Offer, OfferTrendingScore
+from app.services.offer_lifecycle import offer_lifecycle, EXPIRE, DEACTIVATE, REMOVE
+
+logger = logging.getLogger(__name__)
+
+LIKE = "like"
+DISLIKE = "dislike"
+
+# Rebase the forward-decay landmark before raw scores lose float precision
+_MAX_GROWTH = 1e12
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TopK:
+    """Min-heap of the ``k`` highest scores with a position index.
+
+    ``update`` and ``remove`` are O(log k); ``items`` is O(k) once sorted
+    and cached until the next change.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[List] = []  # [score, offer_id]
+        self._index: Dict[int, int] = {}
+        self._sorted: Optional[List[Tuple[int, float]]] = None
+
+    def __contains__(self, offer_id: int) -> bool:
+        return offer_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][1]] = i
+        self._index[heap[j][1]] = j
+
+    def _sift_up(self, i: int):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._heap[i][0] >= self._heap[parent][0]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        size = len(self._heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and self._heap[child][0] < self._heap[smallest][0]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+    def update(self, offer_id: int, score: float):
+        position = self._index.get(offer_id)
+        if position is not None:
+            old = self._heap[position][0]
+            self._heap[position][0] = score
+            if score > old:
+                self._sift_down(position)
+            else:
+                self._sift_up(position)
+        elif len(self._heap) < self.k:
+            self._heap.append([score, offer_id])
+            self._index[offer_id] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+        elif score > self._heap[0][0]:
+            # Evict the current minimum
+            del self._index[self._heap[0][1]]
+            self._heap[0] = [score, offer_id]
+            self._index[offer_id] = 0
+            self._sift_down(0)
+        else:
+            return
+        self._sorted = None
+
+    def remove(self, offer_id: int):
+        position = self._index.pop(offer_id, None)
+        if position is None:
+            return
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._index[last[1]] = position
+            self._sift_down(position)
+            self._sift_up(self._index[last[1]])
+        self._sorted = None
+
+    def scale(self, factor: float):
+        # Uniform scaling keeps the heap order
+        for entry in self._heap:
+            entry[0] *= factor
+        self._sorted = None
+
+    def items(self) -> List[Tuple[int, float]]:
+        if self._sorted is None:
+            self._sorted = [(offer_id, score) for score, offer_id in sorted(self._heap, reverse=True)]
+        return self._sorted
+
+
+class TrendingEngine:
+    """Exponentially decayed like/dislike scores per offer, with a top-K view.
+
+    Scores use forward decay: an event at time ``t`` adds
+    ``exp(lambda * (t - landmark))``, so relative order never changes as time
+    passes and nothing has to be re-decayed; the value at ``now`` is the raw
+    score times ``exp(-lambda * (now - landmark))``. The trending score is
+    ``likes - dislike_weight * dislikes``.
+
+    Each worker scores its own swipes. ``snapshot`` adds them to the shared
+    ``offer_trending_scores`` table and reloads every worker's merged scores,
+    so all workers converge on the same ranking every snapshot interval.
+    """
+
+    def __init__(self, half_life_seconds: float, top_k: int, dislike_weight: float):
+        self.decay = math.log(2) / half_life_seconds
+        self.top_k = top_k
+        self.dislike_weight = dislike_weight
+        self._landmark = time.time()
+        self._scores: Dict[int, List[float]] = {}  # offer_id -> [likes, dislikes], raw
+        self._pending: Dict[int, List[float]] = {}  # deltas since the last snapshot, raw
+        self._top = TopK(top_k)
+        self._lock = threading.Lock()
+
+    def _trending(self, values: List[float]) -> float:
+        return values[0] - self.dislike_weight * values[1]
+
+    def _rebase(self, now: float):
+        factor = math.exp(-self.decay * (now - self._landmark))
+        for store in (self._scores, self._pending):
+            for values in store.values():
+                values[0] *= factor
+                values[1] *= factor
+        self._top.scale(factor)
+        self._landmark = now
+
+    def record(self, offer_id: int, action: str, amount: int = 1, at: Optional[datetime] = None):
+        """Add a swipe made at ``at`` (now by default); removals pass the original swipe time"""
+        now = time.time()
+        when = _naive_utc(at).replace(tzinfo=timezone.utc).timestamp() if at is not None else now
+        index = 0 if action == LIKE else 1
+        with self._lock:
+            if math.exp(self.decay * (now - self._landmark)) > _MAX_GROWTH:
+                self._rebase(now)
+            weight = math.exp(self.decay * (when - self._landmark))
+            values = self._scores.setdefault(offer_id, [0.0, 0.0])
+            values[index] += amount * weight
+            self._pending.setdefault(offer_id, [0.0, 0.0])[index] += amount * weight
+            self._top.update(offer_id, self._trending(values))
+
+    def discard(self, offer_ids: List[int]):
+        with self._lock:
+            for offer_id in offer_ids:
+                self._scores.pop(offer_id, None)
+                self._pending.pop(offer_id, None)
+                self._top.remove(offer_id)
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Trending ``(offer_id, score)`` pairs, highest first, scores decayed to now"""
+        with self._lock:
+            factor = math.exp(-self.decay * (time.time() - self._landmark))
+            items = self._top.items()
+            if limit is not None:
+                items = items[:limit]
+            return [(offer_id, score * factor) for offer_id, score in items if score > 0]
+
+    def rank(self) -> Dict[int, int]:
+        """Position of each top-K offer, for ordering feeds"""
+        return {offer_id: position for position, (offer_id, _) in enumerate(self.top())}
+
+    def snapshot(self, db: Session) -> Dict:
+        now = time.time()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            factor = math.exp(-self.decay * (now - self._landmark))
+        at = datetime.fromtimestamp(now, timezone.utc)
+
+        table = OfferTrendingScore.__table__
+        insert = dialect_insert(db)
+        try:
+            for offer_id, (likes, dislikes) in pending.items():
+                likes, dislikes = likes * factor, dislikes * factor
+                inserted = db.execute(
+                    insert(table).values(offer_id=offer_id, like_score=likes, dislike_score=dislikes, updated_at=at)
+                    .on_conflict_do_nothing()
+                )
+                if inserted.rowcount:
+                    continue
+                # Lock the row so concurrent snapshots from other workers add in turn
+                stored = db.execute(table.select().where(table.c.offer_id == offer_id).with_for_update()).first()
+                age = max((_naive_utc(at) - _naive_utc(stored.updated_at)).total_seconds(), 0.0)
+                decay = math.exp(-self.decay * age)
+                db.execute(update(table).where(table.c.offer_id == offer_id).values(
+                    like_score=stored.like_score * decay + likes,
+                    dislike_score=stored.dislike_score * decay + dislikes,
+                    updated_at=at
+                ))
+
+            # Scores of offers that can no longer be shown are dropped
+            stale = db.query(Offer.id).filter(or_(
+                Offer.is_active == False,
+                Offer.expiry_date <= _naive_utc(at)
+            ))
+            db.execute(table.delete().where(table.c.offer_id.in_(stale)))
+            db.commit()
+            rows = db.execute(table.select()).all()
+        except Exception as e:
+            logger.error(f"Error snapshotting trending scores: {e}")
+            db.rollback()
+            # Merge back so the next snapshot retries
+            with self._lock:
+                for offer_id, (likes, dislikes) in pending.items():
+                    values = self._pending.setdefault(offer_id, [0.0, 0.0])
+                    values[0] += likes
+                    values[1] += dislikes
+            return {}
+
+        with self._lock:
+            # Rebuild from the merged table plus anything recorded since,
+            # moving the landmark to the snapshot time
+            rescale = math.exp(-self.decay * (now - self._landmark))
+            self._landmark = now
+            self._scores = {}
+            for row in rows:
+                age = max((_naive_utc(at) - _naive_utc(row.updated_at)).total_seconds(), 0.0)
+                decay = math.exp(-self.decay * age)
+                self._scores[row.offer_id] = [row.like_score * decay, row.dislike_score * decay]
+            for offer_id, pending_values in self._pending.items():
+                pending_values[0] *= rescale
+                pending_values[1] *= rescale
+                values = self._scores.setdefault(offer_id, [0.0, 0.0])
+                values[0] += pending_values[0]
+                values[1] += pending_values[1]
+            self._top = TopK(self.top_k)
+            for offer_id, values in self._scores.items():
+                self._top.update(offer_id, self._trending(values))
+
+        return {"offers": len(pending)} if pending else {}
+
+
+trending_engine = TrendingEngine(
+    settings.trending_half_life_seconds,
+    settings.trending_top_k,
+    settings.trending_dislike_weight
+)
+
+
+def _on_lifecycle(event: str, offer_ids: List[int]):
+    if event in (EXPIRE, DEACTIVATE, REMOVE):
+        trending_engine.discard(offer_ids)
+
+
+offer_lifecycle.register_hook(_on_lifecycle)
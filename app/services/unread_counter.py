@@ -0,0 +1,41 @@
+from sqlalchemy import event, update
+from sqlalchemy.orm import attributes
+from app.models import Notification, User
+
+# Keeps users.unread_notification_count in step with the notifications table.
+# ORM inserts, deletes and is_read changes adjust it in the same flush, so the
+# counter commits or rolls back together with the notification rows. Bulk
+# UPDATE/DELETE statements bypass these hooks and call adjust_unread_count.
+
+
+def adjust_unread_count(connection_or_session, user_id: int, delta: int):
+    if not delta:
+        return
+    connection_or_session.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == user_id)
+        .values(unread_notification_count=User.__table__.c.unread_notification_count + delta)
+    )
+
+
+@event.listens_for(Notification, "after_insert")
+def _count_inserted(mapper, connection, target):
+    if not target.is_read:
+        adjust_unread_count(connection, target.user_id, 1)
+
+
+@event.listens_for(Notification, "after_delete")
+def _count_deleted(mapper, connection, target):
+    if not target.__dict__.get("is_read", True):
+        adjust_unread_count(connection, target.user_id, -1)
+
+
+@event.listens_for(Notification, "after_update")
+def _count_updated(mapper, connection, target):
+    history = attributes.get_history(target, "is_read")
+    if not history.has_changes():
+        return
+    was_read = bool(history.deleted[0]) if history.deleted else False
+    is_read = bool(target.is_read)
+    if was_read != is_read:
+        adjust_unread_count(connection, target.user_id, 1 if was_read else -1)
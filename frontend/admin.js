@@ -321,7 +321,7 @@ function displayActions(actions) {
     }
 
     actions.forEach(action => {
-        const details = action.details ? JSON.parse(action.details) : {};
+        const details = action.details || {};
         const detailsText = Object.entries(details)
             .map(([key, value]) => `${key}: ${value}`)
             .join(', ');
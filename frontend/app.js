@@ -6,6 +6,7 @@ let currentUser = null;
 let currentOffer = null;
 let likedOffers = [];
 let notifications = [];
+let notificationStream = null;
 
 // DOM Elements
 const loadingScreen = document.getElementById('loading-screen');
@@ -188,7 +189,7 @@ async function loadUserProfile() {
                 showMainApp();
                 loadNextOffer();
                 loadLikedOffers();
-                loadNotifications();
+                loadNotifications().then(startNotificationStream);
             } else {
                 showVerification();
             }
@@ -556,6 +557,39 @@ async function loadNotifications() {
     }
 }
 
+// Receive new notifications over Server-Sent Events instead of polling
+function startNotificationStream() {
+    if (notificationStream || typeof EventSource === 'undefined') {
+        return;
+    }
+    
+    const lastId = notifications.reduce((max, n) => Math.max(max, n.id), 0);
+    const token = encodeURIComponent(localStorage.getItem('access_token'));
+    // Nothing to resume after an empty unread list; live events are enough
+    const since = lastId > 0 ? `&since=${lastId}` : '';
+    notificationStream = new EventSource(`${API_BASE_URL}/notifications/stream?token=${token}${since}`);
+    
+    notificationStream.addEventListener('notification', (event) => {
+        const notification = JSON.parse(event.data);
+        if (!notifications.some(n => n.id === notification.id)) {
+            notifications.unshift(notification);
+            updateNotificationBadge();
+        }
+    });
+    
+    // Too many missed to replay; fetch the unread list again
+    notificationStream.addEventListener('resync', () => {
+        loadNotifications();
+    });
+}
+
+function stopNotificationStream() {
+    if (notificationStream) {
+        notificationStream.close();
+        notificationStream = null;
+    }
+}
+
 function updateNotificationBadge() {
     const badge = document.getElementById('notification-badge');
     if (notifications.length > 0) {
@@ -802,7 +836,9 @@ Account Information:
 }
 
 function showNotifications() {
-    loadNotifications().then(() => {
+    // The stream keeps the list current; only fetch when it is not connected
+    const ready = notificationStream ? Promise.resolve() : loadNotifications();
+    ready.then(() => {
         const container = document.getElementById('notifications-list');
         container.innerHTML = '';
         
@@ -827,6 +863,7 @@ function logout() {
     currentOffer = null;
     likedOffers = [];
     notifications = [];
+    stopNotificationStream();
     
     // Clear countdown timer
     if (countdownInterval) {
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Query-count check for GET /api/v1/admin/actions.
+
+Seeds a throwaway SQLite database with actions by several admins, then
+counts the SQL statements each request issues while paging through the
+log with the X-Next-Cursor header. Exits non-zero if any page costs more
+than two queries (the admin lookup for auth plus the page itself), or if
+the pages skip or repeat actions.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# A private database, so the check never touches real data
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'check.db')}"
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.auth import create_access_token
+from app.database import SessionLocal, engine
+from app.models import AdminAction, User
+import app.main
+
+ADMINS = 20
+ACTIONS = 2500
+MAX_QUERIES = 2
+
+
+def seed():
+    db = SessionLocal()
+    try:
+        admins = [
+            User(email=f"admin{i}@example.com", phone=f"+1000{i:04d}", full_name=f"Admin {i}",
+                 is_admin=True, is_active=True)
+            for i in range(ADMINS)
+        ]
+        db.add_all(admins)
+        db.flush()
+        start = datetime.now(timezone.utc) - timedelta(days=1)
+        db.add_all([
+            AdminAction(
+                admin_user_id=admins[i % ADMINS].id, action_type="update", resource_type="offer",
+                resource_id=i, details={"n": i},
+                # Pairs share a timestamp so the id tie-break is exercised
+                created_at=start + timedelta(seconds=i // 2)
+            )
+            for i in range(ACTIONS)
+        ])
+        db.commit()
+        return admins[0].email
+    finally:
+        db.close()
+
+
+def main():
+    email = seed()
+    client = TestClient(app.main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": email})}
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    failed = False
+    seen = []
+    cursor = None
+    for limit in (1000, 1000, 1000):
+        statements.clear()
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/admin/actions", params=params, headers=headers)
+        response.raise_for_status()
+        page = response.json()
+        missing_admin = sum(1 for action in page if not action["admin_user"])
+        seen.extend(action["id"] for action in page)
+        print(f"limit={limit}: {len(page)} actions, {len(statements)} queries")
+        if len(statements) > MAX_QUERIES or missing_admin:
+            failed = True
+            for statement in statements:
+                print("   ", " ".join(statement.split())[:120])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    if len(seen) != ACTIONS or len(set(seen)) != ACTIONS:
+        print(f"Paging returned {len(seen)} actions ({len(set(seen))} distinct), expected {ACTIONS}")
+        failed = True
+    print("FAILED" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Accuracy check: HyperLogLog reach estimates against exact distinct counts,
+including sketches merged across days and workers. Exits non-zero if any
+estimate is off by more than three standard errors.
+"""
+
+import os
+import random
+import sys
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.reach import HyperLogLog
+
+CARDINALITIES = [10, 100, 1_000, 10_000, 100_000, 500_000]
+SHARDS = 4  # e.g. days or workers, with overlapping users
+
+
+def check_single(cardinality: int) -> tuple:
+    sketch = HyperLogLog()
+    for user_id in range(cardinality):
+        sketch.add(user_id)
+        sketch.add(user_id)  # repeats must not count
+    return cardinality, sketch.count()
+
+
+def check_merged(cardinality: int, rng: random.Random) -> tuple:
+    users = rng.sample(range(cardinality * 10), cardinality)
+    shards = [HyperLogLog() for _ in range(SHARDS)]
+    for user_id in users:
+        # Each user lands in one or more shards
+        for shard in rng.sample(shards, rng.randint(1, SHARDS)):
+            shard.add(user_id)
+
+    merged = HyperLogLog.from_bytes(shards[0].to_bytes())
+    for shard in shards[1:]:
+        merged.merge(HyperLogLog.from_bytes(shard.to_bytes()))
+    return cardinality, merged.count()
+
+
+def main():
+    rng = random.Random(42)
+    error = HyperLogLog.relative_error()
+    failures = 0
+
+    print(f"HyperLogLog, {1 << 12} registers, standard error {error:.2%}")
+    print("=" * 60)
+    for label, results in (
+        ("single", [check_single(n) for n in CARDINALITIES]),
+        ("merged", [check_merged(n, rng) for n in CARDINALITIES]),
+    ):
+        for exact, estimate in results:
+            off = abs(estimate - exact) / exact
+            ok = off <= 3 * error
+            failures += not ok
+            print(f"{label:7} exact {exact:>8}  estimate {estimate:>8}  error {off:6.2%}  {'ok' if ok else 'FAIL'}")
+
+    size = len(HyperLogLog().registers)
+    print(f"Sketch size: {size} bytes raw")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Full recompute of the similar-offer neighbor lists.
+
+Splits the offer chunks across --processes local worker processes, or
+computes only one --shard of --shards so several machines can share a run.
+The scheduled job only recomputes around offers with new likes; run this after
+bulk deletions or to rebuild from scratch.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import UserLike
+from app.services.rollups import set_watermark
+from app.services.similar_offers import similar_offers, WATERMARK
+
+
+def compute_shard(shard: int, shards: int) -> int:
+    db = SessionLocal()
+    try:
+        return similar_offers.compute(db, shard=shard, shards=shards)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute similar offers from user likes")
+    parser.add_argument("--processes", type=int, default=1, help="local worker processes")
+    parser.add_argument("--shard", type=int, help="compute only this shard (0-based)")
+    parser.add_argument("--shards", type=int, default=1, help="total shards when using --shard")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        last_id = db.query(func.max(UserLike.id)).scalar() or 0
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    if args.shard is not None:
+        computed = compute_shard(args.shard, args.shards)
+    elif args.processes > 1:
+        # Spawn so each worker opens its own database connections
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            computed = sum(pool.starmap(compute_shard, [(shard, args.processes) for shard in range(args.processes)]))
+    else:
+        computed = compute_shard(0, 1)
+
+    if args.shard is None:
+        # Likes up to here are covered; the scheduled job continues from them
+        db = SessionLocal()
+        try:
+            set_watermark(db, WATERMARK, last_id)
+            db.commit()
+        finally:
+            db.close()
+
+    print(f"Recomputed neighbors for {computed} offers in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Export every swipe, notification and user added since the last export
+to date-partitioned Parquet under CHANGE_EXPORT_DIR (or --dir).
+
+The scheduled job exports at most CHANGE_EXPORT_MAX_BATCHES batches per
+source per run; use this for the initial backfill or to catch up after
+the job was disabled. It shares the job's watermarks, so either can
+resume where the other stopped.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.change_export import change_exporter, SOURCES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export new rows to date-partitioned Parquet")
+    parser.add_argument("--dir", help="export directory (default: CHANGE_EXPORT_DIR)")
+    parser.add_argument("--batch-size", type=int, help="rows per batch (default: CHANGE_EXPORT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    if args.dir:
+        change_exporter.export_dir = args.dir
+    if args.batch_size:
+        change_exporter.batch_size = args.batch_size
+    if not change_exporter.export_dir:
+        parser.error("set CHANGE_EXPORT_DIR or pass --dir")
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        result = change_exporter.catch_up(db)
+    finally:
+        db.close()
+
+    for source in SOURCES:
+        print(f"{source:<14} {result.get(source, 0):>10} rows")
+    print(f"Exported to {change_exporter.export_dir} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bulk import offers from a CSV or NDJSON partner feed.
+
+Streams the file through the same validation, batching and upserts as
+POST /api/v1/admin/offers/import, so files of any size can be loaded
+without going through the API. Each batch is recorded as one admin
+action by --admin-email.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import User
+from app.services.offer_import import OfferImporter, read_rows, detect_format, FORMATS
+from app.config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import offers from a CSV or NDJSON file")
+    parser.add_argument("path", help="file to import, or - for stdin")
+    parser.add_argument("--admin-email", required=True, help="admin the import is recorded against")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.offer_import_chunk_size)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.email == args.admin_email, User.is_admin == True).first()
+        if not admin:
+            parser.error(f"no admin user with email {args.admin_email}")
+
+        importer = OfferImporter(args.chunk_size, settings.offer_import_max_errors)
+        start = time.perf_counter()
+        stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        try:
+            result = importer.import_rows(db, read_rows(stream, fmt), admin.id, source=os.path.basename(args.path))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+    finally:
+        db.close()
+
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    if result["errors_truncated"]:
+        print("... more errors not shown", file=sys.stderr)
+    print(
+        f"Imported in {time.perf_counter() - start:.1f}s: {result['created']} created, "
+        f"{result['updated']} updated, {result['unchanged']} unchanged, {result['duplicates']} duplicates, "
+        f"{result['failed']} failed in {result['batches']} batches"
+    )
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()